@@ -1,16 +1,26 @@
 """The SNCF Train integration."""
 
+import random
+import time
 from pathlib import Path
 from types import MappingProxyType
 from logging import getLogger
 from typing import Any
 
 from homeassistant.config_entries import ConfigEntry, ConfigSubentry
-from homeassistant.core import HomeAssistant, CoreState, EVENT_HOMEASSISTANT_STARTED
+from homeassistant.core import (
+    HomeAssistant,
+    CoreState,
+    EVENT_HOMEASSISTANT_STARTED,
+    callback,
+)
 from homeassistant.helpers.entity_registry import Platform
 from homeassistant.components.frontend import add_extra_js_url
 from homeassistant.components.http import StaticPathConfig
 from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.start import async_at_started
 
 from .const import (
     CONF_API_KEY,
@@ -22,8 +32,13 @@ from .const import (
     CONF_TO,
     CONF_TRAIN_COUNT,
     DOMAIN,
+    FAST_STARTUP_MAX_DELAY,
+    SIGNAL_ENTRY_LOADED,
 )
 from .coordinator import SncfUpdateCoordinator
+from .services import async_setup_services
+from .views import SncfMetricsView
+from .websocket_api import async_register_websocket_api
 
 type SncfDataConfigEntry = ConfigEntry[SncfUpdateCoordinator]
 
@@ -36,7 +51,10 @@ LOGGER = getLogger(__name__)
 
 
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
-    """Set up SNCF Trains component — register the Lovelace card."""
+    """Set up SNCF Trains component — register the Lovelace card and its API."""
+    async_register_websocket_api(hass)
+    async_setup_services(hass)
+    hass.http.register_view(SncfMetricsView)
 
     async def _setup_frontend(_event: Any = None) -> None:
         """Inner function to register frontend modules."""
@@ -61,12 +79,38 @@ async def async_setup(hass: HomeAssistant, config: dict) -> bool:
 
 async def async_setup_entry(hass: HomeAssistant, entry: SncfDataConfigEntry) -> bool:
     """Set up SNCF Train as config entry."""
+    setup_start = time.perf_counter()
     coordinator = SncfUpdateCoordinator(hass, entry)
-    await coordinator.async_config_entry_first_refresh()
+
+    if coordinator.fast_startup and hass.state is not CoreState.running:
+        # Démarrage rapide : les entités sont créées tout de suite, l'API
+        # n'est appelée qu'après le démarrage de Home Assistant.
+        await coordinator.async_deferred_setup()
+
+        @callback
+        def _async_schedule_first_refresh(_hass: HomeAssistant) -> None:
+            """Spread the first refresh after Home Assistant has started."""
+            entry.async_on_unload(
+                async_call_later(
+                    hass,
+                    random.uniform(0, FAST_STARTUP_MAX_DELAY),
+                    coordinator.async_deferred_first_refresh,
+                )
+            )
+
+        entry.async_on_unload(async_at_started(hass, _async_schedule_first_refresh))
+    else:
+        await coordinator.async_config_entry_first_refresh()
+        coordinator.first_refresh_duration = time.perf_counter() - setup_start
+
     entry.runtime_data = coordinator
 
-    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+    entry.async_on_unload(entry.add_update_listener(async_update_listener))
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    async_dispatcher_send(hass, SIGNAL_ENTRY_LOADED)
+
+    coordinator.setup_duration = time.perf_counter() - setup_start
+    LOGGER.debug("SNCF Trains set up in %.3f s", coordinator.setup_duration)
 
     return True
 
@@ -76,9 +120,17 @@ async def async_unload_entry(hass: HomeAssistant, entry: SncfDataConfigEntry) ->
     return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
 
 
-async def async_reload_entry(hass: HomeAssistant, entry: SncfDataConfigEntry) -> None:
-    """Reload entry if change option."""
-    await hass.config_entries.async_reload(entry.entry_id)
+async def async_update_listener(
+    hass: HomeAssistant, entry: SncfDataConfigEntry
+) -> None:
+    """Apply route changes in place, reload for any other change."""
+    coordinator = entry.runtime_data
+
+    if coordinator.needs_reload():
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+
+    await coordinator.async_sync_subentries()
 
 
 async def async_migrate_entry(hass: HomeAssistant, entry: SncfDataConfigEntry) -> bool:
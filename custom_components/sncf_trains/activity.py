@@ -0,0 +1,56 @@
+"""Route activity from Home Assistant entities (demand-driven polling).
+
+A route can list entities that must be active for it to be polled
+(``person``, ``zone``, ``binary_sensor.workday``, ``input_boolean``...) and
+entities that suspend it while active (holiday ``calendar``, remote-work
+``input_boolean``...). A route with no entity is always active.
+"""
+
+from collections.abc import Iterable, Mapping
+from typing import Any
+
+from homeassistant.const import (
+    STATE_NOT_HOME,
+    STATE_OFF,
+    STATE_UNAVAILABLE,
+    STATE_UNKNOWN,
+)
+from homeassistant.core import HomeAssistant, State
+
+from .const import CONF_ACTIVE_ENTITIES, CONF_INACTIVE_ENTITIES
+
+# États "inactifs" ; une zone est active dès qu'une personne s'y trouve
+_OFF_STATES = {STATE_OFF, STATE_NOT_HOME, "0"}
+_UNKNOWN_STATES = {STATE_UNAVAILABLE, STATE_UNKNOWN, ""}
+
+
+def is_state_on(state: State | None) -> bool | None:
+    """Return whether an entity is active, None when its state is unknown."""
+    if state is None or state.state in _UNKNOWN_STATES:
+        return None
+
+    return state.state not in _OFF_STATES
+
+
+def route_entities(data: Mapping[str, Any]) -> set[str]:
+    """Return every entity the activity of a route depends on."""
+    return {
+        *data.get(CONF_ACTIVE_ENTITIES, []),
+        *data.get(CONF_INACTIVE_ENTITIES, []),
+    }
+
+
+def is_route_active(hass: HomeAssistant, data: Mapping[str, Any]) -> bool:
+    """Return whether a route needs live data.
+
+    An entity with an unknown state never suspends a route: a sensor
+    glitch must not stop the refreshes.
+    """
+
+    def states(entity_ids: Iterable[str]) -> list[bool | None]:
+        return [is_state_on(hass.states.get(entity_id)) for entity_id in entity_ids]
+
+    if False in states(data.get(CONF_ACTIVE_ENTITIES, [])):
+        return False
+
+    return True not in states(data.get(CONF_INACTIVE_ENTITIES, []))
@@ -1,13 +1,98 @@
 import base64
+import hashlib
+import heapq
+import importlib.util
+import itertools
 import logging
-from aiohttp import ClientSession, ClientTimeout, ClientError
-from typing import List, Optional, Mapping
+import ssl
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import date
+from enum import IntEnum
+from types import SimpleNamespace
+from urllib.parse import quote
+from aiohttp import (
+    ClientError,
+    ClientSession,
+    ClientTimeout,
+    TCPConnector,
+    TraceConfig,
+    TraceConnectionReuseconnParams,
+    TraceConnectionCreateEndParams,
+)
+from typing import Any, List, Optional, Mapping
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
 import asyncio
 
+from .const import DOMAIN
+from .metrics import IntegrationMetrics, api_endpoint
+from .recording import TrafficRecorder
+
 API_BASE = "https://api.sncf.com"
 _LOGGER = logging.getLogger(__name__)
 
+API_KEY_DAILY_QUOTA = 5000
+# Durée de mise à l'écart d'une clé (secondes)
+AUTH_FAILED_QUARANTINE = 24 * 3600
+RATE_LIMITED_QUARANTINE = 5 * 60
+
+# Connexions persistantes vers api.sncf.com
+CONNECTION_LIMIT_PER_HOST = 4
+KEEPALIVE_TIMEOUT = 120  # seconds
+DNS_CACHE_TTL = 3600  # seconds
+LATENCY_SAMPLES = 50
+
+# Débit sortant partagé par tous les clients (coordinateurs et config flow)
+RATE_LIMIT_PER_SECOND = 2.0
+RATE_LIMIT_BURST = 4
+MAX_CONCURRENT_REQUESTS = 2
+DATA_REQUEST_SCHEDULER = f"{DOMAIN}_request_scheduler"
+
+# Appels du jour de chaque clé, conservés au redémarrage
+USAGE_STORAGE_VERSION = 1
+USAGE_SAVE_DELAY = 10  # seconds
+
+
+class Priority(IntEnum):
+    """Priority class of an API request, the most urgent first."""
+
+    INTERACTIVE = 0
+    IMMINENT = 1
+    ROUTINE = 2
+    PREFETCH = 3
+
+
+# Attente maximale en file d'une requête de fond avant abandon (secondes)
+QUEUE_DEADLINES = {
+    Priority.ROUTINE: 60.0,
+    Priority.PREFETCH: 120.0,
+}
+
+_request_priority: ContextVar[Priority] = ContextVar(
+    "sncf_request_priority", default=Priority.ROUTINE
+)
+
+
+@contextmanager
+def request_priority(priority: Priority) -> Iterator[None]:
+    """Run the API requests of the block with a priority class."""
+    token = _request_priority.set(priority)
+    try:
+        yield
+    finally:
+        _request_priority.reset(token)
+
+
+class RequestExpired(asyncio.TimeoutError):
+    """A background request waited in the queue past its deadline."""
+
 
 def encode_token(api_key: str) -> str:
     """Encode the API key for Basic Auth."""
@@ -15,19 +100,585 @@ def encode_token(api_key: str) -> str:
     return base64.b64encode(token_str.encode()).decode()
 
 
+def _accept_encoding() -> str:
+    """Return the encodings aiohttp can decode here (brotli is optional)."""
+    if importlib.util.find_spec("brotli") or importlib.util.find_spec("brotlicffi"):
+        return "gzip, deflate, br"
+    return "gzip, deflate"
+
+
+@dataclass
+class ConnectionStats:
+    """Connection reuse and first-byte latency of the API session."""
+
+    created: int = 0
+    reused: int = 0
+    warm_ups: int = 0
+    latencies: deque[float] = field(
+        default_factory=lambda: deque(maxlen=LATENCY_SAMPLES)
+    )
+
+    def trace_config(self) -> TraceConfig:
+        """Return a trace config counting new and reused connections."""
+        trace_config = TraceConfig()
+
+        async def _on_create(
+            _session: ClientSession,
+            _ctx: SimpleNamespace,
+            _params: TraceConnectionCreateEndParams,
+        ) -> None:
+            self.created += 1
+
+        async def _on_reuse(
+            _session: ClientSession,
+            _ctx: SimpleNamespace,
+            _params: TraceConnectionReuseconnParams,
+        ) -> None:
+            self.reused += 1
+
+        trace_config.on_connection_create_end.append(_on_create)
+        trace_config.on_connection_reuseconn.append(_on_reuse)
+        return trace_config
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the statistics, latencies in milliseconds."""
+        latencies = list(self.latencies)
+        return {
+            "connections_created": self.created,
+            "connections_reused": self.reused,
+            "warm_ups": self.warm_ups,
+            "first_byte_ms_last": (
+                round(latencies[-1] * 1000, 1) if latencies else None
+            ),
+            "first_byte_ms_mean": (
+                round(sum(latencies) / len(latencies) * 1000, 1)
+                if latencies
+                else None
+            ),
+        }
+
+
+class TokenBucket:
+    """Token bucket shaping the outgoing API requests.
+
+    Requests beyond the burst wait for a token, in arrival order, instead of
+    reaching the API together and being answered 429.
+    """
+
+    def __init__(
+        self,
+        rate: float = RATE_LIMIT_PER_SECOND,
+        burst: int = RATE_LIMIT_BURST,
+    ) -> None:
+        """Initialize a full bucket."""
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+        self.acquired = 0
+        self.delayed = 0
+        self.wait_time = 0.0
+
+    async def acquire(self) -> None:
+        """Wait for a token."""
+        async with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+
+            if self._tokens < 1:
+                delay = (1 - self._tokens) / self.rate
+                self.delayed += 1
+                self.wait_time += delay
+                await asyncio.sleep(delay)
+                self._tokens = 1.0
+                self._updated = time.monotonic()
+
+            self._tokens -= 1
+            self.acquired += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the bucket settings and counters."""
+        return {
+            "rate_per_second": self.rate,
+            "burst": self.burst,
+            "acquired": self.acquired,
+            "delayed": self.delayed,
+            "wait_seconds": round(self.wait_time, 3),
+        }
+
+
+@dataclass
+class PriorityStats:
+    """Queue metrics of one priority class."""
+
+    requests: int = 0
+    expired: int = 0
+    wait_total: float = 0.0
+    wait_max: float = 0.0
+
+    def record_wait(self, wait: float) -> None:
+        """Count a request let through after ``wait`` seconds."""
+        self.requests += 1
+        self.wait_total += wait
+        self.wait_max = max(self.wait_max, wait)
+
+
+class RequestScheduler:
+    """Priority queue in front of the API, shared by every client.
+
+    At most ``max_concurrent`` requests are in flight; the others wait,
+    the most urgent class first, then by arrival. Background requests
+    (routine, prefetch) waiting past their deadline are dropped with
+    RequestExpired rather than sent late. With a token bucket, sent requests
+    also take a token from it.
+    """
+
+    def __init__(
+        self,
+        bucket: TokenBucket | None = None,
+        max_concurrent: int = MAX_CONCURRENT_REQUESTS,
+    ) -> None:
+        """Initialize an empty queue."""
+        self.bucket = bucket
+        self.max_concurrent = max_concurrent
+        self._active = 0
+        self._queue: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._sequence = itertools.count()
+        self.max_depth = 0
+        self.stats = {priority: PriorityStats() for priority in Priority}
+
+    @property
+    def depth(self) -> int:
+        """Return the number of requests waiting."""
+        return sum(not future.done() for _, _, future in self._queue)
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority | None = None) -> AsyncIterator[None]:
+        """Wait for the turn of a request, then hold its slot."""
+        if priority is None:
+            priority = _request_priority.get()
+
+        start = time.monotonic()
+        await self._acquire(priority)
+
+        try:
+            if self.bucket is not None:
+                await self.bucket.acquire()
+
+            self.stats[priority].record_wait(time.monotonic() - start)
+            yield
+        finally:
+            self._release()
+
+    async def _acquire(self, priority: Priority) -> None:
+        """Take a slot, waiting in the queue when none is free."""
+        if self._active < self.max_concurrent and not self.depth:
+            self._active += 1
+            return
+
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._sequence), future))
+        self.max_depth = max(self.max_depth, self.depth)
+
+        try:
+            async with asyncio.timeout(QUEUE_DEADLINES.get(priority)):
+                await future
+        except (TimeoutError, asyncio.CancelledError) as err:
+            # Créneau accordé au même moment : il est rendu
+            if future.done() and not future.cancelled():
+                self._release()
+            else:
+                future.cancel()
+
+            if isinstance(err, TimeoutError):
+                self.stats[priority].expired += 1
+                raise RequestExpired(
+                    f"{priority.name.lower()} request expired in the queue"
+                ) from err
+            raise
+
+    def _release(self) -> None:
+        """Free a slot and hand it to the most urgent waiting request."""
+        self._active -= 1
+
+        while self._queue:
+            _, _, future = heapq.heappop(self._queue)
+
+            if not future.done():
+                self._active += 1
+                future.set_result(None)
+                break
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the queue metrics, waits in milliseconds."""
+        return {
+            "max_concurrent": self.max_concurrent,
+            "in_flight": self._active,
+            "queue_depth": self.depth,
+            "queue_depth_max": self.max_depth,
+            "priorities": {
+                priority.name.lower(): {
+                    "requests": stats.requests,
+                    "expired": stats.expired,
+                    "wait_ms_mean": (
+                        round(stats.wait_total / stats.requests * 1000, 1)
+                        if stats.requests
+                        else None
+                    ),
+                    "wait_ms_max": round(stats.wait_max * 1000, 1),
+                }
+                for priority, stats in self.stats.items()
+            },
+            "rate_limit": self.bucket.as_dict() if self.bucket is not None else None,
+        }
+
+
+def get_request_scheduler(hass: HomeAssistant) -> RequestScheduler:
+    """Return the request scheduler shared by every client of the integration."""
+    return hass.data.setdefault(
+        DATA_REQUEST_SCHEDULER, RequestScheduler(TokenBucket())
+    )
+
+
+def create_session(
+    ssl_context: ssl.SSLContext | bool,
+    stats: ConnectionStats,
+) -> ClientSession:
+    """Create the integration session: keep-alive, DNS cache, compression.
+
+    The caller owns the session and closes it on unload.
+    """
+    connector = TCPConnector(
+        ssl=ssl_context,
+        limit_per_host=CONNECTION_LIMIT_PER_HOST,
+        keepalive_timeout=KEEPALIVE_TIMEOUT,
+        ttl_dns_cache=DNS_CACHE_TTL,
+    )
+    return ClientSession(
+        connector=connector,
+        headers={"Accept-Encoding": _accept_encoding()},
+        trace_configs=[stats.trace_config()],
+    )
+
+
+@dataclass
+class ApiKeyState:
+    """Usage and health of one API key of the pool."""
+
+    token: str
+    daily_quota: int = API_KEY_DAILY_QUOTA
+    day: date = field(default_factory=lambda: dt_util.now().date())
+    calls_today: int = 0
+    last_used: float = 0.0
+    last_status: int | None = None
+    quarantined_until: float = 0.0
+    quarantine_status: int | None = None
+    headers: dict[str, str] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        """Build the authorization headers once."""
+        self.headers = {"Authorization": f"Basic {self.token}"}
+
+    @property
+    def key_id(self) -> str:
+        """Return an identifier of the key that does not reveal it."""
+        return hashlib.sha256(self.token.encode()).hexdigest()[:16]
+
+    @property
+    def remaining(self) -> int:
+        """Return the calls left today on this key."""
+        self._roll_day()
+        return max(self.daily_quota - self.calls_today, 0)
+
+    def is_quarantined(self, now: float) -> bool:
+        """Return True while the key is set aside after a 401/429."""
+        return now < self.quarantined_until
+
+    def record_call(self, now: float) -> None:
+        """Count a request made with this key."""
+        self._roll_day()
+        self.calls_today += 1
+        self.last_used = now
+
+    def quarantine(self, status: int, duration: float, now: float) -> None:
+        """Set the key aside for ``duration`` seconds."""
+        self.quarantined_until = now + duration
+        self.quarantine_status = status
+
+    def _roll_day(self) -> None:
+        """Reset the daily counter when the day changes (Home Assistant time)."""
+        today = dt_util.now().date()
+        if today != self.day:
+            self.day = today
+            self.calls_today = 0
+
+
+class ApiKeyUsage:
+    """Calls of the day of each API key, kept across restarts.
+
+    Keys are saved under a hash, never in clear. Without it a restart would
+    reset the counters and the quota left would be overstated.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the store."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass, USAGE_STORAGE_VERSION, f"{DOMAIN}.{entry_id}.api_usage"
+        )
+        self._keys: list[ApiKeyState] = []
+
+    async def async_restore(self, keys: list[ApiKeyState]) -> None:
+        """Give the keys the calls saved today by a previous run."""
+        self._keys = keys
+        saved = (await self._store.async_load() or {}).get("keys", {})
+        today = dt_util.now().date()
+
+        for key in keys:
+            usage = saved.get(key.key_id)
+
+            if usage and date.fromisoformat(usage["day"]) == today:
+                key.day = today
+                key.calls_today = max(key.calls_today, usage["calls"])
+
+    @callback
+    def async_schedule_save(self) -> None:
+        """Save the counters after a short delay."""
+        self._store.async_delay_save(self._data_to_save, USAGE_SAVE_DELAY)
+
+    async def async_save(self) -> None:
+        """Save the counters now (entry unloaded)."""
+        await self._store.async_save(self._data_to_save())
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the data to save."""
+        return {
+            "keys": {
+                key.key_id: {"day": key.day.isoformat(), "calls": key.calls_today}
+                for key in self._keys
+            }
+        }
+
+
+class JourneyList(list):
+    """Journeys of a response, with the disruptions the response references."""
+
+    def __init__(self, journeys=(), disruptions=None):
+        super().__init__(journeys)
+        self.disruptions: list[dict] = disruptions or []
+
+
 class SncfApiClient:
-    def __init__(self, session: ClientSession, api_key: str, timeout: int = 10):
+    def __init__(
+        self,
+        session: ClientSession,
+        api_key: str | list[str],
+        timeout: int = 10,
+        api_base: str = API_BASE,
+        connection_stats: ConnectionStats | None = None,
+        scheduler: RequestScheduler | None = None,
+        recorder: TrafficRecorder | None = None,
+        metrics: IntegrationMetrics | None = None,
+        usage: ApiKeyUsage | None = None,
+    ):
         self._session = session
-        self._token = encode_token(api_key)
-        self._timeout = timeout
+        api_keys = [api_key] if isinstance(api_key, str) else api_key
+        self._keys = [ApiKeyState(encode_token(key)) for key in api_keys]
+        self._timeout = ClientTimeout(total=timeout)
+        self._api_base = api_base
+        self.connection_stats = connection_stats or ConnectionStats()
+        self.scheduler = scheduler or RequestScheduler(
+            max_concurrent=CONNECTION_LIMIT_PER_HOST
+        )
+        # Capture du trafic (clé exclue) pour le rejeu local
+        self.recorder = recorder
+        self.metrics = metrics or IntegrationMetrics()
+        # Compteurs d'appels persistés (aucun sans entrée de configuration)
+        self.usage = usage
+
+    def _select_key(self, tried: set[int]) -> int | None:
+        """Return the least used key that is neither tried nor quarantined."""
+        now = time.monotonic()
+        candidates = [
+            index
+            for index, key in enumerate(self._keys)
+            if index not in tried and not key.is_quarantined(now)
+        ]
+
+        if not candidates:
+            return None
+
+        # Plus de quota restant, puis la moins récemment utilisée
+        return min(
+            candidates,
+            key=lambda index: (
+                -self._keys[index].remaining,
+                self._keys[index].last_used,
+            ),
+        )
+
+    async def _get(
+        self,
+        url: str,
+        params: Mapping[str, str],
+        priority: Priority | None = None,
+    ) -> dict[str, Any]:
+        """Send a GET request, spreading calls over the keys of the pool.
+
+        A key answering 401 or 429 is quarantined and the request is retried
+        with the next key. Raise ConfigEntryAuthFailed or RuntimeError when no
+        key is usable. The request waits its turn in the scheduler, with the
+        priority of the calling block when none is given.
+        """
+        tried: set[int] = set()
+        endpoint = api_endpoint(url)
+
+        while (index := self._select_key(tried)) is not None:
+            tried.add(index)
+            key = self._keys[index]
+
+            async with self.scheduler.slot(priority):
+                now = time.monotonic()
+                key.record_call(now)
+                if self.usage is not None:
+                    self.usage.async_schedule_save()
+                start = time.perf_counter()
+
+                status: int | None = None
+
+                try:
+                    async with self._session.get(
+                        url,
+                        headers=key.headers,
+                        params=params,
+                        timeout=self._timeout,
+                    ) as resp:
+                        latency = time.perf_counter() - start
+                        status = resp.status
+                        self.connection_stats.latencies.append(latency)
+                        self.metrics.api_requests.inc(endpoint, str(status))
+                        key.last_status = status
+                        if status == 401:
+                            _LOGGER.warning("API key #%d unauthorized (401)", index)
+                            key.quarantine(401, AUTH_FAILED_QUARANTINE, now)
+                            self._record(url, params, status, latency)
+                            continue
+                        if status == 429:
+                            _LOGGER.warning("API key #%d rate-limited (429)", index)
+                            key.quarantine(429, RATE_LIMITED_QUARANTINE, now)
+                            self._record(url, params, status, latency)
+                            continue
+                        if status >= 400:
+                            self._record(url, params, status, latency)
+                        resp.raise_for_status()
+                        body = await self._decode(resp, endpoint)
+                        self._record(url, params, status, latency, body)
+                        return body
+                except (ClientError, asyncio.TimeoutError):
+                    if status is None:
+                        # Pas de réponse : erreur réseau ou délai dépassé
+                        self.metrics.api_requests.inc(endpoint, "error")
+                    raise
+
+        now = time.monotonic()
+        if any(
+            key.quarantine_status == 429 and key.is_quarantined(now)
+            for key in self._keys
+        ):
+            # rate-limit => pas une auth failure
+            raise RuntimeError("SNCF API rate-limited (429) on every API key")
+        raise ConfigEntryAuthFailed("Unauthorized: check your API key.")
+
+    async def _decode(self, resp: Any, endpoint: str) -> Any:
+        """Return the JSON body of a response, measuring its size and decoding."""
+        # Taille réellement lue : Content-Length manque sur les réponses
+        # chunked et compte les octets compressés
+        raw = await resp.read()
+        self.metrics.api_response_bytes.observe(len(raw), endpoint)
+
+        # aiohttp garde le corps lu : json() ne fait plus que le décoder
+        start = time.perf_counter()
+        body = await resp.json()
+        self.metrics.api_decode_seconds.observe(
+            time.perf_counter() - start, endpoint
+        )
+        return body
+
+    def _record(
+        self,
+        url: str,
+        params: Mapping[str, str],
+        status: int,
+        latency: float,
+        body: Any = None,
+    ) -> None:
+        """Hand a response to the traffic recorder, if capturing."""
+        if self.recorder is not None:
+            self.recorder.record(url, params, status, latency, body)
+
+    async def async_warm_up(self) -> float | None:
+        """Open the connection to the API ahead of use, without an API call.
+
+        Return the first-byte latency in seconds, None on network error.
+        """
+        start = time.perf_counter()
+
+        try:
+            # GET non authentifié de la racine : pas de quota consommé. Le
+            # corps est lu pour que la connexion retourne dans le pool.
+            async with self._session.get(
+                f"{self._api_base}/", timeout=self._timeout
+            ) as resp:
+                latency = time.perf_counter() - start
+                await resp.read()
+        except (ClientError, asyncio.TimeoutError) as err:
+            _LOGGER.debug("SNCF API warm-up failed: %s", err)
+            return None
+
+        self.connection_stats.warm_ups += 1
+        _LOGGER.debug("SNCF API connection warmed up in %.0f ms", latency * 1000)
+        return latency
+
+    async def async_restore_usage(self) -> None:
+        """Restore the calls made today with the keys before a restart."""
+        if self.usage is not None:
+            await self.usage.async_restore(self._keys)
+
+    def remaining_calls(self) -> int:
+        """Return the calls left today on the keys not rejected (401)."""
+        now = time.monotonic()
+        return sum(
+            key.remaining
+            for key in self._keys
+            if not (key.quarantine_status == 401 and key.is_quarantined(now))
+        )
+
+    def key_stats(self) -> list[dict[str, Any]]:
+        """Return the usage of every key, without the keys themselves."""
+        now = time.monotonic()
+        return [
+            {
+                "index": index,
+                "calls_today": key.calls_today,
+                "remaining": key.remaining,
+                "last_status": key.last_status,
+                "quarantined": key.is_quarantined(now),
+                "quarantine_status": key.quarantine_status,
+            }
+            for index, key in enumerate(self._keys)
+        ]
 
     async def fetch_departures(
         self, stop_id: str, max_results: int = 10
     ) -> Optional[List[dict]]:
         if stop_id.startswith("stop_area:"):
-            url = f"{API_BASE}/v1/coverage/sncf/stop_areas/{stop_id}/departures"
+            url = f"{self._api_base}/v1/coverage/sncf/stop_areas/{stop_id}/departures"
         elif stop_id.startswith("stop_point:"):
-            url = f"{API_BASE}/v1/coverage/sncf/stop_points/{stop_id}/departures"
+            url = f"{self._api_base}/v1/coverage/sncf/stop_points/{stop_id}/departures"
         else:
             raise ValueError("stop_id must start with 'stop_area:' or 'stop_point:'")
 
@@ -37,83 +688,145 @@ class SncfApiClient:
         }
         params: Mapping[str, str] = {k: str(v) for k, v in params_raw.items()}
 
-        headers = {"Authorization": f"Basic {self._token}"}
-
         try:
-            async with self._session.get(
-                url,
-                headers=headers,
-                params=params,
-                timeout=ClientTimeout(total=self._timeout),
-            ) as resp:
-                if resp.status == 401:
-                    # vrai problème d'auth
-                    raise ConfigEntryAuthFailed("Unauthorized: check your API key.")
-                if resp.status == 429:
-                    # rate-limit => pas une auth failure
-                    _LOGGER.warning("API rate limit (429) on %s with %s", url, params)
-                    raise RuntimeError(
-                        "SNCF API rate-limited (429)"
-                    )  # sera géré comme non-critique
-                resp.raise_for_status()
-                data = await resp.json()
-                return data.get("departures", [])
+            data = await self._get(url, params)
+            return data.get("departures", [])
         except (ClientError, asyncio.TimeoutError) as err:
             _LOGGER.error("Network error fetching departures from SNCF API: %s", err)
             _LOGGER.debug("URL: %s, Params: %s", url, params)
             return None
 
     async def fetch_journeys(
-        self, from_id: str, to_id: str, datetime_str: str, count: int = 5
+        self,
+        from_id: str,
+        to_id: str,
+        datetime_str: str,
+        count: int = 5,
+        timeframe_duration: int | None = None,
+        max_pages: int = 1,
+        data_freshness: str = "realtime",
     ) -> Optional[List[dict]]:
-        url = f"{API_BASE}/v1/coverage/sncf/journeys"
+        """Fetch up to ``count`` direct journeys.
+
+        With ``timeframe_duration`` (seconds), only the journeys leaving
+        within that time frame are requested, and the ``next`` links are
+        followed (up to ``max_pages`` pages) while fewer than ``count``
+        journeys were received.
+        """
+        url = f"{self._api_base}/v1/coverage/sncf/journeys"
         params_raw: dict[str, object] = {
             "from": from_id,
             "to": to_id,
             "datetime": datetime_str,
-            "count": count,
-            "data_freshness": "realtime",
+            "data_freshness": data_freshness,
             "datetime_represents": "departure",
+            "max_nb_transfers": 0,
+            # Tracés géographiques inutiles ici : réponse bien plus légère
+            "disable_geojson": "true",
         }
+
+        if timeframe_duration is None:
+            params_raw["count"] = count
+        else:
+            params_raw["timeframe_duration"] = timeframe_duration
+            params_raw["max_nb_journeys"] = count
+
         params: Mapping[str, str] = {k: str(v) for k, v in params_raw.items()}
+        journeys = JourneyList()
 
-        headers = {"Authorization": f"Basic {self._token}"}
         try:
-            async with self._session.get(
-                url,
-                headers=headers,
-                params=params,
-                timeout=ClientTimeout(total=self._timeout),
-            ) as resp:
-                if resp.status == 401:
-                    raise ConfigEntryAuthFailed("Unauthorized: check your API key.")
-                if resp.status == 429:
-                    raise RuntimeError("Quota exceeded: 429 Too Many Requests.")
-                resp.raise_for_status()
-                data = await resp.json()
-                return data.get("journeys", [])
+            for _ in range(max_pages):
+                data = await self._get(url, params)
+                journeys.extend(data.get("journeys", []))
+                journeys.disruptions.extend(data.get("disruptions", []))
+
+                next_url = next(
+                    (
+                        link.get("href")
+                        for link in data.get("links", [])
+                        if isinstance(link, dict) and link.get("type") == "next"
+                    ),
+                    None,
+                )
+
+                if len(journeys) >= count or not data.get("journeys") or not next_url:
+                    break
+
+                # Le lien "next" porte déjà tous les paramètres
+                url, params = next_url, {}
+
+            return journeys
         except (ClientError, asyncio.TimeoutError) as err:
             _LOGGER.warning("Network error fetching journeys from SNCF API: %s", err)
             return None
 
+    async def fetch_base_schedule(
+        self,
+        from_id: str,
+        to_id: str,
+        datetime_str: str,
+        count: int = 5,
+        timeframe_duration: int | None = None,
+        max_pages: int = 1,
+    ) -> Optional[List[dict]]:
+        """Fetch the planned direct journeys, without realtime information."""
+        with request_priority(Priority.PREFETCH):
+            return await self.fetch_journeys(
+                from_id,
+                to_id,
+                datetime_str,
+                count,
+                timeframe_duration,
+                max_pages,
+                data_freshness="base_schedule",
+            )
+
+    async def fetch_vehicle_journey(self, vehicle_journey_id: str) -> Optional[dict]:
+        """Fetch the realtime stop times of one vehicle journey.
+
+        Return the vehicle journey, with the disruptions of the response
+        under ``disruptions``.
+        """
+        url = (
+            f"{self._api_base}/v1/coverage/sncf/vehicle_journeys/"
+            f"{quote(vehicle_journey_id, safe=':')}"
+        )
+        params: Mapping[str, str] = {
+            "data_freshness": "realtime",
+            "disable_geojson": "true",
+        }
+
+        try:
+            data = await self._get(url, params, Priority.IMMINENT)
+        except (ClientError, asyncio.TimeoutError) as err:
+            _LOGGER.warning(
+                "Network error fetching vehicle journey from SNCF API: %s", err
+            )
+            return None
+
+        vehicle_journeys = data.get("vehicle_journeys") or [None]
+
+        if not isinstance(vehicle_journeys[0], dict):
+            return None
+
+        return {
+            **vehicle_journeys[0],
+            "disruptions": data.get("disruptions", []),
+        }
+
     async def search_stations(self, query: str) -> Optional[List[dict]]:
-        url = f"{API_BASE}/v1/coverage/sncf/places"
+        url = f"{self._api_base}/v1/coverage/sncf/places"
         params_raw: dict[str, object] = {
             "q": query,
             "type[]": "stop_point",
         }
         params: Mapping[str, str] = {k: str(v) for k, v in params_raw.items()}
-        headers = {"Authorization": f"Basic {self._token}"}
         try:
-            async with self._session.get(
-                url,
-                headers=headers,
-                params=params,
-                timeout=ClientTimeout(total=self._timeout),
-            ) as resp:
-                resp.raise_for_status()
-                data = await resp.json()
-                return data.get("places", [])
+            data = await self._get(url, params, Priority.INTERACTIVE)
+            return data.get("places", [])
+        except (ConfigEntryAuthFailed, RuntimeError) as err:
+            _LOGGER.error("Error searching stations from SNCF API: %s", err)
+            return None
         except (ClientError, asyncio.TimeoutError) as err:
             _LOGGER.error("Network error searching stations from SNCF API: %s", err)
             return None
@@ -0,0 +1,107 @@
+"""Share of the daily API quota between routes.
+
+Without quota pressure every route keeps its interval. When the routes
+would need more calls than the keys have left until the daily reset, each
+route gets a share of the remaining calls proportional to its weight and
+to the urgency of its next departure; a route needing less than its share
+gives the rest to the others (max-min fair share).
+"""
+
+import math
+from collections.abc import Mapping
+from dataclasses import dataclass
+from datetime import timedelta
+
+# Urgence d'un trajet : 1 au-delà d'une heure avant le prochain départ,
+# jusqu'à MAX_URGENCY quand le train est imminent
+URGENCY_HORIZON = timedelta(hours=1)
+MAX_URGENCY = 12.0
+
+
+@dataclass
+class RouteDemand:
+    """Refresh need of a route until the quota reset."""
+
+    interval: timedelta
+    calls: float
+    weight: float = 1.0
+    next_departure: timedelta | None = None
+
+
+def urgency(next_departure: timedelta | None) -> float:
+    """Return the urgency factor of a route from its next departure."""
+    if next_departure is None:
+        return 1.0
+
+    floor = URGENCY_HORIZON / MAX_URGENCY
+
+    return max(1.0, URGENCY_HORIZON / max(next_departure, floor))
+
+
+def allocate_intervals(
+    demands: Mapping[str, RouteDemand],
+    remaining_calls: int,
+    time_left: timedelta,
+) -> dict[str, timedelta]:
+    """Return the interval of each route keeping within the remaining calls.
+
+    A route given a fraction of the calls it needs has its interval
+    stretched by the same ratio. Intervals are never shorter than wanted and
+    are rounded up to the minute so that they stay stable between two
+    refreshes.
+    """
+    needs = {
+        subentry_id: max(demand.calls, 0.0) for subentry_id, demand in demands.items()
+    }
+
+    if sum(needs.values()) <= remaining_calls:
+        return {subentry_id: demand.interval for subentry_id, demand in demands.items()}
+
+    weights = {
+        subentry_id: max(demand.weight, 0.1) * urgency(demand.next_departure)
+        for subentry_id, demand in demands.items()
+    }
+
+    shares: dict[str, float] = {}
+    budget = float(max(remaining_calls, 0))
+    pending = set(needs)
+
+    while pending:
+        total = sum(weights[subentry_id] for subentry_id in pending)
+        satisfied = {
+            subentry_id
+            for subentry_id in pending
+            if needs[subentry_id] <= budget * weights[subentry_id] / total
+        }
+
+        if not satisfied:
+            for subentry_id in pending:
+                shares[subentry_id] = budget * weights[subentry_id] / total
+            break
+
+        for subentry_id in satisfied:
+            shares[subentry_id] = needs[subentry_id]
+            budget -= needs[subentry_id]
+
+        pending -= satisfied
+
+    intervals = {}
+
+    for subentry_id, demand in demands.items():
+        share = shares[subentry_id]
+
+        if share >= needs[subentry_id]:
+            intervals[subentry_id] = demand.interval
+            continue
+
+        # Moins d'un appel restant : plus de rafraîchissement avant le reset
+        stretched = (
+            demand.interval * (needs[subentry_id] / share) if share >= 1 else time_left
+        )
+
+        intervals[subentry_id] = max(
+            demand.interval,
+            timedelta(minutes=math.ceil(stretched.total_seconds() / 60)),
+        )
+
+    return intervals
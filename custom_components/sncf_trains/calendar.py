@@ -5,10 +5,12 @@ from dataclasses import dataclass
 from datetime import datetime, timedelta
 
 from homeassistant.components.calendar import CalendarEntity, CalendarEvent
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.helpers.device_registry import DeviceEntryType
 from homeassistant.helpers.entity_platform import AddConfigEntryEntitiesCallback
+from homeassistant.helpers.event import async_track_point_in_time
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
 
 from . import SncfDataConfigEntry
 from .const import (
@@ -18,7 +20,8 @@ from .const import (
     DOMAIN,
 )
 from .coordinator import SncfUpdateCoordinator
-from .helpers import get_train_num, parse_datetime
+from .helpers import get_train_num, get_transport_section
+from .timeline import TimelineEntry
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -43,10 +46,7 @@ async def async_setup_entry(
     """Set up the SNCF calendar."""
     coordinator: SncfUpdateCoordinator = entry.runtime_data
 
-    async_add_entities(
-        [SNCFCalendar(coordinator)],
-        update_before_add=True,
-    )
+    async_add_entities([SNCFCalendar(coordinator)])
 
 
 @dataclass
@@ -58,6 +58,7 @@ class SNCFEventMixIn:
     departure_date_time: datetime
     arrival_date_time: datetime
     train_num: int | None
+    status: str
 
 
 @dataclass
@@ -78,6 +79,7 @@ class SNCFCalendar(
         super().__init__(coordinator)
 
         self._event: MyCalendarEvent | None = None
+        self._unsub_departure: CALLBACK_TYPE | None = None
 
         self._attr_unique_id = f"calendar_sncf_train_{coordinator.entry.entry_id}"
 
@@ -89,25 +91,68 @@ class SNCFCalendar(
             "entry_type": DeviceEntryType.SERVICE,
         }
 
+        self._update_event()
+
     @property
     def event(self) -> MyCalendarEvent | None:
-        """Return the current or next upcoming event."""
+        """Return the event of the next train to leave."""
         if not self.available:
             return None
 
         return self._event
 
+    async def async_added_to_hass(self) -> None:
+        """Follow the departure of the current event once added."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self._cancel_departure)
+        self._track_departure()
+
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
+        self._update_event()
+        self._track_departure()
+        self.async_write_ha_state()
+
+    @callback
+    def _cancel_departure(self) -> None:
+        """Stop following the departure of the current event."""
+        if self._unsub_departure is not None:
+            self._unsub_departure()
+            self._unsub_departure = None
+
+    @callback
+    def _track_departure(self) -> None:
+        """Move to the next event as soon as the train of this one leaves."""
+        self._cancel_departure()
+
+        if self._event is not None and self._event.start > dt_util.now():
+            self._unsub_departure = async_track_point_in_time(
+                self.hass, self._async_train_left, self._event.start
+            )
+
+    @callback
+    def _async_train_left(self, _now: datetime) -> None:
+        """Select the next event without waiting for the coordinator."""
+        self._unsub_departure = None
+        self._update_event()
+        self._track_departure()
+        self.async_write_ha_state()
+
+    def _update_event(self) -> None:
+        """Select the event of the next train to leave."""
         events = self._fetch_journeys()
 
         if events:
-            now = datetime.now()
-
-            self._event = min(
-                events,
-                key=lambda event: abs(event.start.replace(tzinfo=None) - now),
+            now = dt_util.now()
+            # Un train parti laisse la place au suivant dès son départ
+            upcoming = [event for event in events if event.start > now]
+
+            # Sinon le dernier train parti reste affiché
+            self._event = (
+                min(upcoming, key=lambda event: event.start)
+                if upcoming
+                else max(events, key=lambda event: event.start)
             )
 
             if self._event:
@@ -117,13 +162,12 @@ class SNCFCalendar(
                     "departure": self._event.departure_date_time,
                     "arrival": self._event.arrival_date_time,
                     "number": self._event.train_num,
+                    "status": self._event.status,
                 }
         else:
             self._event = None
             self._attr_extra_state_attributes = {}
 
-        self.async_write_ha_state()
-
     async def async_get_events(
         self,
         _hass: HomeAssistant,
@@ -136,37 +180,29 @@ class SNCFCalendar(
 
         return self._fetch_journeys()
 
-    def _async_calculate_delay(
+    def _build_summary(
         self,
-        journey,
+        entry: TimelineEntry,
         dep_name: str,
         arr_name: str,
-    ) -> tuple[bool, int, str]:
-        """Calculate the delay for a journey."""
-        arr_dt = parse_datetime(journey.get("arrival_date_time", ""))
-
-        sections = journey.get("sections", [])
+    ) -> str:
+        """Return the event summary, with the delay when the train is late."""
+        if entry.is_cancelled:
+            return f"{dep_name} → {arr_name} - SUPPRIMÉ"
 
-        if not isinstance(sections, list) or not sections:
-            section = {}
-        else:
-            section = sections[0]
+        if entry.has_delay:
+            return f"{dep_name} → {arr_name} - RETARD ({entry.delay}min)"
 
-        base_arr_dt = parse_datetime(section.get("base_arrival_date_time", ""))
+        return f"{dep_name} → {arr_name}"
 
-        delay = (
-            int((arr_dt - base_arr_dt).total_seconds() / 60)
-            if arr_dt and base_arr_dt
-            else 0
-        )
+    def _build_description(self, entry: TimelineEntry) -> str:
+        """Return the event description, with the disruption message."""
+        description = f"Arrivée: {entry.arrival}, retard: {entry.delay} minutes"
 
-        summary = (
-            f"{dep_name} → {arr_name} - RETARD ({delay}min)"
-            if delay > 0
-            else f"{dep_name} → {arr_name}"
-        )
+        if message := entry.journey.get("disruption_message"):
+            description = f"{description}\n{message}"
 
-        return delay > 0, delay, summary
+        return description
 
     def _get_train_number(self, journey) -> int | None:
         """Return the train number when available."""
@@ -185,106 +221,54 @@ class SNCFCalendar(
             return None
 
     def _fetch_journeys(self) -> list[MyCalendarEvent]:
-        """Fetch journeys and convert them to calendar events."""
+        """Convert the coordinator timeline to calendar events."""
         calendar_events: list[MyCalendarEvent] = []
 
-        for tid, journeys in self.coordinator.data.items():
-            if not isinstance(journeys, list):
-                continue
+        subentries = self.coordinator.entry.subentries
 
-            entry = self.coordinator.entry.subentries.get(tid)
+        # La timeline est déjà triée et ses dates déjà analysées.
+        for entry in self.coordinator.timeline:
+            subentry = subentries.get(entry.subentry_id)
 
-            if entry is None:
+            if subentry is None:
                 _LOGGER.warning(
                     "Subentry SNCF introuvable pour tid=%s",
-                    tid,
+                    entry.subentry_id,
                 )
                 continue
 
-            dep_name = entry.data[CONF_DEPARTURE_NAME]
-            arr_name = entry.data[CONF_ARRIVAL_NAME]
+            if entry.index >= subentry.data.get(CONF_TRAIN_COUNT, 10):
+                continue
 
-            display_count = min(
-                len(journeys),
-                entry.data.get(CONF_TRAIN_COUNT, 10),
-            )
+            dep_name = subentry.data[CONF_DEPARTURE_NAME]
+            arr_name = subentry.data[CONF_ARRIVAL_NAME]
 
-            _LOGGER.debug(
-                "Calendrier SNCF : %s → %s : %d trajet(s)",
-                dep_name,
-                arr_name,
-                display_count,
-            )
+            train_num = self._get_train_number(entry.journey)
 
-            for journey_index, journey in enumerate(journeys[:display_count]):
-                if not isinstance(journey, dict):
-                    _LOGGER.debug(
-                        "Journey[%d] ignoré : format inattendu : %r",
-                        journey_index,
-                        journey,
-                    )
-                    continue
-
-                sections = journey.get("sections", [])
-
-                if not isinstance(sections, list) or not sections:
-                    _LOGGER.debug(
-                        "Journey[%d] ignoré : aucune section",
-                        journey_index,
-                    )
-                    continue
-
-                section = sections[0]
-
-                if not isinstance(section, dict):
-                    _LOGGER.debug(
-                        "Journey[%d] ignoré : première section invalide",
-                        journey_index,
-                    )
-                    continue
-
-                dep_dt = parse_datetime(journey.get("departure_date_time", ""))
-
-                arr_dt = parse_datetime(journey.get("arrival_date_time", ""))
-
-                if not dep_dt or not arr_dt:
-                    _LOGGER.debug(
-                        "Journey[%d] ignoré : date départ/arrivée invalide",
-                        journey_index,
-                    )
-                    continue
-
-                has_delay, delay, summary = self._async_calculate_delay(
-                    journey,
-                    dep_name,
-                    arr_name,
+            if train_num is None:
+                _LOGGER.debug(
+                    "Journey[%d] : aucun numéro de train disponible",
+                    entry.index,
                 )
 
-                train_num = self._get_train_number(journey)
-
-                if train_num is None:
-                    _LOGGER.debug(
-                        "Journey[%d] : aucun numéro de train disponible",
-                        journey_index,
-                    )
-
-                calendar_events.append(
-                    MyCalendarEvent(
-                        summary=summary,
-                        start=dep_dt,
-                        end=dep_dt + timedelta(minutes=1),
-                        description=(f"Arrivée: {arr_dt}, retard: {delay} minutes"),
-                        location=str(dep_name),
-                        uid=section.get(
-                            "id",
-                            f"{tid}_{journey_index}",
-                        ),
-                        has_delay=has_delay,
-                        delay=delay,
-                        departure_date_time=dep_dt,
-                        arrival_date_time=arr_dt,
-                        train_num=train_num,
-                    )
+            calendar_events.append(
+                MyCalendarEvent(
+                    summary=self._build_summary(entry, dep_name, arr_name),
+                    start=entry.departure,
+                    end=entry.departure + timedelta(minutes=1),
+                    description=self._build_description(entry),
+                    location=str(dep_name),
+                    uid=get_transport_section(entry.journey).get(
+                        "id",
+                        f"{entry.subentry_id}_{entry.index}",
+                    ),
+                    has_delay=entry.has_delay,
+                    delay=entry.delay,
+                    departure_date_time=entry.departure,
+                    arrival_date_time=entry.arrival,
+                    train_num=train_num,
+                    status=entry.status,
                 )
+            )
 
         return calendar_events
@@ -12,23 +12,44 @@ from homeassistant.config_entries import (
 )
 from homeassistant.core import callback
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.selector import (
+    EntitySelector,
+    EntitySelectorConfig,
+    TextSelector,
+    TextSelectorConfig,
+)
 
-from .api import SncfApiClient
+from .api import SncfApiClient, get_request_scheduler
 from .const import (
+    CONF_ACTIVE_ENTITIES,
+    CONF_ADDITIONAL_API_KEYS,
     CONF_API_KEY,
     CONF_ARRIVAL_CITY,
     CONF_ARRIVAL_NAME,
     CONF_ARRIVAL_STATION,
+    CONF_COMPACT_ATTRIBUTES,
+    CONF_FAST_STARTUP,
+    CONF_GTFS_PATH,
+    CONF_GTFS_RT_URL,
+    CONF_TRACKING_HORIZON,
+    CONF_TRANSFER_TIME,
     CONF_DEPARTURE_CITY,
     CONF_DEPARTURE_NAME,
     CONF_DEPARTURE_STATION,
     CONF_FROM,
+    CONF_INACTIVE_ENTITIES,
+    CONF_RECORD_PATH,
     CONF_TIME_END,
     CONF_TIME_START,
     CONF_TO,
     CONF_TRAIN_COUNT,
     CONF_UPDATE_INTERVAL,
     CONF_OUTSIDE_INTERVAL,
+    CONF_WEIGHT,
+    DEFAULT_COMPACT_ATTRIBUTES,
+    DEFAULT_FAST_STARTUP,
+    DEFAULT_TRACKING_HORIZON,
+    DEFAULT_TRANSFER_TIME,
     DEFAULT_OUTSIDE_INTERVAL,
     DEFAULT_TIME_END,
     DEFAULT_TIME_START,
@@ -36,6 +57,7 @@ from .const import (
     DEFAULT_UPDATE_INTERVAL,
     DOMAIN,
 )
+from .helpers import get_api_keys
 
 
 class SncfTrainsConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
@@ -49,9 +71,14 @@ class SncfTrainsConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         errors = {}
         if user_input is not None:
             session = async_get_clientsession(self.hass)
-            api = SncfApiClient(session, user_input[CONF_API_KEY])
-            if not await self._validate_api_key(api):
-                errors["base"] = "invalid_api_key"
+            # Chaque clé du pool est validée séparément
+            for api_key in get_api_keys(user_input):
+                api = SncfApiClient(
+                    session, api_key, scheduler=get_request_scheduler(self.hass)
+                )
+                if not await self._validate_api_key(api):
+                    errors["base"] = "invalid_api_key"
+                    break
             else:
                 if self.source == "user":
                     await self.async_set_unique_id("sncf_trains")
@@ -61,7 +88,14 @@ class SncfTrainsConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                         self._get_reconfigure_entry(), data=user_input
                     )
 
-        DATA_SCHEMA = vol.Schema({vol.Required(CONF_API_KEY): str})
+        DATA_SCHEMA = vol.Schema(
+            {
+                vol.Required(CONF_API_KEY): str,
+                vol.Optional(CONF_ADDITIONAL_API_KEYS): TextSelector(
+                    TextSelectorConfig(multiple=True)
+                ),
+            }
+        )
         if self.source == "reconfigure":
             entry = self._get_reconfigure_entry()
             DATA_SCHEMA = self.add_suggested_values_to_schema(DATA_SCHEMA, entry.data)
@@ -121,6 +155,54 @@ class SncfTrainsOptionsFlowHandler(OptionsFlow):
                         CONF_OUTSIDE_INTERVAL, DEFAULT_OUTSIDE_INTERVAL
                     ),
                 ): int,
+                vol.Optional(
+                    CONF_COMPACT_ATTRIBUTES,
+                    description={
+                        "suggested_value": entry.options.get(
+                            CONF_COMPACT_ATTRIBUTES, DEFAULT_COMPACT_ATTRIBUTES
+                        )
+                    },
+                ): bool,
+                vol.Optional(
+                    CONF_FAST_STARTUP,
+                    description={
+                        "suggested_value": entry.options.get(
+                            CONF_FAST_STARTUP, DEFAULT_FAST_STARTUP
+                        )
+                    },
+                ): bool,
+                vol.Optional(
+                    CONF_GTFS_PATH,
+                    description={"suggested_value": entry.options.get(CONF_GTFS_PATH)},
+                ): TextSelector(),
+                vol.Optional(
+                    CONF_GTFS_RT_URL,
+                    description={
+                        "suggested_value": entry.options.get(CONF_GTFS_RT_URL)
+                    },
+                ): TextSelector(),
+                vol.Optional(
+                    CONF_TRACKING_HORIZON,
+                    description={
+                        "suggested_value": entry.options.get(
+                            CONF_TRACKING_HORIZON, DEFAULT_TRACKING_HORIZON
+                        )
+                    },
+                ): vol.All(int, vol.Range(min=0)),
+                vol.Optional(
+                    CONF_TRANSFER_TIME,
+                    description={
+                        "suggested_value": entry.options.get(
+                            CONF_TRANSFER_TIME, DEFAULT_TRANSFER_TIME
+                        )
+                    },
+                ): vol.All(int, vol.Range(min=0)),
+                vol.Optional(
+                    CONF_RECORD_PATH,
+                    description={
+                        "suggested_value": entry.options.get(CONF_RECORD_PATH)
+                    },
+                ): TextSelector(),
             }
         )
 
@@ -146,11 +228,12 @@ class TrainSubentryFlowHandler(ConfigSubentryFlow):
         errors = {}
         if user_input is not None:
             self.config_entry = self._get_entry()
-            api_key = self.config_entry.options.get(
-                "api_key"
-            ) or self.config_entry.data.get("api_key")
             session = async_get_clientsession(self.hass)
-            self.api = SncfApiClient(session, api_key)
+            self.api = SncfApiClient(
+                session,
+                get_api_keys(self.config_entry.data),
+                scheduler=get_request_scheduler(self.hass),
+            )
 
             self.departure_city = user_input[CONF_DEPARTURE_CITY]
             stations = await self.api.search_stations(self.departure_city)
@@ -257,6 +340,13 @@ class TrainSubentryFlowHandler(ConfigSubentryFlow):
                     vol.Required(CONF_TIME_START, default=DEFAULT_TIME_START): str,
                     vol.Required(CONF_TIME_END, default=DEFAULT_TIME_END): str,
                     vol.Required(CONF_TRAIN_COUNT, default=DEFAULT_TRAIN_COUNT): int,
+                    vol.Optional(CONF_WEIGHT): vol.All(int, vol.Range(min=1, max=10)),
+                    vol.Optional(CONF_ACTIVE_ENTITIES): EntitySelector(
+                        EntitySelectorConfig(multiple=True)
+                    ),
+                    vol.Optional(CONF_INACTIVE_ENTITIES): EntitySelector(
+                        EntitySelectorConfig(multiple=True)
+                    ),
                 }
             ),
         )
@@ -269,6 +359,12 @@ class TrainSubentryFlowHandler(ConfigSubentryFlow):
 
         if user_input is not None:
             data = config_subentry.data.copy()
+
+            # Un champ optionnel vidé est absent de user_input
+            for key in (CONF_WEIGHT, CONF_ACTIVE_ENTITIES, CONF_INACTIVE_ENTITIES):
+                if key not in user_input:
+                    data.pop(key, None)
+
             data.update(user_input)
 
             return self.async_update_and_abort(
@@ -283,6 +379,13 @@ class TrainSubentryFlowHandler(ConfigSubentryFlow):
                 vol.Required(CONF_TIME_START, default=DEFAULT_TIME_START): str,
                 vol.Required(CONF_TIME_END, default=DEFAULT_TIME_END): str,
                 vol.Required(CONF_TRAIN_COUNT, default=DEFAULT_TRAIN_COUNT): int,
+                vol.Optional(CONF_WEIGHT): vol.All(int, vol.Range(min=1, max=10)),
+                vol.Optional(CONF_ACTIVE_ENTITIES): EntitySelector(
+                    EntitySelectorConfig(multiple=True)
+                ),
+                vol.Optional(CONF_INACTIVE_ENTITIES): EntitySelector(
+                    EntitySelectorConfig(multiple=True)
+                ),
             }
         )
 
@@ -0,0 +1,102 @@
+"""One-transfer itineraries built locally from the monitored routes.
+
+Two routes connect when the arrival station of the first is the departure
+station of the second. Their trains, already in the timeline, are scanned
+once by departure time (Connection Scan Algorithm): each train waits at
+its arrival station for the first train leaving after the minimum transfer
+time. No API call is needed and a delay on either leg is taken into
+account on the next scan.
+"""
+
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from .timeline import TimelineEntry
+
+
+@dataclass(frozen=True, slots=True)
+class Itinerary:
+    """Two trains of connected routes, with a feasible transfer."""
+
+    first: TimelineEntry
+    second: TimelineEntry
+
+    @property
+    def departure(self) -> datetime:
+        """Return the departure of the first train."""
+        return self.first.departure
+
+    @property
+    def arrival(self) -> datetime:
+        """Return the arrival of the second train."""
+        return self.second.arrival
+
+    @property
+    def transfer(self) -> timedelta:
+        """Return the time between the two trains."""
+        return self.second.departure - self.first.arrival
+
+
+def scan_connections(
+    entries: Iterable[TimelineEntry],
+    stops: Mapping[str, tuple[str, str]],
+    min_transfer: timedelta,
+) -> list[Itinerary]:
+    """Return the one-transfer itineraries between the monitored routes.
+
+    ``stops`` gives the departure and arrival stations of each route. An
+    itinerary is dropped when another one between the same stations leaves
+    later and arrives no later. The result is sorted by departure.
+    """
+    # Trains arrivés à chaque gare et attendant une correspondance
+    waiting: dict[str, list[TimelineEntry]] = {}
+    # Meilleure correspondance de chaque (premier train, gare d'arrivée)
+    best: dict[tuple[str, int, str], Itinerary] = {}
+
+    for entry in sorted(entries, key=lambda e: (e.departure, e.arrival)):
+        if entry.is_cancelled or entry.subentry_id not in stops:
+            continue
+
+        origin, destination = stops[entry.subentry_id]
+
+        for first in waiting.get(origin, []):
+            key = (first.subentry_id, first.index, destination)
+
+            if (
+                stops[first.subentry_id][0] == destination
+                or first.arrival + min_transfer > entry.departure
+                or (key in best and best[key].arrival <= entry.arrival)
+            ):
+                continue
+
+            best[key] = Itinerary(first, entry)
+
+        waiting.setdefault(destination, []).append(entry)
+
+    # Par paire de gares, on ne garde que les itinéraires non dominés
+    found: dict[tuple[str, str], list[Itinerary]] = {}
+
+    for itinerary in best.values():
+        pair = (
+            stops[itinerary.first.subentry_id][0],
+            stops[itinerary.second.subentry_id][1],
+        )
+        found.setdefault(pair, []).append(itinerary)
+
+    itineraries: list[Itinerary] = []
+
+    for candidates in found.values():
+        candidates.sort(key=lambda i: i.arrival)
+        candidates.sort(key=lambda i: i.departure, reverse=True)
+
+        best_arrival: datetime | None = None
+
+        for itinerary in candidates:
+            if best_arrival is None or itinerary.arrival < best_arrival:
+                itineraries.append(itinerary)
+                best_arrival = itinerary.arrival
+
+    itineraries.sort(key=lambda i: (i.departure, i.arrival))
+
+    return itineraries
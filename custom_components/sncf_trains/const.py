@@ -1,17 +1,37 @@
 DOMAIN = "sncf_trains"
 
 CONF_API_KEY = "api_key"
+CONF_ADDITIONAL_API_KEYS = "additional_api_keys"
 CONF_UPDATE_INTERVAL = "update_interval"
 CONF_OUTSIDE_INTERVAL = "outside_interval"
+CONF_COMPACT_ATTRIBUTES = "compact_attributes"
+CONF_FAST_STARTUP = "fast_startup"
+CONF_GTFS_PATH = "gtfs_path"
+CONF_GTFS_RT_URL = "gtfs_rt_url"
+CONF_TRACKING_HORIZON = "tracking_horizon"
+CONF_TRANSFER_TIME = "transfer_time"
+CONF_RECORD_PATH = "record_path"
 
 DEFAULT_UPDATE_INTERVAL = 2  # minutes
 DEFAULT_OUTSIDE_INTERVAL = 60  # minutes
 DEFAULT_TRAIN_COUNT = 5
 DEFAULT_TIME_START = "07:00"
 DEFAULT_TIME_END = "10:00"
+DEFAULT_COMPACT_ATTRIBUTES = False
+DEFAULT_FAST_STARTUP = False
+FAST_STARTUP_MAX_DELAY = 30  # seconds
+DEFAULT_TRACKING_HORIZON = 20  # minutes, 0 = disabled
+DEFAULT_TRANSFER_TIME = 5  # minutes
+DEFAULT_WEIGHT = 1
 
 ATTRIBUTION = "Data provided by api.sncf.com"
 
+# Trajets ajoutés ou modifiés sans rechargement (suffixé par entry_id)
+SIGNAL_ROUTES_UPDATED = f"{DOMAIN}_routes_updated"
+# Entrée chargée ou rechargée (nouveau coordinateur)
+SIGNAL_ENTRY_LOADED = f"{DOMAIN}_entry_loaded"
+
+CONF_ACTIVE_ENTITIES = "active_entities"
 CONF_ARRIVAL_CITY = "arrival_city"
 CONF_ARRIVAL_NAME = "arrival_name"
 CONF_ARRIVAL_STATION = "arrival_station"
@@ -19,7 +39,9 @@ CONF_DEPARTURE_CITY = "departure_city"
 CONF_DEPARTURE_NAME = "departure_name"
 CONF_DEPARTURE_STATION = "departure_station"
 CONF_FROM = "from"
+CONF_INACTIVE_ENTITIES = "inactive_entities"
 CONF_TIME_END = "time_end"
 CONF_TIME_START = "time_start"
 CONF_TO = "to"
 CONF_TRAIN_COUNT = "train_count"
+CONF_WEIGHT = "weight"
@@ -2,32 +2,103 @@
 
 import asyncio
 import logging
-from datetime import timedelta
+import time
+import zipfile
+import zlib
+from datetime import datetime, timedelta
 from typing import Any
 
 from aiohttp import ClientError
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryAuthFailed
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import (
+    async_track_point_in_time,
+    async_track_state_change_event,
+)
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 from homeassistant.util import dt as dt_util
+from homeassistant.util.ssl import client_context
 
-from .api import SncfApiClient
+from .activity import is_route_active, route_entities
+from .api import (
+    ApiKeyUsage,
+    ConnectionStats,
+    JourneyList,
+    Priority,
+    SncfApiClient,
+    create_session,
+    get_request_scheduler,
+    request_priority,
+)
 from .const import (
-    CONF_API_KEY,
+    CONF_COMPACT_ATTRIBUTES,
+    CONF_FAST_STARTUP,
     CONF_FROM,
+    CONF_GTFS_PATH,
+    CONF_GTFS_RT_URL,
     CONF_OUTSIDE_INTERVAL,
+    CONF_RECORD_PATH,
     CONF_TIME_END,
     CONF_TIME_START,
     CONF_TO,
+    CONF_TRACKING_HORIZON,
+    CONF_TRAIN_COUNT,
+    CONF_TRANSFER_TIME,
     CONF_UPDATE_INTERVAL,
+    CONF_WEIGHT,
+    DEFAULT_COMPACT_ATTRIBUTES,
+    DEFAULT_FAST_STARTUP,
     DEFAULT_OUTSIDE_INTERVAL,
+    DEFAULT_TRACKING_HORIZON,
+    DEFAULT_TRAIN_COUNT,
+    DEFAULT_TRANSFER_TIME,
     DEFAULT_UPDATE_INTERVAL,
+    DEFAULT_WEIGHT,
+    DOMAIN,
+    SIGNAL_ROUTES_UPDATED,
+)
+from .budget import RouteDemand, allocate_intervals
+from .connections import Itinerary, scan_connections
+from .disruptions import apply_disruptions
+from .gtfs import GtfsTimetable
+from .gtfs_rt import FEED_MAX_AGE, GtfsRealtimeClient
+from .helpers import get_api_keys, get_journey_key, parse_datetime
+from .metrics import IntegrationMetrics
+from .profiling import RefreshProfiler
+from .recording import TrafficRecorder
+from .schedule import BaseScheduleCache, merge_realtime
+from .tracking import (
+    apply_vehicle_journey,
+    get_vehicle_journey_id,
+    merge_disruptions,
 )
+from .timeline import Timeline, TimelineEntry
 
 _LOGGER = logging.getLogger(__name__)
 
+# Ouverture de la connexion à l'API avant le début de plage
+WARM_UP_LEAD = timedelta(seconds=30)
+
+# Pages de résultats suivies au plus pour couvrir la plage horaire
+MAX_JOURNEY_PAGES = 3
+
+# Suivi des trains imminents : une recherche complète au moins toutes les
+# DISCOVERY_INTERVAL pour découvrir les nouveaux trains. Une recherche coûte
+# un appel pour tous les trains : suivre un train coûte autant (réponse plus
+# légère), en suivre deux coûterait plus, d'où MAX_TRACKED_TRAINS = 1.
+DISCOVERY_INTERVAL = timedelta(minutes=10)
+MAX_TRACKED_TRAINS = 1
+
+# Étalement des trajets sur l'intervalle : chaque trajet a sa part de
+# l'intervalle, décalée d'une fraction fixe propre au trajet (REFRESH_JITTER
+# d'une part au plus). Le coordinateur passe une fois par part, jamais plus
+# souvent que MIN_REFRESH_TICK.
+MIN_REFRESH_TICK = timedelta(seconds=30)
+REFRESH_JITTER = 0.25
+
 
 class SncfUpdateCoordinator(DataUpdateCoordinator):
     """Coordonnateur pour récupérer les données des trajets SNCF."""
@@ -37,6 +108,22 @@ class SncfUpdateCoordinator(DataUpdateCoordinator):
         self.entry = entry
         self.api_client = None
 
+        # Attribution des trains aux capteurs "Train N" : subentry_id -> clés
+        # des journeys par emplacement (None = emplacement libre).
+        self.slots: dict[str, list[str | None]] = {}
+        self._journeys_by_key: dict[str, dict[str, dict[str, Any]]] = {}
+
+        # Trains de tous les trajets, triés par heure d'arrivée.
+        self.timeline = Timeline()
+
+        # Configuration au chargement : un changement de l'entrée impose un
+        # rechargement, un changement de trajet est appliqué à chaud.
+        self._entry_config = (dict(entry.data), dict(entry.options))
+        self._subentry_data = {
+            subentry_id: dict(subentry.data)
+            for subentry_id, subentry in entry.subentries.items()
+        }
+
         self.update_interval_minutes = entry.options.get(
             CONF_UPDATE_INTERVAL,
             DEFAULT_UPDATE_INTERVAL,
@@ -47,6 +134,72 @@ class SncfUpdateCoordinator(DataUpdateCoordinator):
             DEFAULT_OUTSIDE_INTERVAL,
         )
 
+        self.compact_attributes = entry.options.get(
+            CONF_COMPACT_ATTRIBUTES,
+            DEFAULT_COMPACT_ATTRIBUTES,
+        )
+
+        self.fast_startup = entry.options.get(
+            CONF_FAST_STARTUP,
+            DEFAULT_FAST_STARTUP,
+        )
+
+        # Horaires théoriques hors ligne (GTFS), si un zip est configuré ;
+        # chemin relatif au dossier de configuration, comme les captures
+        gtfs_path = entry.options.get(CONF_GTFS_PATH)
+        self.gtfs_path: str | None = hass.config.path(gtfs_path) if gtfs_path else None
+        self.timetable: GtfsTimetable | None = None
+
+        self.tracking_horizon = timedelta(
+            minutes=entry.options.get(
+                CONF_TRACKING_HORIZON,
+                DEFAULT_TRACKING_HORIZON,
+            )
+        )
+
+        # Correspondances entre trajets enchaînés, calculées localement
+        self.transfer_time = timedelta(
+            minutes=entry.options.get(
+                CONF_TRANSFER_TIME,
+                DEFAULT_TRANSFER_TIME,
+            )
+        )
+        self.connections: list[Itinerary] = []
+
+        # Prochain rafraîchissement de chaque trajet : (date, intervalle)
+        self._refresh_due: dict[str, tuple[datetime, timedelta]] = {}
+
+        # Intervalles étirés faute de quota suffisant (diagnostics)
+        self.budget_intervals: dict[str, timedelta] = {}
+
+        # Dernière recherche complète de chaque trajet : (date, journeys)
+        self._last_search: dict[str, tuple[datetime, list[dict[str, Any]]]] = {}
+
+        # Horaires théoriques téléchargés une fois par plage et par trajet
+        self.base_schedule = BaseScheduleCache(hass, entry.entry_id)
+
+        # Flux GTFS-RT remplaçant l'API comme source temps réel
+        self.gtfs_rt_url: str | None = entry.options.get(CONF_GTFS_RT_URL) or None
+
+        # Trajets suspendus par leurs entités (personne absente, télétravail,
+        # vacances...) : aucun appel API tant qu'ils restent inactifs
+        self.inactive_routes: set[str] = set()
+        self._unsub_activity: CALLBACK_TYPE | None = None
+
+        # Session dédiée à l'API (connexions persistantes)
+        self._session = None
+        self._unsub_window: list[CALLBACK_TYPE] = []
+        self.next_window_start = None
+
+        # Mesures du démarrage (secondes), exposées dans les diagnostics
+        self.setup_duration: float | None = None
+        self.first_refresh_duration: float | None = None
+
+        # Profilage à la demande (service sncf_trains.profile)
+        self.profiler: RefreshProfiler | None = None
+        self.last_profile: dict[str, Any] | None = None
+        self.metrics = IntegrationMetrics()
+
         super().__init__(
             hass,
             _LOGGER,
@@ -56,11 +209,20 @@ class SncfUpdateCoordinator(DataUpdateCoordinator):
 
     async def _async_setup(self) -> None:
         """Paramétrage du coordinateur."""
-        api_key = self.entry.data[CONF_API_KEY]
+        api_keys = get_api_keys(self.entry.data)
 
         try:
-            session = async_get_clientsession(self.hass)
-            self.api_client = SncfApiClient(session, api_key)
+            connection_stats = ConnectionStats()
+            self._session = create_session(client_context(), connection_stats)
+            self.api_client = SncfApiClient(
+                self._session,
+                api_keys,
+                connection_stats=connection_stats,
+                scheduler=get_request_scheduler(self.hass),
+                recorder=self._create_recorder(),
+                metrics=self.metrics,
+                usage=ApiKeyUsage(self.hass, self.entry.entry_id),
+            )
 
         except Exception as err:
             if "401" in str(err) or "403" in str(err):
@@ -72,8 +234,263 @@ class SncfUpdateCoordinator(DataUpdateCoordinator):
             )
             raise UpdateFailed(err) from err
 
-    def _build_datetime_param(self, time_start, time_end) -> str:
-        """Construit le paramètre datetime pour l'API."""
+        await self.api_client.async_restore_usage()
+        await self.base_schedule.async_load()
+
+        if self.gtfs_path and self.timetable is None:
+            try:
+                self.timetable = await self.hass.async_add_executor_job(
+                    GtfsTimetable.load, self.gtfs_path
+                )
+            except (OSError, zipfile.BadZipFile, KeyError, ValueError) as err:
+                _LOGGER.error(
+                    "Impossible de charger les horaires GTFS '%s' : %s",
+                    self.gtfs_path,
+                    err,
+                )
+
+        if self.gtfs_rt_url:
+            if self.timetable is None:
+                _LOGGER.warning(
+                    "Le flux GTFS-RT nécessite des horaires GTFS : API SNCF utilisée"
+                )
+            else:
+                self.api_client = GtfsRealtimeClient(
+                    self.hass,
+                    async_get_clientsession(self.hass),
+                    self.timetable,
+                    self.gtfs_rt_url,
+                )
+
+        self._async_listen_activity()
+
+    @callback
+    def _async_listen_activity(self) -> None:
+        """Écoute les entités dont dépend l'activité des trajets."""
+        if self._unsub_activity is not None:
+            self._unsub_activity()
+            self._unsub_activity = None
+
+        self.inactive_routes = {
+            subentry_id
+            for subentry_id, subentry in self.entry.subentries.items()
+            if not is_route_active(self.hass, subentry.data)
+        }
+
+        entity_ids = set().union(
+            *(
+                route_entities(subentry.data)
+                for subentry in self.entry.subentries.values()
+            )
+        )
+
+        if entity_ids:
+            self._unsub_activity = async_track_state_change_event(
+                self.hass,
+                sorted(entity_ids),
+                self._async_activity_changed,
+            )
+
+    @callback
+    def _async_activity_changed(self, _event: Event) -> None:
+        """Reprend immédiatement les trajets redevenus actifs."""
+        inactive_routes = {
+            subentry_id
+            for subentry_id, subentry in self.entry.subentries.items()
+            if not is_route_active(self.hass, subentry.data)
+        }
+
+        resumed = self.inactive_routes - inactive_routes
+        self.inactive_routes = inactive_routes
+
+        if resumed:
+            _LOGGER.debug("Trajet(s) %s de nouveau actif(s)", ", ".join(resumed))
+            self.hass.async_create_task(self.async_request_refresh())
+
+    def needs_reload(self) -> bool:
+        """Indique si les données ou options de l'entrée ont changé."""
+        return (dict(self.entry.data), dict(self.entry.options)) != self._entry_config
+
+    async def async_sync_subentries(self) -> None:
+        """Applique l'ajout, la suppression ou la modification de trajets.
+
+        Seuls les trajets concernés sont rafraîchis ; les autres gardent
+        leurs données et leurs entités.
+        """
+        current = {
+            subentry_id: dict(subentry.data)
+            for subentry_id, subentry in self.entry.subentries.items()
+        }
+
+        added = set(current) - set(self._subentry_data)
+        removed = set(self._subentry_data) - set(current)
+        changed = {
+            subentry_id
+            for subentry_id in set(current) & set(self._subentry_data)
+            if current[subentry_id] != self._subentry_data[subentry_id]
+        }
+
+        self._subentry_data = current
+
+        if not (added or removed or changed):
+            return
+
+        _LOGGER.debug(
+            "Trajets ajoutés %s, supprimés %s, modifiés %s",
+            added,
+            removed,
+            changed,
+        )
+
+        for subentry_id in removed | changed:
+            self._forget_route(subentry_id)
+
+        if self.data:
+            self.data = {
+                subentry_id: journeys
+                for subentry_id, journeys in self.data.items()
+                if subentry_id not in removed
+            }
+
+        self._async_listen_activity()
+
+        # Entités des nouveaux trajets, puis rafraîchissement : seuls les
+        # trajets sans échéance (nouveaux, modifiés) sont interrogés.
+        async_dispatcher_send(
+            self.hass,
+            f"{SIGNAL_ROUTES_UPDATED}_{self.entry.entry_id}",
+            added,
+            changed,
+        )
+
+        await self.async_refresh()
+
+    def _forget_route(self, subentry_id: str) -> None:
+        """Oublie l'état d'un trajet supprimé ou reconfiguré."""
+        self._refresh_due.pop(subentry_id, None)
+        self._last_search.pop(subentry_id, None)
+        self.base_schedule.async_remove(subentry_id)
+
+        if subentry_id not in self.entry.subentries:
+            self.slots.pop(subentry_id, None)
+            self._journeys_by_key.pop(subentry_id, None)
+            self.timeline.remove_route(subentry_id)
+
+    def _create_recorder(self) -> TrafficRecorder | None:
+        """Crée l'enregistreur du trafic API si un fichier est configuré."""
+        record_path = self.entry.options.get(CONF_RECORD_PATH)
+
+        if not record_path:
+            return None
+
+        _LOGGER.info("Enregistrement du trafic API dans '%s'", record_path)
+
+        return TrafficRecorder(self.hass.config.path(record_path), self.hass)
+
+    async def async_shutdown(self) -> None:
+        """Arrêt du coordinateur : ferme la session, libère les horaires GTFS."""
+        await super().async_shutdown()
+
+        self._cancel_window_timers()
+
+        if self._unsub_activity is not None:
+            self._unsub_activity()
+            self._unsub_activity = None
+
+        recorder = getattr(self.api_client, "recorder", None)
+
+        if recorder is not None:
+            await recorder.async_close()
+
+        # Sauvegarde immédiate : l'entrée rechargée relit les compteurs
+        usage = getattr(self.api_client, "usage", None)
+
+        if usage is not None:
+            await usage.async_save()
+
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+        if self.timetable is not None:
+            self.timetable.close()
+            self.timetable = None
+
+    async def async_deferred_setup(self) -> None:
+        """Prépare le coordinateur sans appeler l'API (démarrage rapide).
+
+        Les entités sont créées indisponibles ; le premier rafraîchissement
+        est lancé plus tard par async_deferred_first_refresh.
+        """
+        await self._async_setup()
+        self.data = {}
+        self.last_update_success = False
+
+    async def async_deferred_first_refresh(self, _now: Any = None) -> None:
+        """Premier rafraîchissement différé, avec mesure de sa durée."""
+        start = time.perf_counter()
+        await self.async_refresh()
+        self.first_refresh_duration = time.perf_counter() - start
+
+    @callback
+    def async_start_profiling(self, refreshes: int) -> None:
+        """Profile les prochains rafraîchissements."""
+        self.profiler = RefreshProfiler(refreshes)
+        _LOGGER.info("Profilage des %d prochains rafraîchissements", refreshes)
+
+    async def _async_refresh(self, *args: Any, **kwargs: Any) -> None:
+        """Rafraîchit et mesure la durée, sous cProfile sur demande."""
+        profiler = self.profiler
+        start = time.perf_counter()
+
+        if profiler is None:
+            await super()._async_refresh(*args, **kwargs)
+        else:
+            # Appels API, traitement et mise à jour des entités
+            with profiler.capture():
+                await super()._async_refresh(*args, **kwargs)
+
+        self.metrics.refresh_seconds.observe(time.perf_counter() - start)
+
+        if profiler is not None and profiler.done and self.profiler is profiler:
+            self.profiler = None
+            await self._async_save_profile(profiler)
+
+    async def _async_save_profile(self, profiler: RefreshProfiler) -> None:
+        """Écrit le profil sous le dossier de configuration."""
+        path: str | None = self.hass.config.path(
+            f"{DOMAIN}_profile_{dt_util.now().strftime('%Y%m%d_%H%M%S')}.prof"
+        )
+
+        if not profiler.refreshes:
+            # Tous ignorés (autre profileur actif) : un profil vide est illisible
+            _LOGGER.warning(
+                "Aucun rafraîchissement profilé : un autre profileur était actif"
+            )
+            path = None
+        else:
+            try:
+                await self.hass.async_add_executor_job(profiler.dump, path)
+            except OSError as err:
+                _LOGGER.error("Impossible d'écrire le profil '%s' : %s", path, err)
+                path = None
+
+        self.last_profile = {
+            "path": path,
+            "refreshes": profiler.refreshes,
+            "skipped": profiler.skipped,
+            "finished": str(dt_util.now()),
+            "hot_spots": profiler.hot_spots(),
+        }
+
+        _LOGGER.info(
+            "Profil de %d rafraîchissement(s) : %s",
+            profiler.refreshes,
+            path,
+        )
+
+    def _build_datetime(self, time_start, time_end) -> datetime:
+        """Construit la date de début de recherche des trains."""
         now = dt_util.now()
 
         h_start, m_start = map(int, time_start.split(":"))
@@ -96,14 +513,36 @@ class SncfUpdateCoordinator(DataUpdateCoordinator):
         if now > dt_end:
             dt_start += timedelta(days=1)
 
-        return dt_start.strftime("%Y%m%dT%H%M%S")
+        return dt_start
 
-    def _adjust_update_interval(
-        self,
-        time_start,
-        time_end,
-    ) -> timedelta | None:
-        """Ajuste la fréquence selon la plage horaire."""
+    def _build_datetime_param(self, time_start, time_end) -> str:
+        """Construit le paramètre datetime pour l'API."""
+        return self._build_datetime(time_start, time_end).strftime("%Y%m%dT%H%M%S")
+
+    @staticmethod
+    def _search_range(
+        dt_start: datetime,
+        timeframe_duration: int,
+        now: datetime,
+    ) -> tuple[datetime, int]:
+        """Début et durée de la recherche temps réel : max(maintenant, plage)."""
+        search_start = max(dt_start, now.replace(second=0, microsecond=0))
+        elapsed = int((search_start - dt_start).total_seconds())
+
+        return search_start, max(timeframe_duration - elapsed, 60)
+
+    @staticmethod
+    def _window_duration(time_start, time_end) -> int:
+        """Durée de la plage horaire en secondes (plage traversant minuit incluse)."""
+        h_start, m_start = map(int, time_start.split(":"))
+        h_end, m_end = map(int, time_end.split(":"))
+
+        minutes = (h_end * 60 + m_end - h_start * 60 - m_start) % (24 * 60)
+
+        return (minutes or 24 * 60) * 60
+
+    def _in_monitoring_window(self, time_start, time_end) -> bool:
+        """Indique si l'on est dans la plage horaire (ou l'heure qui précède)."""
         now = dt_util.now()
 
         h_start, m_start = map(int, time_start.split(":"))
@@ -133,11 +572,71 @@ class SncfUpdateCoordinator(DataUpdateCoordinator):
             end -= timedelta(days=1)
             pre_start -= timedelta(days=1)
 
-        in_fast_mode = pre_start <= now <= end
+        return pre_start <= now <= end
+
+    def _next_window_start(self, time_start):
+        """Retourne le prochain passage en mode rapide (une heure avant la plage)."""
+        now = dt_util.now()
+
+        h_start, m_start = map(int, time_start.split(":"))
+
+        pre_start = now.replace(
+            hour=h_start,
+            minute=m_start,
+            second=0,
+            microsecond=0,
+        ) - timedelta(hours=1)
+
+        if pre_start <= now:
+            pre_start += timedelta(days=1)
+
+        return pre_start
+
+    @callback
+    def _cancel_window_timers(self) -> None:
+        """Annule la préparation de la prochaine plage."""
+        for unsub in self._unsub_window:
+            unsub()
+        self._unsub_window = []
 
+    @callback
+    def _schedule_window_start(self, window_start) -> None:
+        """Prépare la connexion juste avant la plage, puis rafraîchit à son début.
+
+        Hors plage l'intervalle est long et la connexion est fermée : elle
+        est rouverte WARM_UP_LEAD avant la plage pour que le premier appel
+        en mode rapide ne paie pas la résolution DNS ni la poignée de main TLS.
+        """
+        if window_start == self.next_window_start:
+            return
+
+        self._cancel_window_timers()
+        self.next_window_start = window_start
+
+        async def _async_warm_up(_now) -> None:
+            await self.api_client.async_warm_up()
+
+        async def _async_window_refresh(_now) -> None:
+            await self.async_request_refresh()
+
+        self._unsub_window = [
+            async_track_point_in_time(
+                self.hass, _async_warm_up, window_start - WARM_UP_LEAD
+            ),
+            async_track_point_in_time(
+                self.hass, _async_window_refresh, window_start
+            ),
+        ]
+
+    def _adjust_update_interval(
+        self,
+        time_start,
+        time_end,
+    ) -> timedelta | None:
+        """Ajuste la fréquence selon la plage horaire."""
         interval_minutes = (
             self.update_interval_minutes
-            if in_fast_mode
+            if self._in_monitoring_window(time_start, time_end)
             else self.outside_interval_minutes
         )
 
@@ -156,15 +655,407 @@ class SncfUpdateCoordinator(DataUpdateCoordinator):
 
         return new_interval
 
+    def _calls_until_reset(
+        self,
+        time_start: str,
+        time_end: str,
+        now: datetime,
+        reset: datetime,
+    ) -> float:
+        """Estime les appels d'un trajet d'ici le renouvellement du quota."""
+        h_start, m_start = map(int, time_start.split(":"))
+        h_end, m_end = map(int, time_end.split(":"))
+
+        # Temps passé en mode rapide (plage et l'heure qui la précède)
+        fast = timedelta()
+
+        for days in (-1, 0, 1):
+            day = now + timedelta(days=days)
+            start = day.replace(hour=h_start, minute=m_start, second=0, microsecond=0)
+            end = day.replace(hour=h_end, minute=m_end, second=0, microsecond=0)
+
+            if end <= start:
+                end += timedelta(days=1)
+
+            overlap = min(end, reset) - max(start - timedelta(hours=1), now)
+
+            if overlap > timedelta():
+                fast += overlap
+
+        slow = reset - now - fast
+
+        return fast / timedelta(minutes=self.update_interval_minutes) + slow / (
+            timedelta(minutes=self.outside_interval_minutes)
+        )
+
+    def _route_intervals(self, now: datetime) -> dict[str, timedelta]:
+        """Intervalle de chaque trajet actif, étiré si le quota manque.
+
+        Les appels restants jusqu'au renouvellement du quota sont partagés
+        selon le poids de chaque trajet et la proximité de son prochain
+        départ.
+        """
+        intervals = {
+            subentry_id: self._adjust_update_interval(
+                entry.data[CONF_TIME_START],
+                entry.data[CONF_TIME_END],
+            )
+            for subentry_id, entry in self.entry.subentries.items()
+            if is_route_active(self.hass, entry.data)
+        }
+
+        self.budget_intervals = {}
+
+        if not intervals or not isinstance(self.api_client, SncfApiClient):
+            return intervals
+
+        reset = now.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(
+            days=1
+        )
+
+        demands = {}
+
+        for subentry_id, interval in intervals.items():
+            data = self.entry.subentries[subentry_id].data
+
+            demands[subentry_id] = RouteDemand(
+                interval=interval,
+                calls=self._calls_until_reset(
+                    data[CONF_TIME_START],
+                    data[CONF_TIME_END],
+                    now,
+                    reset,
+                ),
+                weight=data.get(CONF_WEIGHT, DEFAULT_WEIGHT),
+                next_departure=min(
+                    (
+                        entry.departure - now
+                        for entry in self.timeline.route(subentry_id)
+                        if entry.departure >= now and not entry.is_cancelled
+                    ),
+                    default=None,
+                ),
+            )
+
+        allocated = allocate_intervals(
+            demands,
+            self.api_client.remaining_calls(),
+            reset - now,
+        )
+
+        self.budget_intervals = {
+            subentry_id: interval
+            for subentry_id, interval in allocated.items()
+            if interval != intervals[subentry_id]
+        }
+
+        if self.budget_intervals:
+            _LOGGER.debug(
+                "Quota insuffisant, intervalles étirés : %s",
+                {
+                    subentry_id: interval.total_seconds() / 60
+                    for subentry_id, interval in self.budget_intervals.items()
+                },
+            )
+
+        return allocated
+
+    @staticmethod
+    def _route_offsets(subentry_ids) -> dict[str, float]:
+        """Retourne le décalage de chaque trajet dans l'intervalle (0 à 1).
+
+        Les trajets sont ordonnés par le crc32 de leur identifiant : le même
+        trajet garde la même part d'un redémarrage à l'autre.
+        """
+        hashes = {
+            subentry_id: zlib.crc32(subentry_id.encode())
+            for subentry_id in subentry_ids
+        }
+        ordered = sorted(
+            hashes,
+            key=lambda subentry_id: (hashes[subentry_id], subentry_id),
+        )
+
+        return {
+            subentry_id: (rank + 1 + REFRESH_JITTER * hashes[subentry_id] / 2**32)
+            / len(ordered)
+            for rank, subentry_id in enumerate(ordered)
+        }
+
+    def _route_is_due(
+        self,
+        subentry_id: str,
+        interval: timedelta,
+        now: datetime,
+    ) -> bool:
+        """Indique si le trajet doit être rafraîchi à ce passage."""
+        due = self._refresh_due.get(subentry_id)
+
+        if due is None or not self.data:
+            return True
+
+        # Tolérance d'un demi-passage pour ne pas sauter une part
+        tolerance = (self.update_interval or MIN_REFRESH_TICK) / 2
+
+        return now >= self._rescaled_due(due, interval) - tolerance
+
+    @staticmethod
+    def _rescaled_due(
+        due: tuple[datetime, timedelta],
+        interval: timedelta,
+    ) -> datetime:
+        """Échéance recalculée depuis le dernier rafraîchissement prévu."""
+        return due[0] - due[1] + interval
+
+    def _schedule_route(
+        self,
+        subentry_id: str,
+        interval: timedelta,
+        now: datetime,
+        offset: float,
+    ) -> None:
+        """Fixe le prochain rafraîchissement du trajet.
+
+        Le rythme est conservé d'un intervalle à l'autre, même quand
+        l'intervalle change ; un nouveau trajet ou un retard d'un
+        intervalle entier le recale sur sa part de l'intervalle.
+        """
+        due = self._refresh_due.get(subentry_id)
+
+        if (
+            due is not None
+            and (current := self._rescaled_due(due, interval)) + interval > now
+        ):
+            next_due = current + interval
+        else:
+            next_due = now + interval * offset
+
+        self._refresh_due[subentry_id] = (next_due, interval)
+
+    def _assign_slots(
+        self,
+        subentry_id: str,
+        journeys: list[dict[str, Any]],
+        train_count: int,
+    ) -> None:
+        """Attribue les trains affichés aux emplacements des capteurs.
+
+        Un train déjà affiché conserve son emplacement tant qu'il reste dans
+        la liste ; seuls les emplacements libérés (train parti) reçoivent un
+        nouveau train. Les capteurs dont le train n'a pas changé n'écrivent
+        donc pas de nouvel état.
+        """
+        by_key: dict[str, dict[str, Any]] = {}
+
+        for journey in journeys[:train_count]:
+            by_key.setdefault(get_journey_key(journey), journey)
+
+        previous = self.slots.get(subentry_id, [])
+
+        slots: list[str | None] = [
+            key if key in by_key else None for key in previous[:train_count]
+        ]
+        slots.extend([None] * (train_count - len(slots)))
+
+        assigned = {key for key in slots if key is not None}
+        free_slots = (idx for idx, key in enumerate(slots) if key is None)
+
+        for key in by_key:
+            if key not in assigned:
+                slots[next(free_slots)] = key
+
+        self.slots[subentry_id] = slots
+        self._journeys_by_key[subentry_id] = by_key
+
+    def get_slot_journey(self, subentry_id: str, slot: int) -> dict[str, Any] | None:
+        """Retourne le journey attribué à un emplacement, s'il existe."""
+        slots = self.slots.get(subentry_id, [])
+
+        if slot >= len(slots) or slots[slot] is None:
+            return None
+
+        return self._journeys_by_key.get(subentry_id, {}).get(slots[slot])
+
+    def get_slot_entry(self, subentry_id: str, slot: int) -> TimelineEntry | None:
+        """Retourne le train attribué à un emplacement, dates déjà analysées."""
+        slots = self.slots.get(subentry_id, [])
+
+        if slot >= len(slots) or slots[slot] is None:
+            return None
+
+        return next(
+            (
+                entry
+                for entry in self.timeline.route(subentry_id)
+                if entry.key == slots[slot]
+            ),
+            None,
+        )
+
+    async def _async_base_schedule(
+        self,
+        subentry_id: str,
+        departure: str,
+        arrival: str,
+        dt_start: datetime,
+        train_count: int,
+        timeframe_duration: int,
+    ) -> list[dict[str, Any]] | None:
+        """Retourne les trains théoriques de la plage, None si indisponibles.
+
+        Sans GTFS local, ils sont demandés à l'API une seule fois par date
+        de plage puis conservés (y compris après un redémarrage).
+        """
+        if self.timetable is not None:
+            return self.timetable.next_trains(
+                departure,
+                arrival,
+                dt_start,
+                count=train_count,
+            )
+
+        window_date = dt_start.strftime("%Y%m%d")
+
+        if (cached := self.base_schedule.get(subentry_id, window_date)) is not None:
+            self.metrics.base_schedule_cache.inc("hit")
+            return cached
+
+        self.metrics.base_schedule_cache.inc("miss")
+
+        fetch_base_schedule = getattr(self.api_client, "fetch_base_schedule", None)
+
+        if fetch_base_schedule is None:
+            return None
+
+        try:
+            journeys = await fetch_base_schedule(
+                departure,
+                arrival,
+                dt_start.strftime("%Y%m%dT%H%M%S"),
+                count=train_count,
+                timeframe_duration=timeframe_duration,
+                max_pages=MAX_JOURNEY_PAGES,
+            )
+        except (ClientError, asyncio.TimeoutError, RuntimeError) as err:
+            _LOGGER.debug("Horaires théoriques indisponibles : %s", err)
+            return None
+
+        if not isinstance(journeys, list):
+            return None
+
+        journeys = [journey for journey in journeys if isinstance(journey, dict)]
+        self.base_schedule.async_set(subentry_id, window_date, journeys)
+
+        return journeys
+
+    def _has_imminent_departure(self, subentry_id: str, now: datetime) -> bool:
+        """Indique si un train du trajet part dans l'horizon de suivi."""
+        horizon = self.tracking_horizon or timedelta(minutes=DEFAULT_TRACKING_HORIZON)
+
+        return any(
+            now <= entry.departure <= now + horizon
+            for entry in self.timeline.route(subentry_id)
+        )
+
+    async def _async_track_imminent(
+        self,
+        subentry_id: str,
+    ) -> list[dict[str, Any]] | None:
+        """Actualise les trains imminents par leur vehicle journey.
+
+        Retourne les trains de la dernière recherche, ceux partant dans
+        l'horizon de suivi mis à jour ; None quand une recherche complète
+        est nécessaire (recherche trop ancienne, rien ou trop à suivre,
+        train introuvable).
+        """
+        fetch_vehicle_journey = getattr(self.api_client, "fetch_vehicle_journey", None)
+        last_search = self._last_search.get(subentry_id)
+        now = dt_util.now()
+
+        if (
+            fetch_vehicle_journey is None
+            or not self.tracking_horizon
+            or last_search is None
+            or now - last_search[0] > DISCOVERY_INTERVAL
+        ):
+            return None
+
+        searched_at, journeys = last_search
+
+        imminent = []
+
+        for index, journey in enumerate(journeys):
+            departure = parse_datetime(journey.get("departure_date_time", ""))
+
+            if (
+                departure is not None
+                and now <= departure <= now + self.tracking_horizon
+            ):
+                imminent.append(index)
+
+        if not imminent or len(imminent) > MAX_TRACKED_TRAINS:
+            return None
+
+        tracked = JourneyList(journeys, list(getattr(journeys, "disruptions", [])))
+
+        for index in imminent:
+            vehicle_journey_id = get_vehicle_journey_id(journeys[index])
+
+            if vehicle_journey_id is None:
+                return None
+
+            try:
+                vehicle_journey = await fetch_vehicle_journey(vehicle_journey_id)
+            except (ClientError, asyncio.TimeoutError, RuntimeError) as err:
+                _LOGGER.debug("Suivi du train impossible : %s", err)
+                return None
+
+            if vehicle_journey is None:
+                return None
+
+            updated = apply_vehicle_journey(journeys[index], vehicle_journey)
+
+            if updated is None:
+                return None
+
+            tracked[index] = updated
+            tracked.disruptions = merge_disruptions(
+                tracked.disruptions, vehicle_journey.get("disruptions", [])
+            )
+
+        _LOGGER.debug(
+            "%d train(s) imminent(s) suivi(s) sans nouvelle recherche",
+            len(imminent),
+        )
+
+        self._last_search[subentry_id] = (searched_at, tracked)
+
+        return tracked
+
     async def _async_update_data(self) -> dict[str, Any]:
         """Récupère les données de l'API SNCF."""
 
         if not self.entry.subentries:
             _LOGGER.warning("Pas de subentries configurés")
+            self.timeline = Timeline()
             return {}
 
         update_intervals = []
         trains = {}
+        inactive_routes = set()
+
+        now = dt_util.now()
+        offsets = self._route_offsets(self.entry.subentries)
+        intervals = self._route_intervals(now)
+
+        if isinstance(self.api_client, GtfsRealtimeClient) and intervals:
+            # Trajets échelonnés sur l'intervalle : un seul téléchargement du
+            # flux pour tous, renouvelé quand le plus rapide redevient dû
+            tolerance = (self.update_interval or MIN_REFRESH_TICK) / 2
+            self.api_client.max_age = max(
+                FEED_MAX_AGE,
+                (min(intervals.values()) - tolerance).total_seconds(),
+            )
 
         max_retries = 3
         retry_delay = 2
@@ -175,19 +1066,82 @@ class SncfUpdateCoordinator(DataUpdateCoordinator):
                 entry.title,
             )
 
+            # ---------------------------------------------------------
+            # Trajet suspendu par ses entités : dernières données
+            # conservées, aucun appel API
+            # ---------------------------------------------------------
+            if not is_route_active(self.hass, entry.data):
+                _LOGGER.debug("Trajet '%s' suspendu", entry.title)
+                inactive_routes.add(subentry_id)
+                self._refresh_due.pop(subentry_id, None)
+
+                if self.data and subentry_id in self.data:
+                    trains[subentry_id] = self.data[subentry_id]
+
+                continue
+
             departure = entry.data[CONF_FROM]
             arrival = entry.data[CONF_TO]
             time_start = entry.data[CONF_TIME_START]
             time_end = entry.data[CONF_TIME_END]
 
-            update_intervals.append(
-                self._adjust_update_interval(
-                    time_start,
-                    time_end,
-                )
+            route_interval = intervals.get(
+                subentry_id
+            ) or self._adjust_update_interval(
+                time_start,
+                time_end,
             )
+            update_intervals.append(route_interval)
 
-            datetime_str = self._build_datetime_param(
+            # ---------------------------------------------------------
+            # Trajet pas encore dû : données conservées jusqu'à sa part
+            # de l'intervalle
+            # ---------------------------------------------------------
+            if not self._route_is_due(subentry_id, route_interval, now):
+                if subentry_id in self.data:
+                    trains[subentry_id] = self.data[subentry_id]
+
+                continue
+
+            self._schedule_route(
+                subentry_id,
+                route_interval,
+                now,
+                offsets[subentry_id],
+            )
+
+            dt_start = self._build_datetime(
+                time_start,
+                time_end,
+            )
+            train_count = entry.data.get(CONF_TRAIN_COUNT, DEFAULT_TRAIN_COUNT)
+
+            timeframe_duration = self._window_duration(time_start, time_end)
+
+            # Plage commencée : le temps réel part de maintenant, pour que
+            # les trains déjà partis n'occupent ni les places ni les pages
+            search_start, search_duration = self._search_range(
+                dt_start, timeframe_duration, now
+            )
+            datetime_str = search_start.strftime("%Y%m%dT%H%M%S")
+
+            # ---------------------------------------------------------
+            # Horaires théoriques : GTFS local ou cache du jour
+            # ---------------------------------------------------------
+            base_journeys = await self._async_base_schedule(
+                subentry_id,
+                departure,
+                arrival,
+                dt_start,
+                train_count,
+                timeframe_duration,
+            )
+
+            # ---------------------------------------------------------
+            # Hors plage horaire, les horaires théoriques suffisent : le
+            # temps réel n'a d'intérêt qu'en plage.
+            # ---------------------------------------------------------
+            use_api = base_journeys is None or self._in_monitoring_window(
                 time_start,
                 time_end,
             )
@@ -195,16 +1149,35 @@ class SncfUpdateCoordinator(DataUpdateCoordinator):
             journeys = None
 
             # ---------------------------------------------------------
-            # Appel API avec retry
+            # Trains imminents : suivi par vehicle journey, sans
+            # nouvelle recherche
             # ---------------------------------------------------------
-            for attempt in range(1, max_retries + 1):
+            if use_api:
+                journeys = await self._async_track_imminent(subentry_id)
+
+            full_search = use_api and journeys is None
+
+            # Un trajet dont un train part bientôt passe avant les autres
+            priority = (
+                Priority.IMMINENT
+                if self._has_imminent_departure(subentry_id, now)
+                else Priority.ROUTINE
+            )
+
+            # ---------------------------------------------------------
+            # Appel API temps réel avec retry
+            # ---------------------------------------------------------
+            for attempt in range(1, (max_retries if full_search else 0) + 1):
                 try:
-                    journeys = await self.api_client.fetch_journeys(
-                        departure,
-                        arrival,
-                        datetime_str,
-                        count=10,
-                    )
+                    with request_priority(priority):
+                        journeys = await self.api_client.fetch_journeys(
+                            departure,
+                            arrival,
+                            datetime_str,
+                            count=train_count,
+                            timeframe_duration=search_duration,
+                            max_pages=MAX_JOURNEY_PAGES,
+                        )
 
                     if journeys is not None:
                         break
@@ -223,8 +1196,28 @@ class SncfUpdateCoordinator(DataUpdateCoordinator):
                     )
 
                 if attempt < max_retries:
+                    self.metrics.refresh_retries.inc(subentry_id)
                     await asyncio.sleep(retry_delay)
 
+            if full_search and isinstance(journeys, list):
+                self._last_search[subentry_id] = (dt_util.now(), journeys)
+
+            if base_journeys is not None:
+                if journeys is None:
+                    if use_api:
+                        _LOGGER.warning(
+                            "Temps réel indisponible pour le trajet '%s' : "
+                            "horaires théoriques utilisés",
+                            entry.title,
+                        )
+
+                    journeys = base_journeys
+
+                elif isinstance(journeys, list):
+                    journeys = merge_realtime(
+                        base_journeys, journeys, since=datetime_str
+                    )
+
             # ---------------------------------------------------------
             # Vérification de la réponse API
             # ---------------------------------------------------------
@@ -233,6 +1226,8 @@ class SncfUpdateCoordinator(DataUpdateCoordinator):
                     "Aucune donnée reçue de l'API SNCF pour le trajet '%s'",
                     entry.title,
                 )
+                self._journeys_by_key.pop(subentry_id, None)
+                self.timeline.remove_route(subentry_id)
                 continue
 
             _LOGGER.debug(
@@ -264,7 +1259,9 @@ class SncfUpdateCoordinator(DataUpdateCoordinator):
                     continue
 
                 if journey.get("nb_transfers", 0) == 0:
-                    filtered_journeys.append(journey)
+                    # Copie : le statut ne doit pas s'écrire dans les
+                    # horaires théoriques en cache ni dans la recherche gardée
+                    filtered_journeys.append(dict(journey))
 
             _LOGGER.debug(
                 "Trajet '%s' : %d journey(s) conservé(s) après filtrage "
@@ -273,13 +1270,72 @@ class SncfUpdateCoordinator(DataUpdateCoordinator):
                 len(filtered_journeys),
             )
 
+            # Statut (supprimé, retardé...) tiré des perturbations déjà
+            # présentes dans la réponse
+            apply_disruptions(
+                filtered_journeys,
+                getattr(journeys, "disruptions", []),
+            )
+
             trains[subentry_id] = filtered_journeys
+            self.timeline.update_route(subentry_id, filtered_journeys)
+
+            self._assign_slots(
+                subentry_id,
+                filtered_journeys,
+                train_count,
+            )
+
+        self.inactive_routes = inactive_routes
+
+        active_subentries = [
+            entry
+            for subentry_id, entry in self.entry.subentries.items()
+            if subentry_id not in inactive_routes
+        ]
+
+        # Connexion préparée avant la prochaine plage horaire
+        if isinstance(self.api_client, SncfApiClient) and active_subentries:
+            self._schedule_window_start(
+                min(
+                    self._next_window_start(entry.data[CONF_TIME_START])
+                    for entry in active_subentries
+                )
+            )
+        else:
+            self._cancel_window_timers()
+
+        # Trajets supprimés depuis le dernier rafraîchissement
+        for subentry_id in self.timeline.routes - set(self.entry.subentries):
+            self.timeline.remove_route(subentry_id)
+
+        for subentry_id in self.base_schedule.routes - set(self.entry.subentries):
+            self.base_schedule.async_remove(subentry_id)
+
+        for subentry_id in set(self._last_search) - set(self.entry.subentries):
+            del self._last_search[subentry_id]
+
+        for subentry_id in set(self._refresh_due) - set(self.entry.subentries):
+            del self._refresh_due[subentry_id]
+
+        self.connections = scan_connections(
+            self.timeline,
+            {
+                subentry_id: (entry.data[CONF_FROM], entry.data[CONF_TO])
+                for subentry_id, entry in self.entry.subentries.items()
+            },
+            self.transfer_time,
+        )
 
         # -------------------------------------------------------------
         # Mise à jour de l'intervalle
         # -------------------------------------------------------------
         if update_intervals:
-            new_interval = min(update_intervals)
+            # Un passage par trajet actif et par intervalle
+            new_interval = max(
+                min(update_intervals) / len(update_intervals),
+                MIN_REFRESH_TICK,
+            )
 
             if self.update_interval != new_interval:
                 self.update_interval = new_interval
@@ -289,4 +1345,11 @@ class SncfUpdateCoordinator(DataUpdateCoordinator):
                     self.update_interval.total_seconds() / 60,
                 )
 
+        # Tous les trajets suspendus : plus de rafraîchissement périodique,
+        # la reprise est déclenchée par les entités
+        elif self.update_interval is not None:
+            self.update_interval = None
+
+            _LOGGER.debug("Tous les trajets sont suspendus")
+
         return trains
@@ -9,6 +9,7 @@ from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_registry import async_redact_data
 
 from .const import (
+    CONF_ADDITIONAL_API_KEYS,
     CONF_API_KEY,
     CONF_FROM,
     CONF_TIME_END,
@@ -19,7 +20,12 @@ from .const import (
 from .helpers import get_train_num
 
 
-TO_REDACT = {CONF_API_KEY}
+TO_REDACT = {CONF_API_KEY, CONF_ADDITIONAL_API_KEYS}
+
+
+def _round_duration(duration: float | None) -> float | None:
+    """Round a duration in seconds for display."""
+    return None if duration is None else round(duration, 3)
 
 
 async def async_get_config_entry_diagnostics(
@@ -86,8 +92,57 @@ async def async_get_config_entry_diagnostics(
         ),
         "subentries_count": len(entry.subentries),
         "data_subentries_count": len(coordinator_data),
+        "fast_startup": getattr(coordinator, "fast_startup", None),
+        "inactive_routes": sorted(getattr(coordinator, "inactive_routes", ())),
+        "budget_intervals_minutes": {
+            subentry_id: interval.total_seconds() / 60
+            for subentry_id, interval in getattr(
+                coordinator, "budget_intervals", {}
+            ).items()
+        },
+        "connections_count": len(getattr(coordinator, "connections", ())),
+        "profiling_refreshes_left": (
+            profiler.remaining
+            if (profiler := getattr(coordinator, "profiler", None)) is not None
+            else None
+        ),
+        "last_profile": getattr(coordinator, "last_profile", None),
+        "setup_duration_seconds": _round_duration(
+            getattr(coordinator, "setup_duration", None)
+        ),
+        "first_refresh_duration_seconds": _round_duration(
+            getattr(coordinator, "first_refresh_duration", None)
+        ),
     }
 
+    # -----------------------------------------------------------------
+    # Utilisation des clés API (sans les clés elles-mêmes)
+    # -----------------------------------------------------------------
+    api_client = getattr(coordinator, "api_client", None)
+
+    if api_client is not None:
+        data["api_keys"] = api_client.key_stats()
+
+        connection_stats = getattr(api_client, "connection_stats", None)
+
+        if connection_stats is not None:
+            data["connection"] = {
+                **connection_stats.as_dict(),
+                "next_window_start": str(
+                    getattr(coordinator, "next_window_start", None)
+                ),
+            }
+
+        scheduler = getattr(api_client, "scheduler", None)
+
+        if scheduler is not None:
+            data["request_scheduler"] = scheduler.as_dict()
+
+        recorder = getattr(api_client, "recorder", None)
+
+        if recorder is not None:
+            data["traffic_recorder"] = recorder.as_dict()
+
     # -----------------------------------------------------------------
     # Diagnostic de chaque trajet configuré
     # -----------------------------------------------------------------
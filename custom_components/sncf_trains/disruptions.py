@@ -0,0 +1,170 @@
+"""Train status from the disruptions of the journeys response.
+
+Navitia returns the disruptions of the journeys in the same response, as a
+top-level ``disruptions`` array referenced by the sections links. They are
+indexed once per response, then each disrupted or late journey gets a
+``train_status`` and a ``disruption_message`` without any extra API call.
+"""
+
+from collections.abc import Iterable
+from typing import Any
+
+from .helpers import get_delay_minutes, get_transport_section
+
+STATUS_ON_TIME = "on_time"
+STATUS_DELAYED = "delayed"
+STATUS_MODIFIED = "modified"
+STATUS_DETOURED = "detoured"
+STATUS_CANCELLED = "cancelled"
+
+# Du moins grave au plus grave
+_SEVERITY = (
+    STATUS_ON_TIME,
+    STATUS_MODIFIED,
+    STATUS_DELAYED,
+    STATUS_DETOURED,
+    STATUS_CANCELLED,
+)
+
+# Effets Navitia (GTFS-RT) -> statut du train
+_EFFECT_STATUS = {
+    "NO_SERVICE": STATUS_CANCELLED,
+    "SIGNIFICANT_DELAYS": STATUS_DELAYED,
+    "DETOUR": STATUS_DETOURED,
+    "REDUCED_SERVICE": STATUS_MODIFIED,
+    "MODIFIED_SERVICE": STATUS_MODIFIED,
+    "ADDITIONAL_SERVICE": STATUS_MODIFIED,
+    "STOP_MOVED": STATUS_MODIFIED,
+    "OTHER_EFFECT": STATUS_MODIFIED,
+}
+
+
+def _most_severe(*statuses: str) -> str:
+    """Return the most severe of several statuses."""
+    return max(statuses, key=_SEVERITY.index)
+
+
+def index_disruptions(
+    disruptions: Iterable[dict[str, Any]],
+) -> dict[str, list[dict[str, Any]]]:
+    """Index disruptions by their ids and by the ids of impacted objects."""
+    index: dict[str, list[dict[str, Any]]] = {}
+
+    for disruption in disruptions:
+        if not isinstance(disruption, dict):
+            continue
+
+        ids = {disruption.get("id"), disruption.get("disruption_id")}
+
+        for impacted in disruption.get("impacted_objects", []):
+            ids.add(impacted.get("pt_object", {}).get("id"))
+
+        for object_id in ids - {None}:
+            index.setdefault(object_id, []).append(disruption)
+
+    return index
+
+
+def _section_links(section: dict[str, Any]) -> set[str]:
+    """Return the ids linked to a section (disruptions, vehicle journey)."""
+    display_informations = section.get("display_informations", {})
+
+    if not isinstance(display_informations, dict):
+        display_informations = {}
+
+    return {
+        link["id"]
+        for link in [
+            *section.get("links", []),
+            *display_informations.get("links", []),
+        ]
+        if isinstance(link, dict) and "id" in link
+    }
+
+
+def _disruption_status(
+    disruption: dict[str, Any],
+    section: dict[str, Any],
+) -> str:
+    """Return the status of the train of a section for one disruption."""
+    effect = disruption.get("severity", {}).get("effect")
+    status = _EFFECT_STATUS.get(effect, STATUS_ON_TIME)
+
+    if status == STATUS_CANCELLED:
+        return status
+
+    # Suppression partielle : notre gare de départ ou d'arrivée n'est plus
+    # desservie.
+    from_id = section.get("from", {}).get("id")
+    to_id = section.get("to", {}).get("id")
+
+    for impacted in disruption.get("impacted_objects", []):
+        for stop in impacted.get("impacted_stops", []):
+            stop_id = stop.get("stop_point", {}).get("id")
+
+            if (stop_id == from_id and stop.get("departure_status") == "deleted") or (
+                stop_id == to_id and stop.get("arrival_status") == "deleted"
+            ):
+                return STATUS_CANCELLED
+
+    return status
+
+
+def _disruption_message(disruption: dict[str, Any]) -> str | None:
+    """Return the first message of a disruption."""
+    for message in disruption.get("messages", []):
+        if isinstance(message, dict) and message.get("text"):
+            return message["text"]
+
+    return disruption.get("severity", {}).get("name")
+
+
+def apply_disruptions(
+    journeys: Iterable[dict[str, Any]],
+    disruptions: Iterable[dict[str, Any]],
+) -> None:
+    """Set ``train_status`` and ``disruption_message`` on disrupted journeys."""
+    index = index_disruptions(disruptions)
+
+    for journey in journeys:
+        section = get_transport_section(journey)
+        status = _EFFECT_STATUS.get(journey.get("status", ""), STATUS_ON_TIME)
+        message = None
+
+        seen: set[int] = set()
+
+        for link_id in _section_links(section):
+            for disruption in index.get(link_id, []):
+                if id(disruption) in seen:
+                    continue
+                seen.add(id(disruption))
+
+                disruption_status = _disruption_status(disruption, section)
+
+                if disruption_status == STATUS_ON_TIME:
+                    continue
+
+                # Message de la perturbation la plus grave
+                if message is None or _SEVERITY.index(
+                    disruption_status
+                ) > _SEVERITY.index(status):
+                    message = _disruption_message(disruption)
+
+                status = _most_severe(status, disruption_status)
+
+        if status == STATUS_ON_TIME and get_delay_minutes(journey) > 0:
+            status = STATUS_DELAYED
+
+        # Un train à l'heure garde son journey tel que reçu
+        if status == STATUS_ON_TIME:
+            journey.pop("train_status", None)
+            journey.pop("disruption_message", None)
+            continue
+
+        journey["train_status"] = status
+        journey["disruption_message"] = message
+
+
+def get_train_status(journey: dict[str, Any]) -> str:
+    """Return the status set by apply_disruptions."""
+    return journey.get("train_status", STATUS_ON_TIME)
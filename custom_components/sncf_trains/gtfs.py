@@ -0,0 +1,544 @@
+"""Offline GTFS timetable for scheduled departures.
+
+The static SNCF timetable is loaded from a local GTFS zip into flat integer
+arrays (stop_times sorted by trip, plus a per-stop index sorted by
+departure, and the service calendars as date ranges, weekday masks and
+exception dates). The arrays are cached in a binary file next to the zip and
+memory-mapped on the next loads, so answering "next direct trains from A to
+B after T" is a few bisections, without any API call.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import logging
+import mmap
+import os
+import re
+import zipfile
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterator
+from datetime import date, datetime, timedelta
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+CACHE_VERSION = 3
+NAVITIA_DATETIME_FORMAT = "%Y%m%dT%H%M%S"
+
+# Calendriers des services : plage de dates, jours de la semaine, exceptions
+_SERVICE_ARRAYS = (
+    "service_start",
+    "service_end",
+    "service_weekdays",
+    "exception_offsets",
+    "exception_dates",
+    "exception_added",
+)
+
+# Tableaux d'entiers 32 bits stockés dans le cache binaire
+_ARRAYS = (
+    "st_trip",
+    "st_sequence",
+    "st_stop",
+    "st_arrival",
+    "st_departure",
+    "trip_offsets",
+    "trip_services",
+    "dep_order",
+    "stop_offsets",
+    *_SERVICE_ARRAYS,
+)
+
+_WEEKDAYS = (
+    "monday",
+    "tuesday",
+    "wednesday",
+    "thursday",
+    "friday",
+    "saturday",
+    "sunday",
+)
+
+_UIC_RE = re.compile(r"(\d{7,8})\D*$")
+
+
+def uic_code(stop_id: str) -> str | None:
+    """Return the UIC code ending a Navitia or GTFS SNCF stop id."""
+    match = _UIC_RE.search(stop_id)
+    return match.group(1) if match else None
+
+
+def _parse_gtfs_time(value: str) -> int:
+    """Convert a GTFS HH:MM:SS time (may exceed 24:00) to seconds."""
+    hours, minutes, seconds = (int(part) for part in value.strip().split(":"))
+    return hours * 3600 + minutes * 60 + seconds
+
+
+def _read_csv(archive: zipfile.ZipFile, name: str) -> Iterator[dict[str, str]]:
+    """Iterate over the rows of a GTFS file, nothing if it is missing."""
+    if name not in archive.namelist():
+        return
+
+    with archive.open(name) as raw:
+        yield from csv.DictReader(io.TextIOWrapper(raw, encoding="utf-8-sig"))
+
+
+def _service_calendars(
+    archive: zipfile.ZipFile,
+) -> tuple[list[str], dict[str, array]]:
+    """Return the service ids and their calendars as integer arrays.
+
+    A service runs between two dates (YYYYMMDD) on the days of its weekday
+    mask (bit 0 for monday). Its calendar_dates exceptions follow, sorted
+    by date, with 1 for an added date and 0 for a removed one.
+    """
+    ranges: dict[str, tuple[int, int, int]] = {}
+    for row in _read_csv(archive, "calendar.txt"):
+        mask = sum(
+            1 << weekday for weekday, name in enumerate(_WEEKDAYS) if row[name] == "1"
+        )
+        ranges[row["service_id"]] = (
+            int(row["start_date"]),
+            int(row["end_date"]),
+            mask,
+        )
+
+    exceptions: dict[str, dict[int, int]] = {}
+    for row in _read_csv(archive, "calendar_dates.txt"):
+        exceptions.setdefault(row["service_id"], {})[int(row["date"])] = int(
+            row["exception_type"] == "1"
+        )
+
+    service_ids = list(dict.fromkeys([*ranges, *exceptions]))
+    arrays = {name: array("i") for name in _SERVICE_ARRAYS}
+    arrays["exception_offsets"].append(0)
+
+    for service_id in service_ids:
+        # Service défini uniquement par calendar_dates : aucune plage
+        start, end, mask = ranges.get(service_id, (0, 0, 0))
+        arrays["service_start"].append(start)
+        arrays["service_end"].append(end)
+        arrays["service_weekdays"].append(mask)
+
+        dates = exceptions.get(service_id, {})
+        for day in sorted(dates):
+            arrays["exception_dates"].append(day)
+            arrays["exception_added"].append(dates[day])
+        arrays["exception_offsets"].append(len(arrays["exception_dates"]))
+
+    return service_ids, arrays
+
+
+class GtfsTimetable:
+    """Array-backed static timetable answering direct train queries."""
+
+    def __init__(
+        self,
+        tables: dict[str, Any],
+        arrays: dict[str, Any],
+        mapped: mmap.mmap | None = None,
+    ) -> None:
+        """Initialize from the string tables and the integer arrays."""
+        self.stop_ids: list[str] = tables["stop_ids"]
+        self.stop_names: list[str] = tables["stop_names"]
+        self.trip_ids: list[str] = tables["trip_ids"]
+        self.trip_numbers: list[str] = tables["trip_numbers"]
+        self.trip_modes: list[str] = tables["trip_modes"]
+
+        self._stop_index = {stop_id: idx for idx, stop_id in enumerate(self.stop_ids)}
+        self._trip_index = {trip_id: idx for idx, trip_id in enumerate(self.trip_ids)}
+        self._uic_index: dict[str, list[int]] = {}
+        for idx, stop_id in enumerate(self.stop_ids):
+            if code := uic_code(stop_id):
+                self._uic_index.setdefault(code, []).append(idx)
+
+        self.st_trip = arrays["st_trip"]
+        self.st_sequence = arrays["st_sequence"]
+        self.st_stop = arrays["st_stop"]
+        self.st_arrival = arrays["st_arrival"]
+        self.st_departure = arrays["st_departure"]
+        self.trip_offsets = arrays["trip_offsets"]
+        self.trip_services = arrays["trip_services"]
+        self.dep_order = arrays["dep_order"]
+        self.stop_offsets = arrays["stop_offsets"]
+        self.service_start = arrays["service_start"]
+        self.service_end = arrays["service_end"]
+        self.service_weekdays = arrays["service_weekdays"]
+        self.exception_offsets = arrays["exception_offsets"]
+        self.exception_dates = arrays["exception_dates"]
+        self.exception_added = arrays["exception_added"]
+
+        self._mapped = mapped
+
+    # -----------------------------------------------------------------
+    # Chargement
+    # -----------------------------------------------------------------
+
+    @classmethod
+    def load(cls, zip_path: str) -> GtfsTimetable:
+        """Load a GTFS zip, through its memory-mapped cache when up to date.
+
+        Blocking: run it in an executor.
+        """
+        cache_path = f"{zip_path}.idx"
+        stat = os.stat(zip_path)
+        signature = [CACHE_VERSION, stat.st_size, int(stat.st_mtime)]
+
+        try:
+            return cls._load_cache(cache_path, signature)
+        except (OSError, ValueError, KeyError):
+            _LOGGER.debug("Cache GTFS absent ou périmé : %s", cache_path)
+
+        tables, arrays = cls._parse_zip(zip_path)
+
+        try:
+            cls._write_cache(cache_path, signature, tables, arrays)
+            return cls._load_cache(cache_path, signature)
+        except OSError as err:
+            _LOGGER.warning("Impossible d'écrire le cache GTFS %s : %s", cache_path, err)
+
+        return cls(tables, arrays)
+
+    @staticmethod
+    def _parse_zip(zip_path: str) -> tuple[dict[str, Any], dict[str, array]]:
+        """Parse the GTFS files into string tables and integer arrays."""
+        with zipfile.ZipFile(zip_path) as archive:
+            service_ids, arrays = _service_calendars(archive)
+            service_index = {sid: idx for idx, sid in enumerate(service_ids)}
+
+            stop_ids: list[str] = []
+            stop_names: list[str] = []
+            stop_index: dict[str, int] = {}
+            for row in _read_csv(archive, "stops.txt"):
+                stop_index[row["stop_id"]] = len(stop_ids)
+                stop_ids.append(row["stop_id"])
+                stop_names.append(row.get("stop_name", ""))
+
+            route_modes = {
+                row["route_id"]: row.get("route_short_name", "")
+                for row in _read_csv(archive, "routes.txt")
+            }
+
+            trip_ids: list[str] = []
+            trip_numbers: list[str] = []
+            trip_modes: list[str] = []
+            trip_services = array("i")
+            trip_index: dict[str, int] = {}
+            for row in _read_csv(archive, "trips.txt"):
+                if row["service_id"] not in service_index:
+                    continue
+                trip_index[row["trip_id"]] = len(trip_ids)
+                trip_ids.append(row["trip_id"])
+                # SNCF : le numéro du train est dans trip_headsign
+                trip_numbers.append(
+                    row.get("trip_short_name") or row.get("trip_headsign", "")
+                )
+                trip_modes.append(route_modes.get(row.get("route_id", ""), ""))
+                trip_services.append(service_index[row["service_id"]])
+
+            # Colonnes d'entiers, sans tuple par ligne
+            trips = array("i")
+            sequences = array("i")
+            stops = array("i")
+            arrivals = array("i")
+            departures = array("i")
+            for row in _read_csv(archive, "stop_times.txt"):
+                trip = trip_index.get(row["trip_id"])
+                stop = stop_index.get(row["stop_id"])
+                if trip is None or stop is None:
+                    continue
+                trips.append(trip)
+                sequences.append(int(row["stop_sequence"]))
+                stops.append(stop)
+                arrivals.append(_parse_gtfs_time(row["arrival_time"]))
+                departures.append(_parse_gtfs_time(row["departure_time"]))
+
+        # Tri par trip puis stop_sequence, sur une clé entière
+        span = max(sequences, default=0) + 1
+        order = sorted(
+            range(len(trips)), key=lambda pos: trips[pos] * span + sequences[pos]
+        )
+
+        arrays["st_trip"] = array("i", (trips[pos] for pos in order))
+        arrays["st_sequence"] = array("i", (sequences[pos] for pos in order))
+        arrays["st_stop"] = array("i", (stops[pos] for pos in order))
+        arrays["st_arrival"] = array("i", (arrivals[pos] for pos in order))
+        arrays["st_departure"] = array("i", (departures[pos] for pos in order))
+        arrays["trip_services"] = trip_services
+        del order, trips, sequences, stops, arrivals, departures
+
+        # Position du premier arrêt de chaque trip (tableau de n_trips + 1)
+        trip_offsets = arrays["trip_offsets"] = array("i", [0] * (len(trip_ids) + 1))
+        for trip in arrays["st_trip"]:
+            trip_offsets[trip + 1] += 1
+        for idx in range(len(trip_ids)):
+            trip_offsets[idx + 1] += trip_offsets[idx]
+
+        # Index des départs par arrêt, triés par heure de départ
+        st_stop = arrays["st_stop"]
+        st_departure = arrays["st_departure"]
+        span = max(st_departure, default=0) + 1
+        arrays["dep_order"] = array(
+            "i",
+            sorted(
+                range(len(st_stop)),
+                key=lambda pos: st_stop[pos] * span + st_departure[pos],
+            ),
+        )
+
+        stop_offsets = arrays["stop_offsets"] = array("i", [0] * (len(stop_ids) + 1))
+        for stop in st_stop:
+            stop_offsets[stop + 1] += 1
+        for idx in range(len(stop_ids)):
+            stop_offsets[idx + 1] += stop_offsets[idx]
+
+        tables = {
+            "stop_ids": stop_ids,
+            "stop_names": stop_names,
+            "trip_ids": trip_ids,
+            "trip_numbers": trip_numbers,
+            "trip_modes": trip_modes,
+        }
+
+        return tables, arrays
+
+    @staticmethod
+    def _write_cache(
+        cache_path: str,
+        signature: list[int],
+        tables: dict[str, Any],
+        arrays: dict[str, array],
+    ) -> None:
+        """Write the binary arrays and the JSON tables of the cache."""
+        layout = {}
+        offset = 0
+
+        with open(cache_path, "wb") as file:
+            for name in _ARRAYS:
+                data = arrays[name].tobytes()
+                file.write(data)
+                layout[name] = [offset, len(arrays[name])]
+                offset += len(data)
+
+        with open(f"{cache_path}.json", "w", encoding="utf-8") as file:
+            json.dump(
+                {"signature": signature, "layout": layout, "tables": tables}, file
+            )
+
+    @classmethod
+    def _load_cache(cls, cache_path: str, signature: list[int]) -> GtfsTimetable:
+        """Memory-map the binary arrays of an up-to-date cache."""
+        with open(f"{cache_path}.json", encoding="utf-8") as file:
+            meta = json.load(file)
+
+        if meta["signature"] != signature:
+            raise ValueError("outdated GTFS cache")
+
+        with open(cache_path, "rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            mapped = (
+                mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+            )
+
+        view = memoryview(mapped) if mapped is not None else memoryview(b"")
+        itemsize = array("i").itemsize
+        arrays = {
+            name: view[offset : offset + length * itemsize].cast("i")
+            for name, (offset, length) in meta["layout"].items()
+        }
+
+        return cls(meta["tables"], arrays, mapped)
+
+    # -----------------------------------------------------------------
+    # Requêtes
+    # -----------------------------------------------------------------
+
+    def trip_stop_times(self, trip_id: str) -> list[tuple[str, int, int, int]]:
+        """Return (stop_id, stop_sequence, arrival, departure) of a trip."""
+        trip = self._trip_index.get(trip_id)
+
+        if trip is None:
+            return []
+
+        return [
+            (
+                self.stop_ids[self.st_stop[pos]],
+                self.st_sequence[pos],
+                self.st_arrival[pos],
+                self.st_departure[pos],
+            )
+            for pos in range(self.trip_offsets[trip], self.trip_offsets[trip + 1])
+        ]
+
+    def stops_for(self, stop_id: str) -> list[int]:
+        """Return the GTFS stops matching a Navitia or GTFS stop id."""
+        if stop_id in self._stop_index:
+            return [self._stop_index[stop_id]]
+
+        code = uic_code(stop_id)
+        return self._uic_index.get(code, []) if code else []
+
+    def next_trains(
+        self,
+        from_id: str,
+        to_id: str,
+        after: datetime,
+        count: int,
+    ) -> list[dict[str, Any]]:
+        """Return the next direct trains from A to B, as Navitia journeys."""
+        from_stops = self.stops_for(from_id)
+        to_stops = set(self.stops_for(to_id))
+
+        if not from_stops or not to_stops:
+            return []
+
+        after = after.replace(tzinfo=None)
+        found: list[tuple[datetime, int, int, date]] = []
+
+        # La veille est nécessaire pour les horaires au-delà de 24:00
+        for shift in (-1, 0, 1):
+            service_day = after.date() + timedelta(days=shift)
+            midnight = datetime.combine(service_day, datetime.min.time())
+            min_departure = max(int((after - midnight).total_seconds()), 0)
+
+            for stop in from_stops:
+                found.extend(
+                    self._departures_from(
+                        stop, to_stops, service_day, min_departure, midnight, count
+                    )
+                )
+
+        found.sort()
+
+        return [
+            self._to_journey(departure, dep_pos, arr_pos, service_day)
+            for departure, dep_pos, arr_pos, service_day in found[:count]
+        ]
+
+    def runs_on(self, service: int, day: date) -> bool:
+        """Return True when a service runs on a day."""
+        day_key = int(day.strftime("%Y%m%d"))
+        start = self.exception_offsets[service]
+        end = self.exception_offsets[service + 1]
+        position = bisect_left(self.exception_dates, day_key, start, end)
+
+        if position < end and self.exception_dates[position] == day_key:
+            return bool(self.exception_added[position])
+
+        return (
+            self.service_start[service] <= day_key <= self.service_end[service]
+            and bool(self.service_weekdays[service] >> day.weekday() & 1)
+        )
+
+    def _departures_from(
+        self,
+        stop: int,
+        to_stops: set[int],
+        service_day: date,
+        min_departure: int,
+        midnight: datetime,
+        count: int,
+    ) -> Iterator[tuple[datetime, int, int, date]]:
+        """Yield up to ``count`` direct trains leaving ``stop`` on a day."""
+        start = self.stop_offsets[stop]
+        end = self.stop_offsets[stop + 1]
+        departures = self.st_departure
+        position = bisect_left(
+            self.dep_order,
+            min_departure,
+            lo=start,
+            hi=end,
+            key=lambda pos: departures[pos],
+        )
+        found = 0
+        # Validité calculée une fois par service et par jour
+        running: dict[int, bool] = {}
+
+        while position < end and found < count:
+            dep_pos = self.dep_order[position]
+            position += 1
+            trip = self.st_trip[dep_pos]
+            service = self.trip_services[trip]
+
+            if service not in running:
+                running[service] = self.runs_on(service, service_day)
+
+            if not running[service]:
+                continue
+
+            for arr_pos in range(dep_pos + 1, self.trip_offsets[trip + 1]):
+                if self.st_stop[arr_pos] in to_stops:
+                    found += 1
+                    yield (
+                        midnight + timedelta(seconds=departures[dep_pos]),
+                        dep_pos,
+                        arr_pos,
+                        midnight.date(),
+                    )
+                    break
+
+    def _to_journey(
+        self,
+        departure: datetime,
+        dep_pos: int,
+        arr_pos: int,
+        service_day: date,
+    ) -> dict[str, Any]:
+        """Build a Navitia-like direct journey from two stop_times."""
+        trip = self.st_trip[dep_pos]
+        midnight = datetime.combine(service_day, datetime.min.time())
+        arrival = midnight + timedelta(seconds=self.st_arrival[arr_pos])
+        last_stop = self.st_stop[self.trip_offsets[trip + 1] - 1]
+        from_stop = self.st_stop[dep_pos]
+        to_stop = self.st_stop[arr_pos]
+
+        dep_str = departure.strftime(NAVITIA_DATETIME_FORMAT)
+        arr_str = arrival.strftime(NAVITIA_DATETIME_FORMAT)
+
+        return {
+            "departure_date_time": dep_str,
+            "arrival_date_time": arr_str,
+            "duration": int((arrival - departure).total_seconds()),
+            "nb_transfers": 0,
+            "type": "gtfs",
+            "gtfs_trip_id": self.trip_ids[trip],
+            "gtfs_service_date": f"{service_day:%Y%m%d}",
+            "gtfs_departure_sequence": self.st_sequence[dep_pos],
+            "gtfs_arrival_sequence": self.st_sequence[arr_pos],
+            "sections": [
+                {
+                    "type": "public_transport",
+                    "id": f"gtfs:{self.trip_ids[trip]}:{service_day:%Y%m%d}",
+                    "from": {
+                        "id": self.stop_ids[from_stop],
+                        "name": self.stop_names[from_stop],
+                    },
+                    "to": {
+                        "id": self.stop_ids[to_stop],
+                        "name": self.stop_names[to_stop],
+                    },
+                    "departure_date_time": dep_str,
+                    "arrival_date_time": arr_str,
+                    "base_departure_date_time": dep_str,
+                    "base_arrival_date_time": arr_str,
+                    "display_informations": {
+                        "trip_short_name": self.trip_numbers[trip],
+                        "direction": self.stop_names[last_stop],
+                        "commercial_mode": self.trip_modes[trip],
+                        "physical_mode": "Train",
+                    },
+                }
+            ],
+        }
+
+    def close(self) -> None:
+        """Release the memory-mapped cache."""
+        if self._mapped is not None:
+            for name in _ARRAYS:
+                getattr(self, name).release()
+            self._mapped.close()
+            self._mapped = None
@@ -0,0 +1,440 @@
+"""GTFS-Realtime TripUpdates as a realtime source.
+
+The feed is fetched once per refresh cycle (one request for every route),
+decoded into a trip_id -> TripUpdate index and applied to the scheduled
+trains of the offline GTFS timetable. GtfsRealtimeClient exposes the same
+``fetch_journeys`` as SncfApiClient, so the coordinator uses either one.
+
+Only the TripUpdate subset of the GTFS-RT protobuf is needed: it is read
+with a small wire-format decoder rather than a protobuf dependency.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, List, Optional
+
+from aiohttp import ClientError, ClientSession, ClientTimeout
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .gtfs import NAVITIA_DATETIME_FORMAT, GtfsTimetable
+
+_LOGGER = logging.getLogger(__name__)
+
+# Âge maximal par défaut du flux décodé : tous les trajets d'un cycle le
+# partagent ; le coordinator l'allonge à l'intervalle des trajets échelonnés
+FEED_MAX_AGE = 30  # seconds
+
+# Valeurs des énumérations GTFS-RT utilisées
+TRIP_CANCELED = 3
+STOP_SKIPPED = 1
+
+# Statuts Navitia équivalents
+STATUS_NO_SERVICE = "NO_SERVICE"
+STATUS_SIGNIFICANT_DELAYS = "SIGNIFICANT_DELAYS"
+
+
+# ---------------------------------------------------------------------
+# Décodage protobuf (format filaire)
+# ---------------------------------------------------------------------
+
+
+def _varint(data: bytes, pos: int) -> tuple[int, int]:
+    """Read a varint, return (value, next position)."""
+    result = 0
+    shift = 0
+
+    while True:
+        if pos >= len(data):
+            raise ValueError("truncated varint")
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+
+
+def _signed(value: int) -> int:
+    """Convert a two's complement int32/int64 varint to a Python int."""
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def _fields(data: bytes) -> Iterator[tuple[int, int | bytes]]:
+    """Yield the (field number, value) pairs of a protobuf message."""
+    pos = 0
+
+    while pos < len(data):
+        key, pos = _varint(data, pos)
+        number, wire_type = key >> 3, key & 7
+
+        if wire_type == 0:
+            value, pos = _varint(data, pos)
+            yield number, value
+        elif wire_type == 1:
+            pos += 8
+        elif wire_type == 2:
+            length, pos = _varint(data, pos)
+            if pos + length > len(data):
+                raise ValueError("truncated field")
+            yield number, data[pos : pos + length]
+            pos += length
+        elif wire_type == 5:
+            pos += 4
+        else:
+            raise ValueError(f"unsupported wire type {wire_type}")
+
+
+@dataclass(slots=True)
+class StopTimeEvent:
+    """Arrival or departure prediction of a stop."""
+
+    delay: int | None = None
+    time: int | None = None
+
+    def delay_from(self, scheduled: datetime) -> int | None:
+        """Return the delay in seconds relative to a scheduled time.
+
+        An absolute time is the prediction itself: it wins over a delay
+        sent alongside it (often a default 0).
+        """
+        if self.time is not None:
+            return self.time - int(scheduled.timestamp())
+        return self.delay
+
+
+@dataclass(slots=True)
+class StopTimeUpdate:
+    """Prediction for one stop of a trip."""
+
+    stop_id: str | None = None
+    stop_sequence: int | None = None
+    arrival: StopTimeEvent | None = None
+    departure: StopTimeEvent | None = None
+    skipped: bool = False
+
+
+@dataclass(slots=True)
+class TripUpdate:
+    """Realtime state of a trip."""
+
+    trip_id: str
+    start_date: str | None = None
+    cancelled: bool = False
+    delay: int | None = None
+    stop_time_updates: list[StopTimeUpdate] = field(default_factory=list)
+
+
+def _decode_event(data: bytes) -> StopTimeEvent:
+    """Decode a StopTimeEvent message."""
+    event = StopTimeEvent()
+
+    for number, value in _fields(data):
+        if number == 1 and isinstance(value, int):
+            event.delay = _signed(value)
+        elif number == 2 and isinstance(value, int):
+            event.time = _signed(value)
+
+    return event
+
+
+def _decode_stop_time_update(data: bytes) -> StopTimeUpdate:
+    """Decode a TripUpdate.StopTimeUpdate message."""
+    update = StopTimeUpdate()
+
+    for number, value in _fields(data):
+        if number == 1 and isinstance(value, int):
+            update.stop_sequence = value
+        elif number == 2 and isinstance(value, bytes):
+            update.arrival = _decode_event(value)
+        elif number == 3 and isinstance(value, bytes):
+            update.departure = _decode_event(value)
+        elif number == 4 and isinstance(value, bytes):
+            update.stop_id = value.decode()
+        elif number == 5 and isinstance(value, int):
+            update.skipped = value == STOP_SKIPPED
+
+    return update
+
+
+def _decode_trip_update(data: bytes) -> TripUpdate | None:
+    """Decode a TripUpdate message, None without trip_id."""
+    trip_id = None
+    start_date = None
+    cancelled = False
+    delay = None
+    stop_time_updates = []
+
+    for number, value in _fields(data):
+        if number == 1 and isinstance(value, bytes):
+            for trip_number, trip_value in _fields(value):
+                if trip_number == 1 and isinstance(trip_value, bytes):
+                    trip_id = trip_value.decode()
+                elif trip_number == 3 and isinstance(trip_value, bytes):
+                    start_date = trip_value.decode()
+                elif trip_number == 4 and isinstance(trip_value, int):
+                    cancelled = trip_value == TRIP_CANCELED
+        elif number == 2 and isinstance(value, bytes):
+            stop_time_updates.append(_decode_stop_time_update(value))
+        elif number == 5 and isinstance(value, int):
+            delay = _signed(value)
+
+    if trip_id is None:
+        return None
+
+    return TripUpdate(trip_id, start_date, cancelled, delay, stop_time_updates)
+
+
+def decode_trip_updates(data: bytes) -> dict[tuple[str, str | None], TripUpdate]:
+    """Decode a GTFS-RT FeedMessage into a (trip_id, start_date) index."""
+    updates: dict[tuple[str, str | None], TripUpdate] = {}
+
+    for number, entity in _fields(data):
+        if number != 2 or not isinstance(entity, bytes):
+            continue
+
+        for entity_number, value in _fields(entity):
+            if entity_number == 3 and isinstance(value, bytes):
+                if update := _decode_trip_update(value):
+                    updates[(update.trip_id, update.start_date)] = update
+
+    return updates
+
+
+# ---------------------------------------------------------------------
+# Application aux trains théoriques
+# ---------------------------------------------------------------------
+
+
+def _stop_delays(
+    update: TripUpdate,
+    stop_times: list[tuple[str, int, int, int]],
+    midnight: datetime,
+) -> dict[int, tuple[int, int, bool]]:
+    """Return (arrival delay, departure delay, skipped) by stop_sequence.
+
+    A prediction matches its stop_sequence, or without one the next visit
+    of its stop_id, so loop trips get the delay of the right passage. A
+    stop without prediction inherits the delay of the previous one, as
+    specified by GTFS-RT.
+    """
+    by_sequence: dict[int, StopTimeUpdate] = {}
+    by_stop: dict[str, list[StopTimeUpdate]] = {}
+
+    for stu in update.stop_time_updates:
+        if stu.stop_sequence is not None:
+            by_sequence[stu.stop_sequence] = stu
+        elif stu.stop_id:
+            by_stop.setdefault(stu.stop_id, []).append(stu)
+
+    delay = update.delay or 0
+    delays: dict[int, tuple[int, int, bool]] = {}
+
+    for stop_id, sequence, arrival, departure in stop_times:
+        stu = by_sequence.get(sequence)
+        if stu is None and (visits := by_stop.get(stop_id)):
+            stu = visits.pop(0)
+
+        arrival_delay = departure_delay = delay
+        skipped = False
+
+        if stu is not None:
+            skipped = stu.skipped
+            event_arrival = stu.arrival and stu.arrival.delay_from(
+                midnight + timedelta(seconds=arrival)
+            )
+            event_departure = stu.departure and stu.departure.delay_from(
+                midnight + timedelta(seconds=departure)
+            )
+            arrival_delay = (
+                event_arrival
+                if event_arrival is not None
+                else event_departure if event_departure is not None else delay
+            )
+            departure_delay = (
+                event_departure if event_departure is not None else arrival_delay
+            )
+            delay = departure_delay
+
+        delays[sequence] = (arrival_delay, departure_delay, skipped)
+
+    return delays
+
+
+def apply_trip_update(
+    journey: dict[str, Any],
+    update: TripUpdate,
+    stop_times: list[tuple[str, int, int, int]],
+) -> dict[str, Any]:
+    """Return a copy of a GTFS journey with the realtime prediction applied."""
+    section = journey["sections"][0]
+    service_day = datetime.strptime(journey["gtfs_service_date"], "%Y%m%d")
+    midnight = service_day.replace(tzinfo=dt_util.DEFAULT_TIME_ZONE)
+
+    delays = _stop_delays(update, stop_times, midnight)
+    _, departure_delay, departure_skipped = delays.get(
+        journey["gtfs_departure_sequence"], (0, 0, False)
+    )
+    arrival_delay, _, arrival_skipped = delays.get(
+        journey["gtfs_arrival_sequence"], (0, 0, False)
+    )
+
+    base_departure = datetime.strptime(
+        section["base_departure_date_time"], NAVITIA_DATETIME_FORMAT
+    )
+    base_arrival = datetime.strptime(
+        section["base_arrival_date_time"], NAVITIA_DATETIME_FORMAT
+    )
+    departure = (base_departure + timedelta(seconds=departure_delay)).strftime(
+        NAVITIA_DATETIME_FORMAT
+    )
+    arrival = (base_arrival + timedelta(seconds=arrival_delay)).strftime(
+        NAVITIA_DATETIME_FORMAT
+    )
+
+    journey = {
+        **journey,
+        "departure_date_time": departure,
+        "arrival_date_time": arrival,
+        "sections": [
+            {
+                **section,
+                "departure_date_time": departure,
+                "arrival_date_time": arrival,
+            },
+            *journey["sections"][1:],
+        ],
+    }
+
+    if update.cancelled or departure_skipped or arrival_skipped:
+        journey["status"] = STATUS_NO_SERVICE
+    elif departure_delay > 0 or arrival_delay > 0:
+        journey["status"] = STATUS_SIGNIFICANT_DELAYS
+
+    return journey
+
+
+class GtfsRealtimeClient:
+    """Realtime trains from a GTFS-RT TripUpdates feed and a GTFS timetable."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        session: ClientSession,
+        timetable: GtfsTimetable,
+        feed_url: str,
+        timeout: int = 10,
+    ):
+        self._hass = hass
+        self._session = session
+        self._timetable = timetable
+        self._feed_url = feed_url
+        self._timeout = timeout
+        self._updates: dict[tuple[str, str | None], TripUpdate] | None = None
+        self._fetched_at = 0.0
+        self._lock = asyncio.Lock()
+        self.feed_fetches = 0
+        self.max_age: float = FEED_MAX_AGE
+
+    async def _read_feed(self) -> bytes:
+        """Read the raw feed, from a URL or a local file."""
+        if self._feed_url.startswith(("http://", "https://")):
+            async with self._session.get(
+                self._feed_url,
+                timeout=ClientTimeout(total=self._timeout),
+            ) as resp:
+                resp.raise_for_status()
+                return await resp.read()
+
+        return await self._hass.async_add_executor_job(
+            Path(self._feed_url).read_bytes
+        )
+
+    async def _async_get_updates(
+        self,
+    ) -> dict[tuple[str, str | None], TripUpdate] | None:
+        """Return the decoded feed, fetched at most once per ``max_age``."""
+        async with self._lock:
+            if (
+                self._updates is not None
+                and time.monotonic() - self._fetched_at < self.max_age
+            ):
+                return self._updates
+
+            try:
+                data = await self._read_feed()
+                self.feed_fetches += 1
+                self._updates = decode_trip_updates(data)
+            except (ClientError, asyncio.TimeoutError, OSError, ValueError) as err:
+                _LOGGER.warning("Error reading GTFS-RT feed: %s", err)
+                self._updates = None
+                return None
+
+            self._fetched_at = time.monotonic()
+            return self._updates
+
+    def key_stats(self) -> list[dict[str, Any]]:
+        """Return the usage of the feed (no API key involved)."""
+        return [
+            {
+                "source": "gtfs_rt",
+                "feed_fetches": self.feed_fetches,
+                "trip_updates": len(self._updates or {}),
+            }
+        ]
+
+    async def fetch_journeys(
+        self,
+        from_id: str,
+        to_id: str,
+        datetime_str: str,
+        count: int = 5,
+        timeframe_duration: int | None = None,
+        max_pages: int = 1,
+    ) -> Optional[List[dict]]:
+        """Return the next trains with their realtime state.
+
+        Same signature as SncfApiClient.fetch_journeys; ``max_pages`` is
+        meaningless for a local timetable.
+        """
+        updates = await self._async_get_updates()
+
+        if updates is None:
+            return None
+
+        start = datetime.strptime(datetime_str, NAVITIA_DATETIME_FORMAT)
+        until = (
+            None
+            if timeframe_duration is None
+            else (start + timedelta(seconds=timeframe_duration)).strftime(
+                NAVITIA_DATETIME_FORMAT
+            )
+        )
+        # Plage commencée : les trains déjà partis ne prennent pas de place
+        after = max(start, dt_util.now().replace(tzinfo=None, second=0, microsecond=0))
+        journeys = []
+
+        for journey in self._timetable.next_trains(from_id, to_id, after, count):
+            if until is not None and journey["departure_date_time"] > until:
+                break
+
+            trip_id = journey["gtfs_trip_id"]
+            update = updates.get(
+                (trip_id, journey["gtfs_service_date"])
+            ) or updates.get((trip_id, None))
+
+            if update is not None:
+                journey = apply_trip_update(
+                    journey, update, self._timetable.trip_stop_times(trip_id)
+                )
+
+            journeys.append(journey)
+
+        return journeys
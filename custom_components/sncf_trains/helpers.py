@@ -1,10 +1,18 @@
 """Helpers for component."""
 
+from collections.abc import Mapping
 from datetime import datetime
 from typing import Any
 
 from homeassistant.util import dt as dt_util
 
+from .const import CONF_ADDITIONAL_API_KEYS, CONF_API_KEY
+
+
+def get_api_keys(data: Mapping[str, Any]) -> list[str]:
+    """Return the main API key followed by the additional keys of the pool."""
+    return [data[CONF_API_KEY], *data.get(CONF_ADDITIONAL_API_KEYS, [])]
+
 
 def parse_datetime(dt_str: str) -> datetime | None:
     """Parse string to datetime."""
@@ -18,10 +26,60 @@ def parse_datetime(dt_str: str) -> datetime | None:
         return None
 
 
+def format_datetime(dt: datetime | None) -> str:
+    """Format a datetime as dd/mm/YYYY - HH:MM."""
+    return dt.strftime("%d/%m/%Y - %H:%M") if dt else "N/A"
+
+
 def format_time(dt_str: str) -> str:
     """Format a Navitia datetime string as dd/mm/YYYY - HH:MM."""
-    dt = parse_datetime(dt_str)
-    return dt.strftime("%d/%m/%Y - %H:%M") if dt else "N/A"
+    return format_datetime(parse_datetime(dt_str))
+
+
+def datetime_to_timestamp(dt: datetime | None) -> int | None:
+    """Convert a datetime to epoch seconds."""
+    return int(dt.timestamp()) if dt else None
+
+
+def to_timestamp(dt_str: str) -> int | None:
+    """Convert a Navitia datetime string to epoch seconds."""
+    return datetime_to_timestamp(parse_datetime(dt_str))
+
+
+def get_transport_section(journey: dict[str, Any]) -> dict[str, Any]:
+    """Return the public transport section of a journey.
+
+    Newer SNCF/Navitia responses can contain several sections for a direct
+    journey, for example:
+
+        crow_fly
+        public_transport
+        crow_fly
+
+    Older responses may contain the public transport section directly as
+    the first section.
+
+    We therefore search explicitly for the public_transport section and
+    fall back to the first section for compatibility.
+    """
+    sections = journey.get("sections", [])
+
+    if not isinstance(sections, list):
+        return {}
+
+    for section in sections:
+        if not isinstance(section, dict):
+            continue
+
+        if section.get("type") == "public_transport":
+            return section
+
+    # Compatibility with the previous API format.
+    for section in sections:
+        if isinstance(section, dict):
+            return section
+
+    return {}
 
 
 def get_train_num(journey: dict[str, Any]) -> str:
@@ -106,6 +164,20 @@ def get_train_num(journey: dict[str, Any]) -> str:
     return ""
 
 
+def get_delay_minutes(journey: dict[str, Any]) -> int:
+    """Compute the arrival delay of a journey in minutes."""
+    arr = parse_datetime(journey.get("arrival_date_time", ""))
+
+    base_arr = parse_datetime(
+        get_transport_section(journey).get("base_arrival_date_time", "")
+    )
+
+    if arr and base_arr:
+        return int((arr - base_arr).total_seconds() / 60)
+
+    return 0
+
+
 def get_duration(journey: dict[str, Any]) -> int:
     """Compute journey duration in minutes."""
     dep = parse_datetime(journey.get("departure_date_time", ""))
@@ -116,3 +188,18 @@ def get_duration(journey: dict[str, Any]) -> int:
         return int((arr - dep).total_seconds() / 60)
 
     return 0
+
+
+def get_journey_key(journey: dict[str, Any]) -> str:
+    """Return a stable identity for a journey: train number + base departure.
+
+    The realtime departure changes with delays, the base departure does not,
+    so the pair identifies the same physical train across refreshes.
+    """
+    section = get_transport_section(journey)
+
+    base_departure = section.get("base_departure_date_time") or journey.get(
+        "departure_date_time", ""
+    )
+
+    return f"{get_train_num(journey)}_{base_departure}"
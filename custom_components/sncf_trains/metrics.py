@@ -0,0 +1,210 @@
+"""Metrics of the integration in the Prometheus text exposition format.
+
+Counters and histograms are plain dicts and lists updated from the event
+loop: no lock is needed and an update costs a dict lookup and an addition.
+They are served by the view of ``views.py``.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections.abc import Iterable, Iterator
+from urllib.parse import urlsplit
+
+from .const import DOMAIN
+
+DURATION_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DECODE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+def _escape(value: str) -> str:
+    """Escape a label value."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    """Return the label set of a sample, escaped."""
+    if not names:
+        return ""
+
+    pairs = ",".join(
+        f'{name}="{_escape(value)}"' for name, value in zip(names, values)
+    )
+    return f"{{{pairs}}}"
+
+
+def _format_value(value: float) -> str:
+    """Return a sample value, integers without decimals."""
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+class Counter:
+    """Counter family, one value per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, *labels: str) -> None:
+        """Initialize the counter."""
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        """Add to the counter of a label set."""
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def samples(self) -> Iterator[str]:
+        """Yield the exposition lines of the samples."""
+        for labels, value in self.values.items():
+            yield (
+                f"{self.name}{_format_labels(self.labels, labels)} "
+                f"{_format_value(value)}"
+            )
+
+
+class _Buckets:
+    """Counts of one histogram, per bucket (+Inf last), and sum of values."""
+
+    __slots__ = ("counts", "total")
+
+    def __init__(self, buckets: int) -> None:
+        """Initialize empty counts."""
+        self.counts = [0] * (buckets + 1)
+        self.total = 0.0
+
+
+class Histogram:
+    """Histogram family with fixed buckets, one histogram per label set."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        buckets: tuple[float, ...],
+        *labels: str,
+    ) -> None:
+        """Initialize the histogram."""
+        self.name = name
+        self.documentation = documentation
+        self.buckets = buckets
+        self.labels = labels
+        self.values: dict[tuple[str, ...], _Buckets] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        """Record a value for a label set."""
+        if (histogram := self.values.get(labels)) is None:
+            histogram = self.values[labels] = _Buckets(len(self.buckets))
+
+        histogram.counts[bisect_left(self.buckets, value)] += 1
+        histogram.total += value
+
+    def samples(self) -> Iterator[str]:
+        """Yield the exposition lines of the buckets, sum and count."""
+        names = (*self.labels, "le")
+
+        for labels, histogram in self.values.items():
+            cumulative = 0
+
+            for bound, count in zip((*self.buckets, "+Inf"), histogram.counts):
+                cumulative += count
+                le = bound if isinstance(bound, str) else _format_value(bound)
+                yield (
+                    f"{self.name}_bucket{_format_labels(names, (*labels, le))} "
+                    f"{cumulative}"
+                )
+
+            label_set = _format_labels(self.labels, labels)
+            yield f"{self.name}_sum{label_set} {_format_value(histogram.total)}"
+            yield f"{self.name}_count{label_set} {cumulative}"
+
+
+def api_endpoint(url: str) -> str:
+    """Return the endpoint of an API URL, without the object ids."""
+    segments = [
+        segment
+        for segment in urlsplit(url).path.split("/")
+        if segment and ":" not in segment
+    ]
+    return segments[-1] if segments else "root"
+
+
+class IntegrationMetrics:
+    """Metrics updated by the API client, the coordinator and the entities."""
+
+    def __init__(self) -> None:
+        """Initialize the metrics."""
+        self.api_requests = Counter(
+            f"{DOMAIN}_api_requests_total",
+            "API requests by endpoint and HTTP status (error: network error).",
+            "endpoint",
+            "status",
+        )
+        self.api_response_bytes = Histogram(
+            f"{DOMAIN}_api_response_bytes",
+            "Size of the API response bodies, as read.",
+            SIZE_BUCKETS,
+            "endpoint",
+        )
+        self.api_decode_seconds = Histogram(
+            f"{DOMAIN}_api_decode_seconds",
+            "Time spent reading and decoding the API responses.",
+            DECODE_BUCKETS,
+            "endpoint",
+        )
+        self.refresh_seconds = Histogram(
+            f"{DOMAIN}_refresh_seconds",
+            "Duration of the coordinator refreshes, entity updates included.",
+            DURATION_BUCKETS,
+        )
+        self.refresh_retries = Counter(
+            f"{DOMAIN}_refresh_retries_total",
+            "Journeys searches retried after an error, by route.",
+            "route",
+        )
+        self.base_schedule_cache = Counter(
+            f"{DOMAIN}_base_schedule_cache_total",
+            "Lookups of the planned schedule cache, by result (hit or miss).",
+            "result",
+        )
+        self.entity_writes = Counter(
+            f"{DOMAIN}_entity_writes_total",
+            "States written by the entities, by route.",
+            "route",
+        )
+
+    @property
+    def families(self) -> list[Counter | Histogram]:
+        """Return every metric family."""
+        return [
+            self.api_requests,
+            self.api_response_bytes,
+            self.api_decode_seconds,
+            self.refresh_seconds,
+            self.refresh_retries,
+            self.base_schedule_cache,
+            self.entity_writes,
+        ]
+
+
+def render_metrics(
+    metrics: IntegrationMetrics,
+    quota: Iterable[tuple[int, int]] = (),
+) -> str:
+    """Return the metrics, with the quota left on each API key."""
+    lines: list[str] = []
+
+    for family in metrics.families:
+        lines.append(f"# HELP {family.name} {family.documentation}")
+        lines.append(f"# TYPE {family.name} {family.kind}")
+        lines.extend(family.samples())
+
+    name = f"{DOMAIN}_api_quota_remaining"
+    lines.append(f"# HELP {name} Calls left today on each API key.")
+    lines.append(f"# TYPE {name} gauge")
+    lines.extend(f'{name}{{key="{index}"}} {remaining}' for index, remaining in quota)
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,100 @@
+"""On-demand profiling of the coordinator refreshes.
+
+The ``sncf_trains.profile`` service gives the coordinator a
+RefreshProfiler for its next refreshes. cProfile is enabled only while a
+refresh runs (API calls, processing and entity updates); the coordinator
+checks a single attribute otherwise. The statistics are written under the
+configuration directory and their hot spots kept for the diagnostics.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import logging
+import pstats
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_PROFILE_REFRESHES = 3
+MAX_PROFILE_REFRESHES = 20
+TOP_FUNCTIONS = 15
+
+
+class RefreshProfiler:
+    """Accumulate a cProfile profile over a number of refreshes.
+
+    The event loop runs other tasks while a refresh awaits the API: their
+    time is included, as in any profile of a running Home Assistant.
+    """
+
+    def __init__(self, refreshes: int = DEFAULT_PROFILE_REFRESHES) -> None:
+        """Initialize the profiler."""
+        self.remaining = refreshes
+        self.refreshes = 0
+        self.skipped = 0
+        self._profile = cProfile.Profile()
+
+    @property
+    def done(self) -> bool:
+        """Return True once every requested refresh was profiled."""
+        return self.remaining <= 0
+
+    @contextmanager
+    def capture(self) -> Iterator[None]:
+        """Profile one refresh.
+
+        Skipped when another profiler is already running (the profiler
+        integration of Home Assistant, for instance): only one can be
+        enabled at a time. The refresh still runs and still counts, so that
+        the profiling ends.
+        """
+        try:
+            self._profile.enable()
+        except ValueError as err:
+            # Un autre profileur est actif : ce rafraîchissement n'est pas mesuré
+            _LOGGER.warning("Rafraîchissement non profilé : %s", err)
+            self.remaining -= 1
+            self.skipped += 1
+            yield
+            return
+
+        try:
+            yield
+        finally:
+            self._profile.disable()
+            self.remaining -= 1
+            self.refreshes += 1
+
+    def hot_spots(self, limit: int = TOP_FUNCTIONS) -> list[dict[str, Any]]:
+        """Return the functions with the most cumulative time."""
+        # Aucun rafraîchissement mesuré : pstats refuse un profil vide
+        if not self.refreshes:
+            return []
+
+        stats = pstats.Stats(self._profile).stats  # type: ignore[attr-defined]
+
+        ranked = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)
+
+        return [
+            {
+                "function": f"{Path(filename).name}:{line}({name})",
+                "calls": calls,
+                "total_seconds": round(total_time, 4),
+                "cumulative_seconds": round(cumulative_time, 4),
+            }
+            for (filename, line, name), (
+                _primitive_calls,
+                calls,
+                total_time,
+                cumulative_time,
+                _callers,
+            ) in ranked[:limit]
+        ]
+
+    def dump(self, path: str) -> None:
+        """Write the statistics, readable with pstats or snakeviz."""
+        self._profile.dump_stats(path)
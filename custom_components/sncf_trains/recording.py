@@ -0,0 +1,249 @@
+"""Record and replay of the SNCF API traffic.
+
+In capture mode SncfApiClient hands every response to a TrafficRecorder,
+which appends it to a gzip-compressed JSONL file. Only the URL, the query
+parameters, the status, the latency and the body are written: the API key
+travels in the request headers and is never recorded.
+
+ReplaySession reads such a file and stands in for the aiohttp session of
+SncfApiClient, serving the recorded responses with their original latency
+(or a scaled one) without network access: production incidents (429
+storms, huge payloads) can be reproduced and benchmarked locally.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import itertools
+import json
+import logging
+import time
+from collections.abc import Iterator, Mapping
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qsl, urlsplit
+
+from aiohttp import ClientResponseError, RequestInfo
+from homeassistant.core import HomeAssistant
+from multidict import CIMultiDict, CIMultiDictProxy
+from yarl import URL
+
+_LOGGER = logging.getLogger(__name__)
+
+# Enregistrements écrits par lot, dans l'exécuteur
+FLUSH_EVERY = 20
+
+# Paramètres dépendant de l'heure de la requête : ignorés au rejeu
+TIME_PARAMS = frozenset({"datetime", "from_datetime", "since", "until"})
+
+
+def _append_lines(path: Path, lines: list[str]) -> None:
+    """Append JSON lines to a gzip file (one gzip member per batch)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    with gzip.open(path, "at", encoding="utf-8") as file:
+        file.writelines(lines)
+
+
+def read_recording(path: str | Path) -> list[dict[str, Any]]:
+    """Return the records of a capture file, in request order."""
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+class TrafficRecorder:
+    """Append the API responses to a gzip-compressed JSONL file.
+
+    Within Home Assistant the flushes are background tasks of ``hass``;
+    without it (replay benchmarks) plain tasks of the running loop.
+    """
+
+    def __init__(self, path: str | Path, hass: HomeAssistant | None = None) -> None:
+        """Initialize the recorder."""
+        self.path = Path(path)
+        self._hass = hass
+        self.records = 0
+        self._start = time.monotonic()
+        self._pending: list[str] = []
+        self._lock = asyncio.Lock()
+        self._flushes: set[asyncio.Task] = set()
+
+    def record(
+        self,
+        url: str,
+        params: Mapping[str, Any],
+        status: int,
+        latency: float,
+        body: Any = None,
+    ) -> None:
+        """Queue a response for writing."""
+        self._pending.append(
+            json.dumps(
+                {
+                    "time": round(time.monotonic() - self._start, 3),
+                    "url": url,
+                    "params": dict(params),
+                    "status": status,
+                    "latency": round(latency, 4),
+                    "body": body,
+                },
+                separators=(",", ":"),
+            )
+            + "\n"
+        )
+        self.records += 1
+
+        # Une écriture par lot : la tâche lancée emporte aussi les suivants
+        if len(self._pending) == FLUSH_EVERY:
+            if self._hass is not None:
+                task = self._hass.async_create_background_task(
+                    self.async_flush(), f"sncf_trains traffic flush {self.path.name}"
+                )
+            else:
+                task = asyncio.get_running_loop().create_task(self.async_flush())
+
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+    async def async_flush(self) -> None:
+        """Write the queued responses without blocking the event loop."""
+        async with self._lock:
+            lines, self._pending = self._pending, []
+
+            if not lines:
+                return
+
+            try:
+                await asyncio.get_running_loop().run_in_executor(
+                    None, _append_lines, self.path, lines
+                )
+            except OSError as err:
+                _LOGGER.error(
+                    "Impossible d'enregistrer le trafic API dans '%s' : %s",
+                    self.path,
+                    err,
+                )
+
+    async def async_close(self) -> None:
+        """Wait for the running flushes, then write the remaining responses."""
+        if self._flushes:
+            await asyncio.gather(*self._flushes)
+
+        await self.async_flush()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the recorder state for the diagnostics."""
+        return {
+            "path": str(self.path),
+            "records": self.records,
+            "pending": len(self._pending),
+        }
+
+
+def _request_key(url: str, params: Mapping[str, Any]) -> tuple[str, str]:
+    """Return the key matching a request with its recordings."""
+    parts = urlsplit(url)
+
+    # Les liens "next" portent leurs paramètres dans l'URL
+    stable = {
+        name: str(value)
+        for name, value in [*parse_qsl(parts.query), *params.items()]
+        if name not in TIME_PARAMS
+    }
+
+    return parts.path, json.dumps(stable, sort_keys=True)
+
+
+class ReplayResponse:
+    """A recorded response, with the aiohttp response methods used."""
+
+    def __init__(self, url: str, record: Mapping[str, Any]) -> None:
+        """Initialize the response."""
+        self.url = url
+        self.status: int = record["status"]
+        self._body = record.get("body")
+
+    async def json(self) -> Any:
+        """Return the recorded body."""
+        return self._body
+
+    async def read(self) -> bytes:
+        """Return the recorded body, encoded."""
+        return json.dumps(self._body).encode()
+
+    def raise_for_status(self) -> None:
+        """Raise like aiohttp for a recorded error status."""
+        if self.status < 400:
+            return
+
+        url = URL(self.url)
+
+        raise ClientResponseError(
+            RequestInfo(url, "GET", CIMultiDictProxy(CIMultiDict()), url),
+            (),
+            status=self.status,
+        )
+
+
+class ReplaySession:
+    """Serve recorded responses in place of an aiohttp session.
+
+    Requests are matched on their path and parameters, the time-dependent
+    ones excepted, and get the recordings of the same request in order;
+    each request cycles through its recordings. ``time_scale`` multiplies
+    the recorded latency: 0 answers immediately.
+    """
+
+    def __init__(
+        self,
+        records: list[dict[str, Any]],
+        time_scale: float = 1.0,
+    ) -> None:
+        """Initialize the session from records."""
+        self.time_scale = time_scale
+        self.requests = 0
+        self.unmatched = 0
+
+        grouped: dict[tuple[str, str], list[dict[str, Any]]] = {}
+
+        for record in records:
+            key = _request_key(record["url"], record.get("params", {}))
+            grouped.setdefault(key, []).append(record)
+
+        self._records: dict[tuple[str, str], Iterator[dict[str, Any]]] = {
+            key: itertools.cycle(matching) for key, matching in grouped.items()
+        }
+
+    @classmethod
+    def from_file(cls, path: str | Path, time_scale: float = 1.0) -> ReplaySession:
+        """Create a session from a capture file."""
+        return cls(read_recording(path), time_scale)
+
+    @asynccontextmanager
+    async def get(
+        self,
+        url: str,
+        params: Mapping[str, Any] | None = None,
+        **_kwargs: Any,
+    ):
+        """Answer a GET request with the next matching recording."""
+        self.requests += 1
+        records = self._records.get(_request_key(url, params or {}))
+
+        if records is None:
+            # Requête jamais enregistrée : réponse vide
+            self.unmatched += 1
+            yield ReplayResponse(url, {"status": 404, "body": None})
+            return
+
+        record = next(records)
+
+        if self.time_scale > 0:
+            await asyncio.sleep(record.get("latency", 0) * self.time_scale)
+
+        yield ReplayResponse(url, record)
+
+    async def close(self) -> None:
+        """Nothing to close, for compatibility with aiohttp."""
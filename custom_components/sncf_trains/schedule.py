@@ -0,0 +1,120 @@
+"""Persistent cache of the base-schedule journeys of every route."""
+
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .api import JourneyList
+from .const import DOMAIN
+from .helpers import get_journey_key
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 10  # seconds
+
+
+class BaseScheduleCache:
+    """Base-schedule journeys of each route, for one window date.
+
+    The planned trains of a window are downloaded once and kept across
+    restarts; realtime refreshes only update them.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize an empty cache."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.base_schedule"
+        )
+        self._routes: dict[str, dict[str, Any]] = {}
+
+    async def async_load(self) -> None:
+        """Load the cache saved by a previous run."""
+        if data := await self._store.async_load():
+            self._routes = data.get("routes", {})
+
+    def get(self, subentry_id: str, window_date: str) -> list[dict[str, Any]] | None:
+        """Return the cached journeys of a route window, if any."""
+        route = self._routes.get(subentry_id)
+
+        if route is None or route.get("date") != window_date:
+            return None
+
+        return route["journeys"]
+
+    @callback
+    def async_set(
+        self,
+        subentry_id: str,
+        window_date: str,
+        journeys: list[dict[str, Any]],
+    ) -> None:
+        """Store the journeys of a route window."""
+        self._routes[subentry_id] = {"date": window_date, "journeys": journeys}
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    @callback
+    def async_remove(self, subentry_id: str) -> None:
+        """Forget a removed route."""
+        if self._routes.pop(subentry_id, None) is not None:
+            self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    @property
+    def routes(self) -> set[str]:
+        """Return the subentry ids present in the cache."""
+        return set(self._routes)
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the data to save."""
+        return {"routes": self._routes}
+
+
+def merge_realtime(
+    base: list[dict[str, Any]],
+    realtime: list[dict[str, Any]],
+    since: str | None = None,
+) -> JourneyList:
+    """Merge realtime journeys into the base schedule, by departure time.
+
+    A realtime journey replaces the planned one of the same train. A planned
+    train missing from the realtime answer is dropped when the answer covers
+    its departure (from ``since`` to the last realtime departure): it was
+    cancelled or deleted and must not show as on time. A planned train
+    departing before ``since`` has already left and is dropped too; planned
+    trains after the answer were not searched and are kept.
+    """
+    realtime_keys = {
+        get_journey_key(journey) for journey in realtime if isinstance(journey, dict)
+    }
+    departures = [
+        journey.get("departure_date_time", "")
+        for journey in realtime
+        if isinstance(journey, dict)
+    ]
+    covered = (since or min(departures, default=""), max(departures, default=""))
+
+    def searched(journey: dict[str, Any]) -> bool:
+        """Return True when the realtime answer should contain the train."""
+        departure = journey.get("departure_date_time", "")
+        # Parti avant la recherche, ou couvert par la réponse
+        return bool(since and departure < since) or (
+            covered[0] <= departure <= covered[1]
+        )
+
+    merged = [
+        *realtime,
+        *(
+            journey
+            for journey in base
+            if isinstance(journey, dict)
+            and get_journey_key(journey) not in realtime_keys
+            and not searched(journey)
+        ),
+    ]
+    merged.sort(
+        key=lambda journey: (
+            journey.get("departure_date_time", "") if isinstance(journey, dict) else ""
+        )
+    )
+
+    return JourneyList(merged, getattr(realtime, "disruptions", []))
@@ -1,12 +1,23 @@
 """Sensors for trains hours."""
 
+import math
+from datetime import datetime, timedelta
 from typing import Any
 
-from homeassistant.components.sensor import SensorDeviceClass, SensorEntity
-from homeassistant.core import HomeAssistant, callback
-from homeassistant.helpers.device_registry import DeviceEntryType
+from homeassistant.components.sensor import (
+    DOMAIN as SENSOR_DOMAIN,
+    SensorDeviceClass,
+    SensorEntity,
+)
+from homeassistant.const import UnitOfTime
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_track_point_in_time
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
 
 from . import SncfDataConfigEntry
 from .const import (
@@ -15,10 +26,32 @@ from .const import (
     CONF_DEPARTURE_NAME,
     CONF_FROM,
     CONF_TO,
+    CONF_TRAIN_COUNT,
+    DEFAULT_TRAIN_COUNT,
     DOMAIN,
+    SIGNAL_ROUTES_UPDATED,
 )
+from .connections import Itinerary
 from .coordinator import SncfUpdateCoordinator
-from .helpers import format_time, get_duration, get_train_num, parse_datetime
+from .disruptions import get_train_status
+from .helpers import (
+    datetime_to_timestamp,
+    format_datetime,
+    format_time,
+    get_duration,
+    get_train_num,
+    get_transport_section,
+    parse_datetime,
+    to_timestamp,
+)
+
+# Correspondances exposées par le capteur "Trajets"
+MAX_CONNECTIONS = 10
+
+# Compte à rebours : à la minute dans la dernière heure, par pas de 5 minutes
+# avant, pour limiter les états écrits (et enregistrés par le recorder)
+COUNTDOWN_FINE_MINUTES = 60
+COUNTDOWN_COARSE_STEP = 5
 
 
 async def async_setup_entry(
@@ -31,85 +64,208 @@ async def async_setup_entry(
     coordinator: SncfUpdateCoordinator = entry.runtime_data
 
     # Capteur global "Trajets"
-    async_add_entities(
-        [SncfJourneySensor(coordinator)],
-        update_before_add=True,
+    async_add_entities([SncfJourneySensor(coordinator)])
+
+    manager = RouteSensorManager(hass, coordinator, async_add_entities)
+
+    for subentry_id in entry.subentries:
+        manager.async_add_route(subentry_id)
+
+    # Trajets ajoutés ou reconfigurés sans rechargement de l'intégration
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass,
+            f"{SIGNAL_ROUTES_UPDATED}_{entry.entry_id}",
+            manager.async_routes_updated,
+        )
     )
 
-    for subentry in entry.subentries.values():
-        journeys = coordinator.data.get(subentry.subentry_id, [])
+    # Nouveaux capteurs de trains au fil des données
+    entry.async_on_unload(coordinator.async_add_listener(manager.async_update_routes))
+
+
+class RouteSensorManager:
+    """Create, resize and forget the sensors of each route.
+
+    A route gets one train sensor per slot holding a train, up to its train
+    count, and keeps the sensors already registered so that their entity
+    ids survive a restart with fewer trains. Sensors are added as trains
+    arrive and removed only when the train count is lowered; an emptied
+    slot leaves its sensor without value.
+    """
 
-        display_count = min(
-            len(journeys),
-            subentry.data.get("train_count", 0),
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        coordinator: SncfUpdateCoordinator,
+        async_add_entities: AddEntitiesCallback,
+    ) -> None:
+        """Initialize the manager."""
+        self.hass = hass
+        self.coordinator = coordinator
+        self._async_add_entities = async_add_entities
+        self.train_sensors: dict[str, list[SncfTrainSensor]] = {}
+        self.countdown_sensors: dict[str, list[SncfCountdownSensor]] = {}
+
+    def _train_count(self, subentry_id: str) -> int:
+        """Return the maximum number of train sensors of a route."""
+        return self.coordinator.entry.subentries[subentry_id].data.get(
+            CONF_TRAIN_COUNT, DEFAULT_TRAIN_COUNT
         )
 
-        sensors = []
+    def _filled_slots(self, subentry_id: str) -> int:
+        """Return the number of sensors needed to show the trains of a route."""
+        slots = self.coordinator.slots.get(subentry_id, [])
 
-        # Capteurs individuels pour chaque train
-        for idx in range(display_count):
-            sensors.append(
-                SncfTrainSensor(
-                    coordinator,
-                    subentry.subentry_id,
-                    idx,
-                )
-            )
+        return max(
+            (slot + 1 for slot, key in enumerate(slots) if key is not None),
+            default=0,
+        )
+
+    def _registered_slots(self, subentry_id: str) -> int:
+        """Return the number of train sensors registered by a previous run."""
+        registry = er.async_get(self.hass)
+        count = 0
+
+        for slot in range(self._train_count(subentry_id)):
+            if registry.async_get_entity_id(
+                SENSOR_DOMAIN, DOMAIN, f"{subentry_id}_{slot}"
+            ):
+                count = slot + 1
+
+        return count
+
+    @callback
+    def async_add_route(self, subentry_id: str) -> None:
+        """Create the sensors of a route."""
+        self.train_sensors[subentry_id] = []
+        self.countdown_sensors[subentry_id] = []
 
         # Capteur résumé ligne par ligne
-        sensors.append(
-            SncfAllTrainsLineSensor(
-                coordinator,
-                subentry.subentry_id,
-            )
+        self._async_add_entities(
+            [SncfAllTrainsLineSensor(self.coordinator, subentry_id)],
+            config_subentry_id=subentry_id,
         )
 
-        async_add_entities(
-            sensors,
-            config_subentry_id=subentry.subentry_id,
-            update_before_add=True,
+        self.async_resize_route(subentry_id, self._registered_slots(subentry_id))
+
+    @callback
+    def async_resize_route(self, subentry_id: str, minimum: int = 0) -> None:
+        """Add or remove train sensors to fit the trains of a route."""
+        sensors = self.train_sensors[subentry_id]
+        countdowns = self.countdown_sensors[subentry_id]
+        count = min(
+            self._train_count(subentry_id),
+            max(len(sensors), minimum, self._filled_slots(subentry_id)),
         )
 
+        if count > len(sensors):
+            # Un capteur par emplacement : les trains y sont attribués par le
+            # coordinator selon leur identité (numéro + départ théorique).
+            added = [
+                SncfTrainSensor(self.coordinator, subentry_id, slot)
+                for slot in range(len(sensors), count)
+            ]
+            added_countdowns = [
+                SncfCountdownSensor(self.coordinator, subentry_id, slot)
+                for slot in range(len(countdowns), count)
+            ]
+            sensors.extend(added)
+            countdowns.extend(added_countdowns)
+            self._async_add_entities(
+                [*added, *added_countdowns], config_subentry_id=subentry_id
+            )
+            return
 
-# -------------------------------------------------------------------------
-# Helpers
-# -------------------------------------------------------------------------
+        registry = er.async_get(self.hass)
 
+        for sensor in [*sensors[count:], *countdowns[count:]]:
+            if sensor.registry_entry is not None:
+                registry.async_remove(sensor.entity_id)
+            elif sensor.hass is not None:
+                self.hass.async_create_task(sensor.async_remove())
 
-def get_transport_section(journey: dict[str, Any]) -> dict[str, Any]:
-    """Return the public transport section of a journey.
+        del sensors[count:]
+        del countdowns[count:]
 
-    Newer SNCF/Navitia responses can contain several sections for a direct
-    journey, for example:
+    @callback
+    def async_routes_updated(self, added: set[str], changed: set[str]) -> None:
+        """Apply the routes added or reconfigured by the coordinator."""
+        # Les entités des trajets supprimés sont retirées par Home Assistant
+        for subentry_id in set(self.train_sensors) - set(
+            self.coordinator.entry.subentries
+        ):
+            del self.train_sensors[subentry_id]
+            del self.countdown_sensors[subentry_id]
 
-        crow_fly
-        public_transport
-        crow_fly
+        for subentry_id in added:
+            self.async_add_route(subentry_id)
 
-    Older responses may contain the public transport section directly as
-    the first section.
+        for subentry_id in changed:
+            self.async_resize_route(subentry_id)
 
-    We therefore search explicitly for the public_transport section and
-    fall back to the first section for compatibility.
-    """
-    sections = journey.get("sections", [])
+    @callback
+    def async_update_routes(self) -> None:
+        """Add the train sensors of the slots newly filled by the coordinator."""
+        for subentry_id, sensors in self.train_sensors.items():
+            if self._filled_slots(subentry_id) > len(sensors):
+                self.async_resize_route(subentry_id)
 
-    if not isinstance(sections, list):
-        return {}
 
-    for section in sections:
-        if not isinstance(section, dict):
-            continue
+# -------------------------------------------------------------------------
+# Helpers
+# -------------------------------------------------------------------------
+
 
-        if section.get("type") == "public_transport":
-            return section
+def route_device_info(
+    coordinator: SncfUpdateCoordinator,
+    train_id: str,
+) -> DeviceInfo:
+    """Return the device of a route, holding its static data.
 
-    # Compatibility with the previous API format.
-    for section in sections:
-        if isinstance(section, dict):
-            return section
+    The stop ids do not change for a route: exposing them on the device
+    avoids storing them with every state in the recorder.
+    """
+    entry = coordinator.entry.subentries[train_id]
+
+    return {
+        "identifiers": {
+            (DOMAIN, train_id),
+        },
+        "name": (
+            f"SNCF {entry.data[CONF_DEPARTURE_NAME]} → {entry.data[CONF_ARRIVAL_NAME]}"
+        ),
+        "manufacturer": "Master13011",
+        "model": "API",
+        "model_id": f"{entry.data[CONF_FROM]} → {entry.data[CONF_TO]}",
+        "entry_type": DeviceEntryType.SERVICE,
+    }
+
+
+def connection_attributes(
+    coordinator: SncfUpdateCoordinator,
+    itinerary: Itinerary,
+) -> dict[str, Any]:
+    """Return the attributes describing a one-transfer itinerary."""
+    first = coordinator.entry.subentries[itinerary.first.subentry_id].data
+    second = coordinator.entry.subentries[itinerary.second.subentry_id].data
+
+    time_formatter = (
+        datetime_to_timestamp if coordinator.compact_attributes else format_datetime
+    )
 
-    return {}
+    return {
+        "departure": first[CONF_DEPARTURE_NAME],
+        "transfer": first[CONF_ARRIVAL_NAME],
+        "arrival": second[CONF_ARRIVAL_NAME],
+        "departure_time": time_formatter(itinerary.departure),
+        "transfer_arrival_time": time_formatter(itinerary.first.arrival),
+        "transfer_departure_time": time_formatter(itinerary.second.departure),
+        "arrival_time": time_formatter(itinerary.arrival),
+        "transfer_minutes": int(itinerary.transfer.total_seconds() // 60),
+        "trains": [itinerary.first.train_num, itinerary.second.train_num],
+        "delay_minutes": itinerary.first.delay + itinerary.second.delay,
+    }
 
 
 # -------------------------------------------------------------------------
@@ -127,6 +283,7 @@ class SncfJourneySensor(
     _attr_name = "Trajets"
     _attr_icon = "mdi:train"
     _attr_native_unit_of_measurement = "trajets"
+    _unrecorded_attributes = frozenset({"connections"})
 
     def __init__(
         self,
@@ -149,9 +306,24 @@ class SncfJourneySensor(
 
         self._attr_native_value = len(coordinator.data)
 
-        self._attr_extra_state_attributes = {
-            "update_interval": coordinator.update_interval_minutes,
-            "outside_interval": coordinator.outside_interval_minutes,
+        self._attr_extra_state_attributes = self._attributes()
+
+    def _attributes(self) -> dict[str, Any]:
+        """Return the intervals and the upcoming connections."""
+        now = dt_util.now()
+        upcoming = [
+            itinerary
+            for itinerary in self.coordinator.connections
+            if itinerary.departure >= now
+        ]
+
+        return {
+            "update_interval": self.coordinator.update_interval_minutes,
+            "outside_interval": self.coordinator.outside_interval_minutes,
+            "connections": [
+                connection_attributes(self.coordinator, itinerary)
+                for itinerary in upcoming[:MAX_CONNECTIONS]
+            ],
         }
 
     @callback
@@ -160,10 +332,7 @@ class SncfJourneySensor(
 
         self._attr_native_value = len(self.coordinator.data)
 
-        self._attr_extra_state_attributes = {
-            "update_interval": self.coordinator.update_interval_minutes,
-            "outside_interval": self.coordinator.outside_interval_minutes,
-        }
+        self._attr_extra_state_attributes = self._attributes()
 
         self.async_write_ha_state()
 
@@ -178,79 +347,83 @@ class SncfTrainSensor(
     _attr_icon = "mdi:train"
     _attr_attribution = ATTRIBUTION
     _attr_device_class = SensorDeviceClass.TIMESTAMP
+    _unrecorded_attributes = frozenset(
+        {
+            "arrival_time",
+            "base_departure_time",
+            "base_arrival_time",
+            "duration_minutes",
+            "departure_stop_id",
+            "arrival_stop_id",
+            "direction",
+            "physical_mode",
+            "commercial_mode",
+            "disruption_message",
+        }
+    )
 
     def __init__(
         self,
         coordinator: SncfUpdateCoordinator,
         train_id: str,
-        journey_id: int,
+        slot: int,
     ) -> None:
         """Initialize the sensor."""
         super().__init__(coordinator)
 
         self.tid = train_id
-        self.jid = journey_id
+        self.slot = slot
 
         entry = self.coordinator.entry.subentries[train_id]
-        journey = coordinator.data[train_id][journey_id]
 
-        section = get_transport_section(journey)
+        self.departure = entry.data[CONF_FROM]
+        self.arrival = entry.data[CONF_TO]
 
-        departure_time = parse_datetime(section.get("base_departure_date_time", ""))
+        self._attr_name = f"Train {slot + 1}"
 
-        dep_name = entry.data[CONF_DEPARTURE_NAME]
-        arr_name = entry.data[CONF_ARRIVAL_NAME]
+        self._attr_unique_id = f"{entry.subentry_id}_{slot}"
 
-        self.departure = entry.data[CONF_FROM]
-        self.arrival = entry.data[CONF_TO]
+        self._attr_device_info = route_device_info(coordinator, train_id)
 
-        self._attr_name = f"Train {journey_id + 1}"
+        self._attr_extra_state_attributes = {}
+        self._update_from_journey()
 
-        self._attr_unique_id = f"{entry.subentry_id}_{journey_id}"
+    def _update_from_journey(self) -> bool:
+        """Refresh value and attributes from the journey assigned to the slot.
 
-        self._attr_extra_state_attributes = self._extra_attributes(journey)
+        Return True when the state differs from the previous one.
+        """
+        journey = self.coordinator.get_slot_journey(self.tid, self.slot)
 
-        self._attr_device_info = {
-            "identifiers": {
-                (DOMAIN, entry.subentry_id),
-            },
-            "name": f"SNCF {dep_name} → {arr_name}",
-            "manufacturer": "Master13011",
-            "model": "API",
-            "entry_type": DeviceEntryType.SERVICE,
-        }
+        if journey is None:
+            native_value = None
+            attributes: dict[str, Any] = {}
+        else:
+            section = get_transport_section(journey)
+            native_value = parse_datetime(
+                section.get(
+                    "base_departure_date_time",
+                    "",
+                )
+            )
+            attributes = self._extra_attributes(journey)
+
+        if (
+            native_value == self._attr_native_value
+            and attributes == self._attr_extra_state_attributes
+        ):
+            return False
 
-        self._attr_native_value = departure_time
+        self._attr_native_value = native_value
+        self._attr_extra_state_attributes = attributes
+        return True
 
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
-
-        journeys = self.coordinator.data.get(
-            self.tid,
-            [],
-        )
-
-        if self.jid >= len(journeys):
-            self._attr_native_value = None
-            self._attr_extra_state_attributes = {}
+        if self._update_from_journey():
+            self.coordinator.metrics.entity_writes.inc(self.tid)
             self.async_write_ha_state()
-            return
-
-        journey = journeys[self.jid]
-
-        section = get_transport_section(journey)
-
-        self._attr_native_value = parse_datetime(
-            section.get(
-                "base_departure_date_time",
-                "",
-            )
-        )
-
-        self._attr_extra_state_attributes = self._extra_attributes(journey)
-
-        self.async_write_ha_state()
 
     def _extra_attributes(
         self,
@@ -288,6 +461,40 @@ class SncfTrainSensor(
         if not isinstance(display_informations, dict):
             display_informations = {}
 
+        if self.coordinator.compact_attributes:
+            return {
+                "departure_time": to_timestamp(
+                    journey.get(
+                        "departure_date_time",
+                        "",
+                    )
+                ),
+                "arrival_time": to_timestamp(
+                    journey.get(
+                        "arrival_date_time",
+                        "",
+                    )
+                ),
+                "base_departure_time": to_timestamp(
+                    section.get(
+                        "base_departure_date_time",
+                        "",
+                    )
+                ),
+                "base_arrival_time": to_timestamp(
+                    section.get(
+                        "base_arrival_date_time",
+                        "",
+                    )
+                ),
+                "delay_minutes": delay,
+                "duration_minutes": get_duration(journey),
+                "has_delay": delay > 0,
+                "train_num": get_train_num(journey),
+                "status": get_train_status(journey),
+                "disruption_message": journey.get("disruption_message"),
+            }
+
         return {
             "departure_time": format_time(
                 journey.get(
@@ -331,9 +538,125 @@ class SncfTrainSensor(
                 "",
             ),
             "train_num": get_train_num(journey),
+            "status": get_train_status(journey),
+            "disruption_message": journey.get("disruption_message"),
         }
 
 
+class SncfCountdownSensor(
+    CoordinatorEntity[SncfUpdateCoordinator],
+    SensorEntity,
+):
+    """Minutes until the departure of the train of a slot.
+
+    The value is computed locally from the departure parsed by the
+    coordinator and written only when it changes: every minute during the
+    last hour, every COUNTDOWN_COARSE_STEP minutes before (rounded up).
+    """
+
+    _attr_has_entity_name = True
+    _attr_icon = "mdi:timer-sand"
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = UnitOfTime.MINUTES
+
+    def __init__(
+        self,
+        coordinator: SncfUpdateCoordinator,
+        train_id: str,
+        slot: int,
+    ) -> None:
+        """Initialize the countdown sensor."""
+        super().__init__(coordinator)
+
+        self.tid = train_id
+        self.slot = slot
+
+        self._attr_name = f"Train {slot + 1} - départ dans"
+
+        self._attr_unique_id = f"{train_id}_{slot}_countdown"
+
+        self._attr_device_info = route_device_info(coordinator, train_id)
+
+        self._departure: datetime | None = None
+        self._unsub_tick: CALLBACK_TYPE | None = None
+        self._update_departure()
+
+    async def async_added_to_hass(self) -> None:
+        """Start the countdown when added to Home Assistant."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self._cancel_tick)
+        self._schedule_tick()
+
+    def _update_departure(self) -> None:
+        """Take the departure of the train currently in the slot."""
+        entry = self.coordinator.get_slot_entry(self.tid, self.slot)
+
+        self._departure = (
+            None if entry is None or entry.is_cancelled else entry.departure
+        )
+        self._attr_native_value = self._minutes_left(dt_util.now())
+
+    def _minutes_left(self, now: datetime) -> int | None:
+        """Return the minutes until departure, 0 once the train has left."""
+        if self._departure is None:
+            return None
+
+        minutes = max(math.ceil((self._departure - now).total_seconds() / 60), 0)
+
+        if minutes > COUNTDOWN_FINE_MINUTES:
+            return math.ceil(minutes / COUNTDOWN_COARSE_STEP) * COUNTDOWN_COARSE_STEP
+
+        return minutes
+
+    @callback
+    def _cancel_tick(self) -> None:
+        """Cancel the next countdown update."""
+        if self._unsub_tick is not None:
+            self._unsub_tick()
+            self._unsub_tick = None
+
+    @callback
+    def _schedule_tick(self) -> None:
+        """Schedule the update at the next change of the displayed value."""
+        self._cancel_tick()
+
+        if not self._attr_native_value or self._departure is None:
+            return
+
+        step = (
+            COUNTDOWN_COARSE_STEP
+            if self._attr_native_value > COUNTDOWN_FINE_MINUTES
+            else 1
+        )
+
+        self._unsub_tick = async_track_point_in_time(
+            self.hass,
+            self._async_tick,
+            self._departure - timedelta(minutes=self._attr_native_value - step),
+        )
+
+    @callback
+    def _async_tick(self, now: datetime) -> None:
+        """Write the new minute and schedule the next one."""
+        self._unsub_tick = None
+        self._attr_native_value = self._minutes_left(now)
+        self.coordinator.metrics.entity_writes.inc(self.tid)
+        self.async_write_ha_state()
+        self._schedule_tick()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Follow the train of the slot and its new departure time."""
+        previous = (self._departure, self._attr_native_value)
+
+        self._update_departure()
+        self._schedule_tick()
+
+        if (self._departure, self._attr_native_value) != previous:
+            self.coordinator.metrics.entity_writes.inc(self.tid)
+            self.async_write_ha_state()
+
+
 class SncfAllTrainsLineSensor(
     CoordinatorEntity[SncfUpdateCoordinator],
     SensorEntity,
@@ -343,6 +666,14 @@ class SncfAllTrainsLineSensor(
     _attr_has_entity_name = True
     _attr_icon = "mdi:train"
     _attr_attribution = ATTRIBUTION
+    _unrecorded_attributes = frozenset(
+        {
+            "departure_time",
+            "base_departure_time",
+            "delay_minutes",
+            "status",
+        }
+    )
 
     def __init__(
         self,
@@ -358,87 +689,59 @@ class SncfAllTrainsLineSensor(
 
         self._attr_unique_id = f"{train_id}_all_trains_line"
 
-        self._attr_device_info = {
-            "identifiers": {
-                (DOMAIN, train_id),
-            },
-            "name": "SNCF",
-            "manufacturer": "Master13011",
-            "model": "API",
-            "entry_type": DeviceEntryType.SERVICE,
-        }
+        self._attr_device_info = route_device_info(coordinator, train_id)
+
+        self._update_attributes()
 
     @callback
     def _handle_coordinator_update(self) -> None:
         """Update all trains values on a single line."""
+        self._update_attributes()
+        self.coordinator.metrics.entity_writes.inc(self.tid)
+        self.async_write_ha_state()
 
+    def _update_attributes(self) -> None:
+        """Compute the line attributes from the coordinator data."""
         journeys = self.coordinator.data.get(
             self.tid,
             [],
         )
 
+        compact = self.coordinator.compact_attributes
+        time_formatter = datetime_to_timestamp if compact else format_datetime
+
         departure_times = []
         base_departure_times = []
         delays = []
+        statuses = []
 
         overall_has_delay = False
 
-        for journey in journeys:
-            if not isinstance(journey, dict):
-                continue
-
-            section = get_transport_section(journey)
-
-            arr_dt = parse_datetime(
-                journey.get(
-                    "arrival_date_time",
-                    "",
-                )
-            )
-
-            base_arr_dt = parse_datetime(
-                section.get(
-                    "base_arrival_date_time",
-                    "",
-                )
-            )
-
-            delay = (
-                int((arr_dt - base_arr_dt).total_seconds() / 60)
-                if arr_dt and base_arr_dt
-                else 0
-            )
+        # Dates et retards déjà calculés par la timeline du coordinator
+        for entry in self.coordinator.timeline.route(self.tid):
+            departure_times.append(time_formatter(entry.departure))
+            base_departure_times.append(time_formatter(entry.base_departure))
+            delays.append(entry.delay)
+            statuses.append(entry.status)
 
-            departure_times.append(
-                format_time(
-                    journey.get(
-                        "departure_date_time",
-                        "",
-                    )
-                )
-            )
-
-            base_departure_times.append(
-                format_time(
-                    section.get(
-                        "base_departure_date_time",
-                        "",
-                    )
-                )
-            )
-
-            delays.append(str(delay))
-
-            if delay > 0:
+            if entry.has_delay:
                 overall_has_delay = True
 
-        self._attr_extra_state_attributes = {
-            "departure_time": "; ".join(departure_times),
-            "base_departure_time": "; ".join(base_departure_times),
-            "delay_minutes": "; ".join(delays),
-            "has_delay": overall_has_delay,
-        }
+        if compact:
+            self._attr_extra_state_attributes = {
+                "departure_time": departure_times,
+                "base_departure_time": base_departure_times,
+                "delay_minutes": delays,
+                "status": statuses,
+                "has_delay": overall_has_delay,
+            }
+        else:
+            self._attr_extra_state_attributes = {
+                "departure_time": "; ".join(departure_times),
+                "base_departure_time": "; ".join(base_departure_times),
+                "delay_minutes": "; ".join(str(delay) for delay in delays),
+                "status": "; ".join(statuses),
+                "has_delay": overall_has_delay,
+            }
 
         self._attr_native_value = len(journeys)
-
-        self.async_write_ha_state()
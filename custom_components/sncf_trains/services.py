@@ -0,0 +1,46 @@
+"""Services of the SNCF Trains integration."""
+
+import voluptuous as vol
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant, ServiceCall, callback
+from homeassistant.exceptions import ServiceValidationError
+
+from .const import DOMAIN
+from .profiling import DEFAULT_PROFILE_REFRESHES, MAX_PROFILE_REFRESHES
+
+SERVICE_PROFILE = "profile"
+ATTR_REFRESHES = "refreshes"
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_REFRESHES, default=DEFAULT_PROFILE_REFRESHES): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=MAX_PROFILE_REFRESHES)
+        ),
+    }
+)
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the services of the integration."""
+
+    async def async_profile(call: ServiceCall) -> None:
+        """Profile the next refreshes of every loaded entry."""
+        coordinators = [
+            entry.runtime_data
+            for entry in hass.config_entries.async_entries(DOMAIN)
+            if entry.state is ConfigEntryState.LOADED
+        ]
+
+        if not coordinators:
+            raise ServiceValidationError("Aucune intégration SNCF Trains chargée")
+
+        for coordinator in coordinators:
+            coordinator.async_start_profiling(call.data[ATTR_REFRESHES])
+            # Premier rafraîchissement profilé sans attendre l'intervalle
+            await coordinator.async_request_refresh()
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_PROFILE, async_profile, schema=PROFILE_SCHEMA
+    )
@@ -0,0 +1,67 @@
+"""Tests for the route activity taken from Home Assistant entities."""
+
+import pytest
+
+from custom_components.sncf_trains.activity import (
+    is_route_active,
+    is_state_on,
+    route_entities,
+)
+from custom_components.sncf_trains.const import (
+    CONF_ACTIVE_ENTITIES,
+    CONF_INACTIVE_ENTITIES,
+)
+
+ROUTE = {
+    CONF_ACTIVE_ENTITIES: ["person.alice", "binary_sensor.workday"],
+    CONF_INACTIVE_ENTITIES: ["calendar.holidays"],
+}
+
+
+@pytest.mark.asyncio
+async def test_is_state_on(hass):
+    """Test the active, inactive and unknown entity states."""
+    for entity_id, state, expected in (
+        ("person.alice", "home", True),
+        ("person.bob", "not_home", False),
+        ("zone.work", "0", False),
+        ("zone.home", "2", True),
+        ("input_boolean.remote_work", "off", False),
+        ("binary_sensor.workday", "unavailable", None),
+    ):
+        hass.states.async_set(entity_id, state)
+        assert is_state_on(hass.states.get(entity_id)) is expected
+
+    assert is_state_on(None) is None
+
+
+@pytest.mark.asyncio
+async def test_route_active(hass):
+    """Test that every active entity and no inactive entity are required."""
+    hass.states.async_set("person.alice", "home")
+    hass.states.async_set("binary_sensor.workday", "on")
+    hass.states.async_set("calendar.holidays", "off")
+
+    assert route_entities(ROUTE) == {
+        "person.alice",
+        "binary_sensor.workday",
+        "calendar.holidays",
+    }
+    assert is_route_active(hass, ROUTE)
+    assert is_route_active(hass, {})
+
+    hass.states.async_set("calendar.holidays", "on")
+    assert not is_route_active(hass, ROUTE)
+
+    hass.states.async_set("calendar.holidays", "off")
+    hass.states.async_set("binary_sensor.workday", "off")
+    assert not is_route_active(hass, ROUTE)
+
+
+@pytest.mark.asyncio
+async def test_route_active_unknown_entity(hass):
+    """Test that a missing or unavailable entity never suspends a route."""
+    hass.states.async_set("person.alice", "unavailable")
+    hass.states.async_set("calendar.holidays", "unknown")
+
+    assert is_route_active(hass, ROUTE)
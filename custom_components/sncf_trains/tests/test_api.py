@@ -0,0 +1,314 @@
+"""Tests for the SNCF API client."""
+
+import asyncio
+import json
+from datetime import timedelta
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.util import dt as dt_util
+
+from custom_components.sncf_trains.api import (
+    API_KEY_DAILY_QUOTA,
+    ApiKeyUsage,
+    ConnectionStats,
+    Priority,
+    RequestExpired,
+    RequestScheduler,
+    SncfApiClient,
+    TokenBucket,
+    create_session,
+    encode_token,
+)
+
+
+class _FakeResponse:
+    """Minimal aiohttp response."""
+
+    def __init__(self, status: int, payload: dict) -> None:
+        self.status = status
+        self._payload = payload
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    def raise_for_status(self) -> None:
+        """Accept every status not handled by the client."""
+
+    async def read(self) -> bytes:
+        return json.dumps(self._payload).encode()
+
+    async def json(self) -> dict:
+        return self._payload
+
+
+class _FakeSession:
+    """Session answering with a status per API key."""
+
+    def __init__(self, statuses: dict[str, int]) -> None:
+        self.statuses = statuses
+        self.calls: list[str] = []
+
+    def get(self, url, headers, params, timeout):
+        token = headers["Authorization"].removeprefix("Basic ")
+        self.calls.append(token)
+        return _FakeResponse(self.statuses.get(token, 200), {"journeys": [{}]})
+
+
+@pytest.mark.asyncio
+async def test_api_client_balances_keys():
+    """Test that requests are spread over the keys of the pool."""
+    session = _FakeSession({})
+    client = SncfApiClient(session, ["key_a", "key_b"])
+
+    for _ in range(4):
+        assert await client.fetch_journeys("from", "to", "20260821T070000") == [{}]
+
+    assert session.calls.count(encode_token("key_a")) == 2
+    assert session.calls.count(encode_token("key_b")) == 2
+
+
+@pytest.mark.asyncio
+async def test_api_client_quarantines_rate_limited_key():
+    """Test that a key answering 429 is skipped until its quarantine ends."""
+    session = _FakeSession({encode_token("key_a"): 429})
+    client = SncfApiClient(session, ["key_a", "key_b"])
+
+    assert await client.fetch_journeys("from", "to", "20260821T070000") == [{}]
+    assert await client.fetch_journeys("from", "to", "20260821T070000") == [{}]
+
+    assert session.calls == [
+        encode_token("key_a"),
+        encode_token("key_b"),
+        encode_token("key_b"),
+    ]
+    assert client.key_stats()[0]["quarantined"] is True
+
+
+@pytest.mark.asyncio
+async def test_api_client_every_key_failing():
+    """Test the errors raised when no key of the pool is usable."""
+    session = _FakeSession({encode_token("key_a"): 401})
+    client = SncfApiClient(session, "key_a")
+
+    with pytest.raises(ConfigEntryAuthFailed):
+        await client.fetch_journeys("from", "to", "20260821T070000")
+
+    session = _FakeSession({encode_token("key_a"): 401, encode_token("key_b"): 429})
+    client = SncfApiClient(session, ["key_a", "key_b"])
+
+    with pytest.raises(RuntimeError):
+        await client.fetch_journeys("from", "to", "20260821T070000")
+
+
+@pytest.mark.asyncio
+async def test_api_key_usage_survives_restart(hass, hass_storage):
+    """Test that the calls of the day are saved, hashed, and restored."""
+    session = _FakeSession({})
+    client = SncfApiClient(session, "key_a", usage=ApiKeyUsage(hass, "entry"))
+    await client.async_restore_usage()
+
+    for _ in range(3):
+        await client.fetch_journeys("from", "to", "20260821T070000")
+
+    await client.usage.async_save()
+
+    saved = str(hass_storage["sncf_trains.entry.api_usage"]["data"])
+    assert "key_a" not in saved
+    assert encode_token("key_a") not in saved
+
+    restarted = SncfApiClient(session, "key_a", usage=ApiKeyUsage(hass, "entry"))
+    await restarted.async_restore_usage()
+
+    assert restarted.remaining_calls() == API_KEY_DAILY_QUOTA - 3
+
+    # Nouveau jour dans le fuseau de Home Assistant : compteur remis à zéro
+    with patch(
+        "custom_components.sncf_trains.api.dt_util.now",
+        return_value=dt_util.now() + timedelta(days=1),
+    ):
+        assert restarted.remaining_calls() == API_KEY_DAILY_QUOTA
+
+
+@pytest.mark.asyncio
+async def test_api_client_warm_up_reuses_connection():
+    """Test that a warmed-up connection is reused by the next API call."""
+    app = web.Application()
+
+    async def _root(_request: web.Request) -> web.Response:
+        return web.Response()
+
+    async def _journeys(_request: web.Request) -> web.Response:
+        return web.json_response({"journeys": [{}], "disruptions": []})
+
+    app.router.add_get("/", _root)
+    app.router.add_get("/v1/coverage/sncf/journeys", _journeys)
+
+    server = TestServer(app)
+    await server.start_server()
+
+    stats = ConnectionStats()
+    session = create_session(False, stats)
+    client = SncfApiClient(
+        session,
+        "key_a",
+        api_base=str(server.make_url("")).rstrip("/"),
+        connection_stats=stats,
+    )
+
+    try:
+        cold = await client.async_warm_up()
+        assert cold is not None
+        assert stats.created == 1
+
+        assert await client.fetch_journeys("from", "to", "20260821T070000") == [{}]
+    finally:
+        await session.close()
+        await server.close()
+
+    # Pas de nouvelle connexion pour l'appel API après la préparation
+    assert stats.created == 1
+    assert stats.reused == 1
+    assert stats.as_dict()["warm_ups"] == 1
+    assert stats.as_dict()["first_byte_ms_last"] is not None
+
+
+class _PagedSession:
+    """Session answering journeys pages linked by "next" links."""
+
+    def __init__(self, pages: list[dict]) -> None:
+        self.pages = pages
+        self.requests: list[tuple[str, dict]] = []
+
+    def get(self, url, headers, params, timeout):
+        self.requests.append((url, params))
+        return _FakeResponse(200, self.pages[len(self.requests) - 1])
+
+
+@pytest.mark.asyncio
+async def test_api_client_time_frame_query_and_paging():
+    """Test the time frame parameters and the paging through next links."""
+    session = _PagedSession(
+        [
+            {
+                "journeys": [{"id": 1}],
+                "disruptions": [{"id": "d1"}],
+                "links": [{"type": "next", "href": "https://next/page2"}],
+            },
+            {
+                "journeys": [{"id": 2}, {"id": 3}],
+                "links": [{"type": "next", "href": "https://next/page3"}],
+            },
+        ]
+    )
+    client = SncfApiClient(session, "key_a")
+
+    journeys = await client.fetch_journeys(
+        "from", "to", "20260821T070000", 3, timeframe_duration=10800, max_pages=3
+    )
+
+    assert journeys == [{"id": 1}, {"id": 2}, {"id": 3}]
+    assert journeys.disruptions == [{"id": "d1"}]
+    assert len(session.requests) == 2
+
+    params = session.requests[0][1]
+    assert params["timeframe_duration"] == "10800"
+    assert params["max_nb_journeys"] == "3"
+    assert params["max_nb_transfers"] == "0"
+    assert "count" not in params
+    assert session.requests[1] == ("https://next/page2", {})
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_shapes_requests():
+    """Test that requests beyond the burst wait for a token."""
+    session = _FakeSession({})
+    rate_limiter = TokenBucket(rate=10, burst=2)
+    client = SncfApiClient(
+        session, "key_a", scheduler=RequestScheduler(rate_limiter)
+    )
+
+    with patch(
+        "custom_components.sncf_trains.api.asyncio.sleep", new=AsyncMock()
+    ) as mock_sleep:
+        for _ in range(3):
+            await client.search_stations("Paris")
+
+    assert len(session.calls) == 3
+    assert rate_limiter.acquired == 3
+    assert rate_limiter.delayed == 1
+    assert mock_sleep.await_args.args[0] == pytest.approx(0.1, abs=0.01)
+
+
+@pytest.mark.asyncio
+async def test_scheduler_serves_most_urgent_first():
+    """Test that waiting requests get the slot by priority, then arrival."""
+    scheduler = RequestScheduler(max_concurrent=1)
+    order: list[str] = []
+    release = asyncio.Event()
+
+    async def _request(name: str, priority: Priority) -> None:
+        async with scheduler.slot(priority):
+            order.append(name)
+            await release.wait()
+
+    tasks = [asyncio.create_task(_request("running", Priority.ROUTINE))]
+    await asyncio.sleep(0)
+
+    for name, priority in (
+        ("prefetch", Priority.PREFETCH),
+        ("routine", Priority.ROUTINE),
+        ("search", Priority.INTERACTIVE),
+        ("imminent", Priority.IMMINENT),
+    ):
+        tasks.append(asyncio.create_task(_request(name, priority)))
+        await asyncio.sleep(0)
+
+    assert scheduler.depth == 4
+
+    release.set()
+    await asyncio.gather(*tasks)
+
+    assert order == ["running", "search", "imminent", "routine", "prefetch"]
+    assert scheduler.max_depth == 4
+    assert scheduler.as_dict()["priorities"]["interactive"]["requests"] == 1
+
+
+@pytest.mark.asyncio
+async def test_scheduler_expires_stale_background_request():
+    """Test that background work waiting past its deadline is dropped."""
+    scheduler = RequestScheduler(max_concurrent=1)
+    release = asyncio.Event()
+
+    async def _running() -> None:
+        async with scheduler.slot(Priority.INTERACTIVE):
+            await release.wait()
+
+    running = asyncio.create_task(_running())
+    await asyncio.sleep(0)
+
+    with (
+        patch.dict(
+            "custom_components.sncf_trains.api.QUEUE_DEADLINES",
+            {Priority.PREFETCH: 0.01},
+        ),
+        pytest.raises(RequestExpired),
+    ):
+        async with scheduler.slot(Priority.PREFETCH):
+            pass
+
+    release.set()
+    await running
+
+    assert scheduler.stats[Priority.PREFETCH].expired == 1
+    assert scheduler.depth == 0
+
+    # Le créneau est libre pour la suite
+    async with scheduler.slot(Priority.ROUTINE):
+        assert scheduler.as_dict()["in_flight"] == 1
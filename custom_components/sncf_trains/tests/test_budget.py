@@ -0,0 +1,82 @@
+"""Tests for the share of the daily API quota between routes."""
+
+from datetime import timedelta
+
+from custom_components.sncf_trains.budget import (
+    RouteDemand,
+    allocate_intervals,
+    urgency,
+)
+
+TWO_MINUTES = timedelta(minutes=2)
+
+
+def test_urgency():
+    """Test the urgency of a route from its next departure."""
+    assert urgency(None) == 1.0
+    assert urgency(timedelta(hours=3)) == 1.0
+    assert urgency(timedelta(minutes=30)) == 2.0
+    assert urgency(timedelta(seconds=10)) == 12.0
+
+
+def test_allocate_without_pressure():
+    """Test that routes keep their interval when the quota is enough."""
+    demands = {
+        "commute": RouteDemand(TWO_MINUTES, calls=100, weight=5),
+        "weekend": RouteDemand(TWO_MINUTES, calls=100),
+    }
+
+    assert allocate_intervals(demands, 200, timedelta(hours=5)) == {
+        "commute": TWO_MINUTES,
+        "weekend": TWO_MINUTES,
+    }
+
+
+def test_allocate_by_weight():
+    """Test that the priority route keeps its interval under pressure."""
+    demands = {
+        "commute": RouteDemand(TWO_MINUTES, calls=100, weight=3),
+        "weekend": RouteDemand(TWO_MINUTES, calls=100),
+    }
+
+    intervals = allocate_intervals(demands, 120, timedelta(hours=5))
+
+    # commute : 90 appels sur 100 -> 2 min 14 s, arrondi à la minute
+    assert intervals == {
+        "commute": timedelta(minutes=3),
+        "weekend": timedelta(minutes=7),
+    }
+
+
+def test_allocate_gives_back_unused_share():
+    """Test that a route needing less than its share leaves it to others."""
+    demands = {
+        "commute": RouteDemand(TWO_MINUTES, calls=300),
+        "evening": RouteDemand(timedelta(minutes=60), calls=10),
+    }
+
+    intervals = allocate_intervals(demands, 160, timedelta(hours=5))
+
+    assert intervals["evening"] == timedelta(minutes=60)
+    assert intervals["commute"] == timedelta(minutes=4)
+
+
+def test_allocate_by_next_departure():
+    """Test that an imminent departure gets a larger share."""
+    demands = {
+        "soon": RouteDemand(TWO_MINUTES, calls=100, next_departure=timedelta(minutes=10)),
+        "later": RouteDemand(TWO_MINUTES, calls=100, next_departure=timedelta(hours=4)),
+    }
+
+    intervals = allocate_intervals(demands, 100, timedelta(hours=5))
+
+    assert intervals["soon"] < intervals["later"]
+
+
+def test_allocate_quota_exhausted():
+    """Test that no refresh is planned before the reset without calls left."""
+    demands = {"commute": RouteDemand(TWO_MINUTES, calls=100)}
+
+    assert allocate_intervals(demands, 0, timedelta(hours=5)) == {
+        "commute": timedelta(hours=5)
+    }
@@ -7,18 +7,80 @@ from homeassistant import config_entries
 from homeassistant.data_entry_flow import FlowResultType
 
 from custom_components.sncf_trains.const import (
+    CONF_ACTIVE_ENTITIES,
+    CONF_ADDITIONAL_API_KEYS,
     CONF_API_KEY,
     CONF_ARRIVAL_CITY,
     CONF_ARRIVAL_STATION,
     CONF_DEPARTURE_CITY,
     CONF_DEPARTURE_STATION,
+    CONF_INACTIVE_ENTITIES,
     CONF_TIME_END,
     CONF_TIME_START,
     CONF_TRAIN_COUNT,
+    CONF_WEIGHT,
     DOMAIN,
 )
 
 
+def _create_entry_with_route(hass, **route_data) -> config_entries.ConfigEntry:
+    """Add an entry with one train subentry, its data completed by route_data."""
+    entry = config_entries.ConfigEntry(
+        version=1,
+        minor_version=2,
+        domain=DOMAIN,
+        title="Trains SNCF",
+        data={CONF_API_KEY: "valid_key"},
+        source=config_entries.SOURCE_USER,
+        unique_id="sncf_trains",
+        subentries_data=(
+            {
+                "data": {
+                    "from": "stop_area:dep",
+                    "to": "stop_area:arr",
+                    "departure_name": "Paris Gare de Lyon",
+                    "arrival_name": "Lyon Part Dieu",
+                    "time_start": "07:00",
+                    "time_end": "10:00",
+                    "train_count": 5,
+                    **route_data,
+                },
+                "subentry_type": "train",
+                "title": "Existing train",
+                "unique_id": "stop_area:dep_stop_area:arr_07:00_10:00",
+            },
+        ),
+    )
+    entry.add_to_hass(hass)
+    return entry
+
+
+async def _reconfigure_route(hass, entry, user_input: dict):
+    """Run the reconfigure flow of the train subentry of an entry."""
+    subentry_id = next(iter(entry.subentries))
+
+    result = await hass.config_entries.subentries.flow.async_init(
+        (entry.entry_id, "train"),
+        context={
+            "source": config_entries.SOURCE_RECONFIGURE,
+            "subentry_id": subentry_id,
+        },
+    )
+
+    assert result["type"] is FlowResultType.FORM
+    assert result["step_id"] == "reconfigure"
+
+    result = await hass.config_entries.subentries.flow.async_configure(
+        result["flow_id"],
+        user_input=user_input,
+    )
+
+    assert result["type"] is FlowResultType.ABORT
+    assert result["reason"] == "reconfigure_successful"
+
+    return entry.subentries[subentry_id].data
+
+
 @pytest.mark.asyncio
 async def test_config_flow_happy_path(hass):
     """Test the main config flow with a valid API key."""
@@ -83,6 +145,37 @@ async def test_config_flow_invalid_api_key(hass):
     assert result["errors"]["base"] == "invalid_api_key"
 
 
+@pytest.mark.asyncio
+async def test_config_flow_invalid_additional_api_key(hass):
+    """Test that every key of the pool is validated."""
+    valid_api = AsyncMock()
+    valid_api.search_stations = AsyncMock(return_value=[{"id": "stop_area:dep"}])
+
+    invalid_api = AsyncMock()
+    invalid_api.search_stations = AsyncMock(return_value=None)
+
+    with patch(
+        "custom_components.sncf_trains.config_flow.SncfApiClient",
+        side_effect=[valid_api, invalid_api],
+    ) as mock_client:
+        result = await hass.config_entries.flow.async_init(
+            DOMAIN,
+            context={"source": config_entries.SOURCE_USER},
+        )
+
+        result = await hass.config_entries.flow.async_configure(
+            result["flow_id"],
+            user_input={
+                CONF_API_KEY: "valid_key",
+                CONF_ADDITIONAL_API_KEYS: ["bad_key"],
+            },
+        )
+
+    assert mock_client.call_count == 2
+    assert result["type"] is FlowResultType.FORM
+    assert result["errors"]["base"] == "invalid_api_key"
+
+
 @pytest.mark.asyncio
 async def test_config_flow_duplicate_entry(hass):
     """Test that the integration cannot be configured twice."""
@@ -429,6 +522,65 @@ async def test_train_subentry_duplicate(hass):
     assert result["reason"] == "already_configured_as_entry"
 
 
+@pytest.mark.asyncio
+async def test_train_subentry_reconfigure_clears_weight(hass):
+    """Test that emptying the weight of a route removes it."""
+    entry = _create_entry_with_route(hass, **{CONF_WEIGHT: 3})
+
+    data = await _reconfigure_route(
+        hass,
+        entry,
+        {
+            CONF_TIME_START: "07:00",
+            CONF_TIME_END: "10:00",
+            CONF_TRAIN_COUNT: 5,
+        },
+    )
+
+    assert CONF_WEIGHT not in data
+    assert data["from"] == "stop_area:dep"
+    assert data[CONF_TRAIN_COUNT] == 5
+
+
+@pytest.mark.asyncio
+async def test_train_subentry_reconfigure_clears_entities(hass):
+    """Test that emptying the activity entities detaches the route."""
+    entry = _create_entry_with_route(
+        hass,
+        **{
+            CONF_ACTIVE_ENTITIES: ["person.alice"],
+            CONF_INACTIVE_ENTITIES: ["binary_sensor.holidays"],
+        },
+    )
+
+    data = await _reconfigure_route(
+        hass,
+        entry,
+        {
+            CONF_TIME_START: "07:00",
+            CONF_TIME_END: "10:00",
+            CONF_TRAIN_COUNT: 5,
+            CONF_INACTIVE_ENTITIES: ["binary_sensor.strike"],
+        },
+    )
+
+    assert CONF_ACTIVE_ENTITIES not in data
+    assert data[CONF_INACTIVE_ENTITIES] == ["binary_sensor.strike"]
+
+    data = await _reconfigure_route(
+        hass,
+        entry,
+        {
+            CONF_TIME_START: "07:00",
+            CONF_TIME_END: "10:00",
+            CONF_TRAIN_COUNT: 5,
+        },
+    )
+
+    assert CONF_ACTIVE_ENTITIES not in data
+    assert CONF_INACTIVE_ENTITIES not in data
+
+
 @pytest.mark.asyncio
 async def test_options_flow(hass):
     """Test the integration options flow."""
@@ -0,0 +1,104 @@
+"""Tests for the one-transfer itineraries between routes."""
+
+from datetime import timedelta
+
+from custom_components.sncf_trains.connections import scan_connections
+from custom_components.sncf_trains.disruptions import STATUS_CANCELLED
+from custom_components.sncf_trains.timeline import Timeline
+
+STOPS = {
+    "paris_lyon": ("stop_area:paris", "stop_area:lyon"),
+    "lyon_marseille": ("stop_area:lyon", "stop_area:marseille"),
+    "lyon_paris": ("stop_area:lyon", "stop_area:paris"),
+}
+
+
+def _journey(train_num: str, departure: str, arrival: str, **extra) -> dict:
+    """Create a direct journey."""
+    return {
+        "departure_date_time": departure,
+        "arrival_date_time": arrival,
+        "sections": [
+            {
+                "type": "public_transport",
+                "base_departure_date_time": departure,
+                "base_arrival_date_time": arrival,
+                "display_informations": {"trip_short_name": train_num},
+            }
+        ],
+        **extra,
+    }
+
+
+def _timeline(first_arrival: str = "20260821T090000Z") -> Timeline:
+    """Create a timeline of three routes, two of them connected at Lyon."""
+    timeline = Timeline()
+
+    timeline.update_route(
+        "paris_lyon",
+        [
+            _journey("6601", "20260821T070000Z", first_arrival),
+            _journey("6603", "20260821T080000Z", "20260821T100000Z"),
+        ],
+    )
+    timeline.update_route(
+        "lyon_marseille",
+        [
+            _journey("5101", "20260821T090300Z", "20260821T110000Z"),
+            _journey("5103", "20260821T091000Z", "20260821T103000Z"),
+            _journey("5105", "20260821T101000Z", "20260821T120000Z"),
+        ],
+    )
+    timeline.update_route(
+        "lyon_paris",
+        [_journey("6610", "20260821T093000Z", "20260821T113000Z")],
+    )
+
+    return timeline
+
+
+def _trains(itineraries) -> list[tuple[str, str]]:
+    """Return the train numbers of each itinerary."""
+    return [
+        (itinerary.first.train_num, itinerary.second.train_num)
+        for itinerary in itineraries
+    ]
+
+
+def test_scan_connections():
+    """Test the fastest feasible transfer of each first train."""
+    itineraries = scan_connections(_timeline(), STOPS, timedelta(minutes=5))
+
+    # 5101 part trop tôt, 5103 arrive avant 5101 ; pas de retour à Paris
+    assert _trains(itineraries) == [("6601", "5103"), ("6603", "5105")]
+    assert itineraries[0].transfer == timedelta(minutes=10)
+
+
+def test_scan_connections_with_delay():
+    """Test that a late first train takes a later connection."""
+    itineraries = scan_connections(
+        _timeline(first_arrival="20260821T092000Z"),
+        STOPS,
+        timedelta(minutes=5),
+    )
+
+    # Les deux premiers trains attendent 5105 : seul le second est gardé
+    assert _trains(itineraries) == [("6603", "5105")]
+
+
+def test_scan_connections_skips_cancelled_trains():
+    """Test that a cancelled train is never part of an itinerary."""
+    timeline = _timeline()
+    timeline.update_route(
+        "lyon_marseille",
+        [
+            _journey(
+                "5103",
+                "20260821T091000Z",
+                "20260821T103000Z",
+                train_status=STATUS_CANCELLED,
+            ),
+        ],
+    )
+
+    assert scan_connections(timeline, STOPS, timedelta(minutes=5)) == []
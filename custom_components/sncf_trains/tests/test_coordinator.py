@@ -7,18 +7,34 @@ from unittest.mock import AsyncMock, MagicMock, patch
 import pytest
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.helpers.update_coordinator import UpdateFailed
-
+from homeassistant.util import dt as dt_util
+
+from custom_components.sncf_trains.api import (
+    API_KEY_DAILY_QUOTA,
+    ApiKeyState,
+    ApiKeyUsage,
+    JourneyList,
+    SncfApiClient,
+    encode_token,
+)
 from custom_components.sncf_trains.const import (
     CONF_API_KEY,
     CONF_FROM,
+    CONF_GTFS_PATH,
+    CONF_INACTIVE_ENTITIES,
     CONF_OUTSIDE_INTERVAL,
     CONF_TIME_END,
     CONF_TIME_START,
     CONF_TO,
+    CONF_TRAIN_COUNT,
     CONF_UPDATE_INTERVAL,
+    CONF_WEIGHT,
     DOMAIN,
 )
-from custom_components.sncf_trains.coordinator import SncfUpdateCoordinator
+from custom_components.sncf_trains.coordinator import (
+    DISCOVERY_INTERVAL,
+    SncfUpdateCoordinator,
+)
 
 
 def _create_entry(
@@ -95,7 +111,7 @@ async def test_coordinator_success(hass):
 
     with patch(
         "custom_components.sncf_trains.coordinator.dt_util.now",
-        return_value=datetime(2026, 8, 21, 8, 0),
+        return_value=datetime(2026, 8, 21, 6, 30),
     ):
         data = await coordinator._async_update_data()
 
@@ -115,15 +131,41 @@ async def test_coordinator_success(hass):
     mock_api.fetch_journeys.assert_awaited_once()
 
     call_args = mock_api.fetch_journeys.await_args
-    assert call_args.args[:2] == (
+    assert call_args.args == (
         "stop_area:dep",
         "stop_area:arr",
+        "20260821T070000",
     )
-    assert call_args.kwargs == {"count": 10}
+    assert call_args.kwargs == {
+        "count": 5,
+        "timeframe_duration": 3 * 3600,
+        "max_pages": 3,
+    }
 
     assert coordinator.update_interval == timedelta(minutes=2)
 
 
+@pytest.mark.asyncio
+async def test_coordinator_search_starts_now_in_window(hass):
+    """Test that the search skips the part of the window already gone."""
+    entry = _create_entry(subentries={"subentry_1": _create_subentry()})
+
+    coordinator = SncfUpdateCoordinator(hass, entry)
+    coordinator.api_client = AsyncMock()
+    coordinator.api_client.fetch_journeys = AsyncMock(return_value=[])
+
+    with patch(
+        "custom_components.sncf_trains.coordinator.dt_util.now",
+        return_value=datetime(2026, 8, 21, 8, 20, 45),
+    ):
+        await coordinator._async_update_data()
+
+    call_args = coordinator.api_client.fetch_journeys.await_args
+    assert call_args.args[2] == "20260821T082000"
+    assert call_args.kwargs["count"] == 5
+    assert call_args.kwargs["timeframe_duration"] == (3 * 60 - 80) * 60
+
+
 @pytest.mark.asyncio
 async def test_coordinator_filters_journeys_with_transfers(hass):
     """Test that journeys with transfers are filtered out."""
@@ -537,3 +579,687 @@ def test_coordinator_adjust_update_interval_crosses_midnight(hass):
         )
 
     assert interval == timedelta(minutes=5)
+
+
+def _journey(train_num: str, base_departure: str) -> dict:
+    """Create a direct journey with a train number and base departure."""
+    return {
+        "nb_transfers": 0,
+        "departure_date_time": base_departure,
+        "sections": [
+            {
+                "type": "public_transport",
+                "base_departure_date_time": base_departure,
+                "display_informations": {"trip_short_name": train_num},
+            }
+        ],
+    }
+
+
+def test_coordinator_assign_slots_keeps_train_identity(hass):
+    """Test that remaining trains keep their slot when the first one departs."""
+    entry = _create_entry()
+    coordinator = SncfUpdateCoordinator(hass, entry)
+
+    first = _journey("1001", "20260821T070000")
+    second = _journey("1002", "20260821T073000")
+    third = _journey("1003", "20260821T080000")
+    fourth = _journey("1004", "20260821T083000")
+
+    coordinator._assign_slots("subentry_1", [first, second, third], 3)
+
+    assert coordinator.get_slot_journey("subentry_1", 0) is first
+    assert coordinator.get_slot_journey("subentry_1", 1) is second
+    assert coordinator.get_slot_journey("subentry_1", 2) is third
+
+    coordinator._assign_slots("subentry_1", [second, third, fourth], 3)
+
+    # Seul l'emplacement libéré par le train parti reçoit le nouveau train.
+    assert coordinator.get_slot_journey("subentry_1", 0) is fourth
+    assert coordinator.get_slot_journey("subentry_1", 1) is second
+    assert coordinator.get_slot_journey("subentry_1", 2) is third
+
+
+def test_coordinator_assign_slots_fewer_trains_than_slots(hass):
+    """Test that unused slots stay empty and are filled later."""
+    entry = _create_entry()
+    coordinator = SncfUpdateCoordinator(hass, entry)
+
+    first = _journey("1001", "20260821T070000")
+    second = _journey("1002", "20260821T073000")
+
+    coordinator._assign_slots("subentry_1", [first], 3)
+
+    assert coordinator.get_slot_journey("subentry_1", 0) is first
+    assert coordinator.get_slot_journey("subentry_1", 1) is None
+    assert coordinator.get_slot_journey("subentry_1", 2) is None
+    assert coordinator.get_slot_journey("subentry_1", 5) is None
+
+    coordinator._assign_slots("subentry_1", [first, second], 3)
+
+    assert coordinator.get_slot_journey("subentry_1", 0) is first
+    assert coordinator.get_slot_journey("subentry_1", 1) is second
+
+
+@pytest.mark.asyncio
+async def test_coordinator_deferred_setup_does_not_call_api(hass):
+    """Test that the fast startup mode prepares entities without API calls."""
+    entry = _create_entry(subentries={"subentry_1": _create_subentry()})
+
+    coordinator = SncfUpdateCoordinator(hass, entry)
+
+    with (
+        patch(
+            "custom_components.sncf_trains.coordinator.SncfApiClient",
+        ) as mock_client,
+        patch("custom_components.sncf_trains.coordinator.create_session"),
+    ):
+        await coordinator.async_deferred_setup()
+
+    mock_client.return_value.fetch_journeys.assert_not_called()
+    assert coordinator.data == {}
+    assert coordinator.last_update_success is False
+
+
+@pytest.mark.asyncio
+async def test_coordinator_gtfs_outside_window_skips_api(hass):
+    """Test that the GTFS timetable answers outside the time window."""
+    entry = _create_entry(subentries={"subentry_1": _create_subentry()})
+
+    coordinator = SncfUpdateCoordinator(hass, entry)
+    coordinator.api_client = AsyncMock()
+    coordinator.timetable = MagicMock()
+    coordinator.timetable.next_trains.return_value = [_journey("17601", "20260821T170000")]
+
+    with patch(
+        "custom_components.sncf_trains.coordinator.dt_util.now",
+        return_value=datetime(2026, 8, 21, 14, 0),
+    ):
+        data = await coordinator._async_update_data()
+
+    assert data == {"subentry_1": [_journey("17601", "20260821T170000")]}
+    coordinator.api_client.fetch_journeys.assert_not_awaited()
+    assert coordinator.timetable.next_trains.call_args.args[:2] == (
+        "stop_area:dep",
+        "stop_area:arr",
+    )
+
+
+def test_coordinator_gtfs_path_relative_to_config(hass):
+    """Test that a relative GTFS path is resolved in the configuration folder."""
+    entry = _create_entry()
+    entry.options[CONF_GTFS_PATH] = "sncf/export-ter-gtfs.zip"
+
+    coordinator = SncfUpdateCoordinator(hass, entry)
+
+    assert coordinator.gtfs_path == hass.config.path("sncf/export-ter-gtfs.zip")
+
+
+@pytest.mark.asyncio
+async def test_coordinator_gtfs_fallback_when_api_fails(hass):
+    """Test that the GTFS timetable replaces a failing API in the window."""
+    entry = _create_entry(subentries={"subentry_1": _create_subentry()})
+
+    coordinator = SncfUpdateCoordinator(hass, entry)
+    coordinator.api_client = AsyncMock()
+    coordinator.api_client.fetch_journeys = AsyncMock(return_value=None)
+    coordinator.timetable = MagicMock()
+    coordinator.timetable.next_trains.return_value = [_journey("17601", "20260821T170000")]
+
+    with (
+        patch(
+            "custom_components.sncf_trains.coordinator.dt_util.now",
+            return_value=datetime(2026, 8, 21, 8, 0),
+        ),
+        patch("custom_components.sncf_trains.coordinator.asyncio.sleep"),
+    ):
+        data = await coordinator._async_update_data()
+
+    assert data == {"subentry_1": [_journey("17601", "20260821T170000")]}
+    assert coordinator.api_client.fetch_journeys.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_coordinator_applies_response_disruptions(hass):
+    """Test that the disruptions of the response set the train status."""
+    entry = _create_entry(subentries={"subentry_1": _create_subentry()})
+
+    coordinator = SncfUpdateCoordinator(hass, entry)
+
+    journey = _journey("17601", "20260821T070000")
+    journey["sections"][0]["display_informations"]["links"] = [
+        {"type": "disruption", "id": "d1"}
+    ]
+
+    coordinator.api_client = AsyncMock()
+    coordinator.api_client.fetch_journeys = AsyncMock(
+        return_value=JourneyList(
+            [journey],
+            [{"id": "d1", "severity": {"effect": "NO_SERVICE"}}],
+        )
+    )
+
+    with patch(
+        "custom_components.sncf_trains.coordinator.dt_util.now",
+        return_value=datetime(2026, 8, 21, 8, 0),
+    ):
+        data = await coordinator._async_update_data()
+
+    assert data["subentry_1"][0]["train_status"] == "cancelled"
+    assert coordinator.timeline.route("subentry_1")[0].is_cancelled
+    # Le journey reçu (gardé pour le suivi et le cache) n'est pas modifié
+    assert "train_status" not in journey
+
+
+def test_coordinator_window_duration():
+    """Test the time frame requested for a window, across midnight too."""
+    assert SncfUpdateCoordinator._window_duration("07:00", "10:30") == 3.5 * 3600
+    assert SncfUpdateCoordinator._window_duration("23:00", "01:00") == 2 * 3600
+    assert SncfUpdateCoordinator._window_duration("06:00", "06:00") == 24 * 3600
+
+
+@pytest.mark.asyncio
+async def test_coordinator_base_schedule_cached_outside_window(hass):
+    """Test that the base schedule is fetched once and used outside the window."""
+    entry = _create_entry(subentries={"subentry_1": _create_subentry()})
+
+    coordinator = SncfUpdateCoordinator(hass, entry)
+    coordinator.api_client = AsyncMock()
+    coordinator.api_client.fetch_base_schedule = AsyncMock(
+        return_value=[_journey("17601", "20260822T070000")]
+    )
+
+    with (
+        patch(
+            "custom_components.sncf_trains.coordinator.dt_util.now",
+            return_value=datetime(2026, 8, 21, 14, 0),
+        ),
+        patch.object(coordinator.base_schedule._store, "async_delay_save"),
+    ):
+        await coordinator._async_update_data()
+        data = await coordinator._async_update_data()
+
+    assert data == {"subentry_1": [_journey("17601", "20260822T070000")]}
+    coordinator.api_client.fetch_base_schedule.assert_awaited_once()
+    coordinator.api_client.fetch_journeys.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_coordinator_base_schedule_merged_with_realtime(hass):
+    """Test that realtime trains are merged into the planned ones."""
+    entry = _create_entry(subentries={"subentry_1": _create_subentry()})
+
+    coordinator = SncfUpdateCoordinator(hass, entry)
+    coordinator.api_client = AsyncMock()
+    coordinator.api_client.fetch_base_schedule = AsyncMock(
+        return_value=[
+            _journey("17601", "20260821T070000"),
+            _journey("17603", "20260821T090000"),
+            _journey("17605", "20260821T100000"),
+        ]
+    )
+    coordinator.api_client.fetch_journeys = AsyncMock(
+        return_value=[_journey("17603", "20260821T090000")]
+    )
+
+    with (
+        patch(
+            "custom_components.sncf_trains.coordinator.dt_util.now",
+            return_value=datetime(2026, 8, 21, 8, 0),
+        ),
+        patch.object(coordinator.base_schedule._store, "async_delay_save"),
+    ):
+        data = await coordinator._async_update_data()
+
+    # 17601 déjà parti ; 17605, après la réponse temps réel, reste prévu
+    assert [journey["departure_date_time"] for journey in data["subentry_1"]] == [
+        "20260821T090000",
+        "20260821T100000",
+    ]
+    coordinator.api_client.fetch_journeys.assert_awaited_once()
+
+
+def _tracked_journey(train_num: str, base_departure: str) -> dict:
+    """Create a direct journey linked to its vehicle journey."""
+    journey = _journey(train_num, base_departure)
+    journey["sections"][0].update(
+        {
+            "from": {"id": "stop_point:dep"},
+            "to": {"id": "stop_point:arr"},
+            "base_arrival_date_time": base_departure[:9] + "235000",
+            "links": [{"type": "vehicle_journey", "id": f"vj:{train_num}"}],
+        }
+    )
+    return journey
+
+
+@pytest.mark.asyncio
+async def test_coordinator_tracks_imminent_trains(hass):
+    """Test that imminent trains are refreshed without a new search."""
+    entry = _create_entry(subentries={"subentry_1": _create_subentry()})
+
+    coordinator = SncfUpdateCoordinator(hass, entry)
+    coordinator.api_client = AsyncMock()
+    coordinator.api_client.fetch_base_schedule = AsyncMock(return_value=None)
+    coordinator.api_client.fetch_journeys = AsyncMock(
+        return_value=JourneyList(
+            [
+                _tracked_journey("17601", "20260821T081000"),
+                _tracked_journey("17603", "20260821T093000"),
+            ]
+        )
+    )
+    coordinator.api_client.fetch_vehicle_journey = AsyncMock(
+        return_value={
+            "stop_times": [
+                {"stop_point": {"id": "stop_point:dep"}, "departure_time": "081500"},
+                {"stop_point": {"id": "stop_point:arr"}, "arrival_time": "235500"},
+            ],
+            "disruptions": [],
+        }
+    )
+
+    now = dt_util.as_local(datetime(2026, 8, 21, 8, 0))
+
+    with patch(
+        "custom_components.sncf_trains.coordinator.dt_util.now",
+        return_value=now,
+    ) as mock_now:
+        await coordinator._async_update_data()
+
+        mock_now.return_value = now + timedelta(minutes=2)
+        data = await coordinator._async_update_data()
+
+    coordinator.api_client.fetch_journeys.assert_awaited_once()
+    coordinator.api_client.fetch_vehicle_journey.assert_awaited_once_with("vj:17601")
+    assert [journey["departure_date_time"] for journey in data["subentry_1"]] == [
+        "20260821T081500",
+        "20260821T093000",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_coordinator_tracking_does_not_repeat_disruptions(hass):
+    """Test that the disruptions of a tracked train are not added twice."""
+    entry = _create_entry(subentries={"subentry_1": _create_subentry()})
+
+    coordinator = SncfUpdateCoordinator(hass, entry)
+    coordinator.api_client = AsyncMock()
+    coordinator.api_client.fetch_base_schedule = AsyncMock(return_value=None)
+    coordinator.api_client.fetch_journeys = AsyncMock(
+        return_value=JourneyList(
+            [_tracked_journey("17601", "20260821T081000")],
+            [{"id": "d1", "severity": {"effect": "SIGNIFICANT_DELAYS"}}],
+        )
+    )
+    coordinator.api_client.fetch_vehicle_journey = AsyncMock(
+        return_value={
+            "stop_times": [
+                {"stop_point": {"id": "stop_point:dep"}, "departure_time": "081500"},
+                {"stop_point": {"id": "stop_point:arr"}, "arrival_time": "235500"},
+            ],
+            "disruptions": [
+                {"id": "d1", "severity": {"effect": "SIGNIFICANT_DELAYS"}},
+                {"id": "d2", "severity": {"effect": "OTHER_EFFECT"}},
+            ],
+        }
+    )
+
+    now = dt_util.as_local(datetime(2026, 8, 21, 8, 0))
+
+    with patch(
+        "custom_components.sncf_trains.coordinator.dt_util.now",
+        return_value=now,
+    ) as mock_now:
+        for minutes in (0, 2, 4, 6):
+            mock_now.return_value = now + timedelta(minutes=minutes)
+            await coordinator._async_update_data()
+
+    coordinator.api_client.fetch_journeys.assert_awaited_once()
+    assert coordinator.api_client.fetch_vehicle_journey.await_count == 3
+    assert [
+        disruption["id"]
+        for disruption in coordinator._last_search["subentry_1"][1].disruptions
+    ] == ["d1", "d2"]
+
+
+@pytest.mark.asyncio
+async def test_coordinator_searches_several_imminent_trains(hass):
+    """Test that one search is preferred to tracking several trains."""
+    entry = _create_entry(subentries={"subentry_1": _create_subentry()})
+
+    coordinator = SncfUpdateCoordinator(hass, entry)
+    coordinator.api_client = AsyncMock()
+    coordinator.api_client.fetch_base_schedule = AsyncMock(return_value=None)
+    coordinator.api_client.fetch_journeys = AsyncMock(
+        return_value=JourneyList(
+            [
+                _tracked_journey("17601", "20260821T081000"),
+                _tracked_journey("17603", "20260821T081500"),
+            ]
+        )
+    )
+
+    now = dt_util.as_local(datetime(2026, 8, 21, 8, 0))
+
+    with patch(
+        "custom_components.sncf_trains.coordinator.dt_util.now",
+        return_value=now,
+    ) as mock_now:
+        await coordinator._async_update_data()
+
+        mock_now.return_value = now + timedelta(minutes=2)
+        await coordinator._async_update_data()
+
+    # Deux suivis coûteraient deux appels : une recherche n'en coûte qu'un
+    assert coordinator.api_client.fetch_journeys.await_count == 2
+    coordinator.api_client.fetch_vehicle_journey.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_coordinator_tracking_expires(hass):
+    """Test that a full search runs again after the discovery interval."""
+    entry = _create_entry(subentries={"subentry_1": _create_subentry()})
+
+    coordinator = SncfUpdateCoordinator(hass, entry)
+    coordinator.api_client = AsyncMock()
+    coordinator.api_client.fetch_base_schedule = AsyncMock(return_value=None)
+    coordinator.api_client.fetch_journeys = AsyncMock(
+        return_value=JourneyList([_tracked_journey("17601", "20260821T083000")])
+    )
+
+    now = dt_util.as_local(datetime(2026, 8, 21, 8, 0))
+    coordinator._last_search["subentry_1"] = (
+        now - DISCOVERY_INTERVAL - timedelta(minutes=1),
+        JourneyList([_tracked_journey("17601", "20260821T081000")]),
+    )
+
+    with patch(
+        "custom_components.sncf_trains.coordinator.dt_util.now",
+        return_value=now,
+    ):
+        await coordinator._async_update_data()
+
+    coordinator.api_client.fetch_journeys.assert_awaited_once()
+    coordinator.api_client.fetch_vehicle_journey.assert_not_awaited()
+    assert coordinator._last_search["subentry_1"][0] == now
+
+
+@pytest.mark.asyncio
+async def test_coordinator_suspended_route_skips_api(hass):
+    """Test that a route suspended by its entities stops polling."""
+    subentry = _create_subentry()
+    subentry.data[CONF_INACTIVE_ENTITIES] = ["input_boolean.remote_work"]
+    entry = _create_entry(subentries={"subentry_1": subentry})
+
+    hass.states.async_set("input_boolean.remote_work", "on")
+
+    coordinator = SncfUpdateCoordinator(hass, entry)
+    coordinator.api_client = AsyncMock()
+    coordinator.data = {"subentry_1": [_journey("17601", "20260821T070000")]}
+
+    with patch(
+        "custom_components.sncf_trains.coordinator.dt_util.now",
+        return_value=datetime(2026, 8, 21, 8, 0),
+    ):
+        data = await coordinator._async_update_data()
+
+    assert data == {"subentry_1": [_journey("17601", "20260821T070000")]}
+    assert coordinator.inactive_routes == {"subentry_1"}
+    assert coordinator.update_interval is None
+    coordinator.api_client.fetch_journeys.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_coordinator_resumes_route_on_state_change(hass):
+    """Test that a route becoming active again is refreshed immediately."""
+    subentry = _create_subentry()
+    subentry.data[CONF_INACTIVE_ENTITIES] = ["input_boolean.remote_work"]
+    entry = _create_entry(subentries={"subentry_1": subentry})
+
+    hass.states.async_set("input_boolean.remote_work", "on")
+
+    coordinator = SncfUpdateCoordinator(hass, entry)
+    coordinator._async_listen_activity()
+
+    assert coordinator.inactive_routes == {"subentry_1"}
+
+    with patch.object(coordinator, "async_request_refresh") as mock_refresh:
+        hass.states.async_set("input_boolean.remote_work", "off")
+        await hass.async_block_till_done()
+
+    mock_refresh.assert_called_once()
+    assert coordinator.inactive_routes == set()
+
+    coordinator._unsub_activity()
+
+
+def test_coordinator_route_offsets():
+    """Test that routes get distinct, stable parts of the interval."""
+    offsets = SncfUpdateCoordinator._route_offsets(["a", "b", "c", "d"])
+
+    assert offsets == SncfUpdateCoordinator._route_offsets(["d", "c", "b", "a"])
+
+    for rank, offset in enumerate(sorted(offsets.values())):
+        assert (rank + 1) / 4 <= offset <= (rank + 1.25) / 4
+
+
+@pytest.mark.asyncio
+async def test_coordinator_staggers_routes(hass):
+    """Test that routes are refreshed one after the other over the interval."""
+    entry = _create_entry(
+        subentries={
+            "subentry_1": _create_subentry(),
+            "subentry_2": _create_subentry(title="Lyon → Paris"),
+        }
+    )
+
+    coordinator = SncfUpdateCoordinator(hass, entry)
+    coordinator.api_client = AsyncMock()
+    coordinator.api_client.fetch_base_schedule = AsyncMock(return_value=None)
+    coordinator.api_client.fetch_journeys = AsyncMock(
+        return_value=[_journey("17601", "20260821T093000")]
+    )
+
+    now = dt_util.as_local(datetime(2026, 8, 21, 8, 0))
+
+    with patch(
+        "custom_components.sncf_trains.coordinator.dt_util.now",
+        return_value=now,
+    ) as mock_now:
+        coordinator.data = await coordinator._async_update_data()
+
+        assert coordinator.api_client.fetch_journeys.await_count == 2
+        assert coordinator.update_interval == timedelta(minutes=1)
+
+        for minutes, await_count in ((1, 3), (2, 4), (3, 5)):
+            mock_now.return_value = now + timedelta(minutes=minutes)
+            coordinator.data = await coordinator._async_update_data()
+
+            assert coordinator.api_client.fetch_journeys.await_count == await_count
+            assert set(coordinator.data) == {"subentry_1", "subentry_2"}
+
+
+def test_coordinator_shares_quota_by_weight(hass):
+    """Test that low-priority routes are polled less when quota runs short."""
+    commute = _create_subentry()
+    commute.data[CONF_WEIGHT] = 3
+    entry = _create_entry(
+        subentries={
+            "commute": commute,
+            "weekend": _create_subentry(title="Lyon → Paris"),
+        }
+    )
+
+    coordinator = SncfUpdateCoordinator(hass, entry)
+    coordinator.api_client = MagicMock(spec=SncfApiClient)
+    coordinator.api_client.remaining_calls.return_value = 100
+
+    now = datetime(2026, 8, 21, 8, 0)
+
+    with patch(
+        "custom_components.sncf_trains.coordinator.dt_util.now",
+        return_value=now,
+    ):
+        # Chaque trajet : 2 h de plage à 2 min + 14 h à 60 min = 74 appels
+        intervals = coordinator._route_intervals(now)
+
+    assert intervals == {
+        "commute": timedelta(minutes=2),
+        "weekend": timedelta(minutes=6),
+    }
+    assert coordinator.budget_intervals == {"weekend": timedelta(minutes=6)}
+
+
+@pytest.mark.asyncio
+async def test_coordinator_budget_restored_after_restart(hass, hass_storage):
+    """Test that the calls made before a restart still count against the quota."""
+    commute = _create_subentry()
+    commute.data[CONF_WEIGHT] = 3
+    entry = _create_entry(
+        subentries={
+            "commute": commute,
+            "weekend": _create_subentry(title="Lyon → Paris"),
+        }
+    )
+    entry.entry_id = "entry_1"
+
+    key_id = ApiKeyState(encode_token("test_api_key")).key_id
+    hass_storage[f"{DOMAIN}.entry_1.api_usage"] = {
+        "version": 1,
+        "minor_version": 1,
+        "key": f"{DOMAIN}.entry_1.api_usage",
+        "data": {
+            "keys": {
+                key_id: {
+                    "day": dt_util.now().date().isoformat(),
+                    "calls": API_KEY_DAILY_QUOTA - 100,
+                }
+            }
+        },
+    }
+
+    coordinator = SncfUpdateCoordinator(hass, entry)
+    coordinator.api_client = SncfApiClient(
+        MagicMock(), "test_api_key", usage=ApiKeyUsage(hass, "entry_1")
+    )
+    await coordinator.api_client.async_restore_usage()
+
+    assert coordinator.api_client.remaining_calls() == 100
+
+    now = datetime(2026, 8, 21, 8, 0)
+
+    with patch(
+        "custom_components.sncf_trains.coordinator.dt_util.now",
+        return_value=now,
+    ):
+        intervals = coordinator._route_intervals(now)
+
+    # Même partage que sans redémarrage (100 appels restants)
+    assert intervals == {
+        "commute": timedelta(minutes=2),
+        "weekend": timedelta(minutes=6),
+    }
+
+
+@pytest.mark.asyncio
+async def test_coordinator_sync_subentries(hass):
+    """Test that an added route is fetched without refreshing the others."""
+    entry = _create_entry(subentries={"subentry_1": _create_subentry()})
+
+    coordinator = SncfUpdateCoordinator(hass, entry)
+    coordinator.api_client = AsyncMock()
+    coordinator.api_client.fetch_base_schedule = AsyncMock(return_value=None)
+    coordinator.api_client.fetch_journeys = AsyncMock(
+        return_value=[_journey("17601", "20260821T093000")]
+    )
+
+    now = dt_util.as_local(datetime(2026, 8, 21, 8, 0))
+
+    with (
+        patch(
+            "custom_components.sncf_trains.coordinator.dt_util.now",
+            return_value=now,
+        ),
+        patch(
+            "custom_components.sncf_trains.coordinator.async_dispatcher_send"
+        ) as mock_send,
+    ):
+        coordinator.data = await coordinator._async_update_data()
+        assert coordinator.api_client.fetch_journeys.await_count == 1
+
+        entry.subentries = {
+            "subentry_1": entry.subentries["subentry_1"],
+            "subentry_2": _create_subentry(title="Lyon → Paris"),
+        }
+        await coordinator.async_sync_subentries()
+
+        assert coordinator.api_client.fetch_journeys.await_count == 2
+        assert set(coordinator.data) == {"subentry_1", "subentry_2"}
+        mock_send.assert_called_once()
+        assert mock_send.call_args.args[2:] == ({"subentry_2"}, set())
+
+        entry.subentries["subentry_1"].data[CONF_TRAIN_COUNT] = 3
+        del entry.subentries["subentry_2"]
+        await coordinator.async_sync_subentries()
+
+        assert set(coordinator.data) == {"subentry_1"}
+        assert mock_send.call_args.args[2:] == (set(), {"subentry_1"})
+
+    assert not coordinator.needs_reload()
+    entry.options = {**entry.options, CONF_UPDATE_INTERVAL: 5}
+    assert coordinator.needs_reload()
+
+
+@pytest.mark.asyncio
+async def test_coordinator_profiles_refreshes(hass, tmp_path):
+    """Test that the requested refreshes are profiled, then profiling stops."""
+    entry = _create_entry(subentries={"subentry_1": _create_subentry()})
+
+    coordinator = SncfUpdateCoordinator(hass, entry)
+    coordinator.api_client = AsyncMock()
+    coordinator.api_client.fetch_base_schedule = AsyncMock(return_value=None)
+    coordinator.api_client.fetch_journeys = AsyncMock(
+        return_value=[_journey("17601", "20260821T093000")]
+    )
+
+    coordinator.async_start_profiling(1)
+
+    with patch.object(hass.config, "path", return_value=str(tmp_path / "p.prof")):
+        await coordinator.async_refresh()
+
+    assert coordinator.profiler is None
+    assert coordinator.last_profile["path"] == str(tmp_path / "p.prof")
+    assert coordinator.last_profile["refreshes"] == 1
+    assert coordinator.last_profile["hot_spots"]
+    assert (tmp_path / "p.prof").exists()
+
+
+@pytest.mark.asyncio
+async def test_coordinator_profile_every_refresh_skipped(hass, tmp_path):
+    """Test a profile whose refreshes all ran under another profiler."""
+    entry = _create_entry(subentries={"subentry_1": _create_subentry()})
+
+    coordinator = SncfUpdateCoordinator(hass, entry)
+    coordinator.api_client = AsyncMock()
+    coordinator.api_client.fetch_base_schedule = AsyncMock(return_value=None)
+    coordinator.api_client.fetch_journeys = AsyncMock(
+        return_value=[_journey("17601", "20260821T093000")]
+    )
+
+    coordinator.async_start_profiling(1)
+    coordinator.profiler._profile = MagicMock(
+        enable=MagicMock(side_effect=ValueError("already active"))
+    )
+
+    with patch.object(hass.config, "path", return_value=str(tmp_path / "p.prof")):
+        await coordinator.async_refresh()
+
+    assert coordinator.last_update_success
+    assert coordinator.profiler is None
+    assert coordinator.last_profile["path"] is None
+    assert coordinator.last_profile["refreshes"] == 0
+    assert coordinator.last_profile["skipped"] == 1
+    assert coordinator.last_profile["hot_spots"] == []
+    assert not (tmp_path / "p.prof").exists()
+
@@ -0,0 +1,122 @@
+"""Tests for the train status taken from the journey disruptions."""
+
+from custom_components.sncf_trains.disruptions import (
+    STATUS_CANCELLED,
+    STATUS_DELAYED,
+    STATUS_DETOURED,
+    STATUS_ON_TIME,
+    apply_disruptions,
+    get_train_status,
+    index_disruptions,
+)
+
+VEHICLE_JOURNEY = "vehicle_journey:SNCF:2026-08-21:17601"
+
+
+def _journey(links: list[dict] | None = None, **extra) -> dict:
+    """Create a direct journey linked to disruptions."""
+    return {
+        "departure_date_time": "20260821T070000",
+        "arrival_date_time": "20260821T081000",
+        "sections": [
+            {
+                "type": "public_transport",
+                "from": {"id": "stop_point:SNCF:dep"},
+                "to": {"id": "stop_point:SNCF:arr"},
+                "base_arrival_date_time": "20260821T081000",
+                "links": [{"type": "vehicle_journey", "id": VEHICLE_JOURNEY}],
+                "display_informations": {"links": links or []},
+            }
+        ],
+        **extra,
+    }
+
+
+def _disruption(disruption_id: str, effect: str, **extra) -> dict:
+    """Create a Navitia disruption."""
+    return {
+        "id": disruption_id,
+        "severity": {"effect": effect, "name": effect.lower()},
+        "messages": [{"text": f"Message {disruption_id}"}],
+        **extra,
+    }
+
+
+def test_index_by_id_and_impacted_object():
+    """Test that disruptions are found by id and by impacted trip."""
+    disruption = _disruption(
+        "d1",
+        "DETOUR",
+        impacted_objects=[{"pt_object": {"id": VEHICLE_JOURNEY}}],
+    )
+
+    index = index_disruptions([disruption, "invalid"])
+
+    assert index["d1"] == [disruption]
+    assert index[VEHICLE_JOURNEY] == [disruption]
+
+
+def test_apply_disruptions_from_links():
+    """Test the status and message of journeys linked to disruptions."""
+    cancelled = _journey([{"type": "disruption", "id": "d1"}])
+    detoured = _journey(
+        [{"type": "disruption", "id": "d2"}, {"type": "disruption", "id": "d3"}]
+    )
+    on_time = _journey()
+
+    apply_disruptions(
+        [cancelled, detoured, on_time],
+        [
+            _disruption("d1", "NO_SERVICE"),
+            _disruption("d2", "SIGNIFICANT_DELAYS"),
+            _disruption("d3", "DETOUR"),
+        ],
+    )
+
+    assert get_train_status(cancelled) == STATUS_CANCELLED
+    assert cancelled["disruption_message"] == "Message d1"
+    assert get_train_status(detoured) == STATUS_DETOURED
+    assert detoured["disruption_message"] == "Message d3"
+    assert get_train_status(on_time) == STATUS_ON_TIME
+    assert "train_status" not in on_time
+
+
+def test_apply_disruptions_partial_cancellation():
+    """Test that a train no longer stopping at our station is cancelled."""
+    journey = _journey()
+
+    apply_disruptions(
+        [journey],
+        [
+            _disruption(
+                "d1",
+                "REDUCED_SERVICE",
+                impacted_objects=[
+                    {
+                        "pt_object": {"id": VEHICLE_JOURNEY},
+                        "impacted_stops": [
+                            {
+                                "stop_point": {"id": "stop_point:SNCF:arr"},
+                                "arrival_status": "deleted",
+                            }
+                        ],
+                    }
+                ],
+            )
+        ],
+    )
+
+    assert get_train_status(journey) == STATUS_CANCELLED
+
+
+def test_apply_disruptions_without_disruption():
+    """Test the journey status and realtime delay fallbacks."""
+    late = _journey()
+    late["arrival_date_time"] = "20260821T082000"
+    gtfs_rt_cancelled = _journey(status="NO_SERVICE")
+
+    apply_disruptions([late, gtfs_rt_cancelled], [])
+
+    assert get_train_status(late) == STATUS_DELAYED
+    assert get_train_status(gtfs_rt_cancelled) == STATUS_CANCELLED
+    assert get_train_status({}) == STATUS_ON_TIME
@@ -0,0 +1,186 @@
+"""Tests for the offline GTFS timetable."""
+
+import json
+import os
+import zipfile
+from datetime import date, datetime
+
+from custom_components.sncf_trains.gtfs import GtfsTimetable, uic_code
+
+# Deux trains Lyon -> Grenoble en semaine, un le dimanche, un train
+# Grenoble -> Lyon et un train de nuit dont l'arrivée dépasse 24:00.
+FIXTURE = {
+    "stops.txt": (
+        "stop_id,stop_name\n"
+        "StopPoint:OCETrain TER-87723197,Lyon Part-Dieu\n"
+        "StopPoint:OCETrain TER-87747006,Grenoble\n"
+        "StopPoint:OCETrain TER-87747337,Moirans\n"
+    ),
+    "routes.txt": "route_id,route_short_name,route_type\nR1,TER,2\n",
+    "calendar.txt": (
+        "service_id,monday,tuesday,wednesday,thursday,friday,saturday,sunday,"
+        "start_date,end_date\n"
+        "WEEK,1,1,1,1,1,0,0,20260801,20260831\n"
+        "SUN,0,0,0,0,0,0,1,20260801,20260831\n"
+    ),
+    "calendar_dates.txt": (
+        "service_id,date,exception_type\n"
+        "WEEK,20260817,2\n"
+        "HOLIDAY,20260815,1\n"
+    ),
+    "trips.txt": (
+        "route_id,service_id,trip_id,trip_headsign\n"
+        "R1,WEEK,T1,17601\n"
+        "R1,WEEK,T2,17603\n"
+        "R1,SUN,T3,17605\n"
+        "R1,WEEK,T4,17602\n"
+        "R1,WEEK,T5,17699\n"
+    ),
+    "stop_times.txt": (
+        "trip_id,arrival_time,departure_time,stop_id,stop_sequence\n"
+        "T1,07:00:00,07:00:00,StopPoint:OCETrain TER-87723197,1\n"
+        "T1,07:50:00,07:51:00,StopPoint:OCETrain TER-87747337,2\n"
+        "T1,08:10:00,08:10:00,StopPoint:OCETrain TER-87747006,3\n"
+        "T2,09:00:00,09:00:00,StopPoint:OCETrain TER-87723197,1\n"
+        "T2,10:20:00,10:20:00,StopPoint:OCETrain TER-87747006,2\n"
+        "T3,08:30:00,08:30:00,StopPoint:OCETrain TER-87723197,1\n"
+        "T3,09:45:00,09:45:00,StopPoint:OCETrain TER-87747006,2\n"
+        "T4,06:00:00,06:00:00,StopPoint:OCETrain TER-87747006,1\n"
+        "T4,07:15:00,07:15:00,StopPoint:OCETrain TER-87723197,2\n"
+        "T5,23:30:00,23:30:00,StopPoint:OCETrain TER-87723197,1\n"
+        "T5,24:40:00,24:40:00,StopPoint:OCETrain TER-87747006,2\n"
+    ),
+}
+
+LYON = "stop_area:SNCF:87723197"
+GRENOBLE = "stop_area:SNCF:87747006"
+
+
+def _write_fixture(tmp_path) -> str:
+    """Write the fixture GTFS zip and return its path."""
+    path = tmp_path / "sncf.zip"
+
+    with zipfile.ZipFile(path, "w") as archive:
+        for name, content in FIXTURE.items():
+            archive.writestr(name, content)
+
+    return str(path)
+
+
+def _train_nums(journeys: list[dict]) -> list[str]:
+    """Return the train numbers of journeys."""
+    return [
+        journey["sections"][0]["display_informations"]["trip_short_name"]
+        for journey in journeys
+    ]
+
+
+def test_uic_code():
+    """Test that Navitia and GTFS ids share the same UIC code."""
+    assert uic_code(LYON) == uic_code("StopPoint:OCETrain TER-87723197")
+    assert uic_code("StopArea:OCE87723197") == "87723197"
+    assert uic_code("no digits") is None
+
+
+def test_next_trains_direct(tmp_path):
+    """Test the next direct trains of a weekday, in departure order."""
+    timetable = GtfsTimetable.load(_write_fixture(tmp_path))
+
+    journeys = timetable.next_trains(
+        LYON, GRENOBLE, datetime(2026, 8, 21, 6, 30), count=10
+    )
+
+    assert _train_nums(journeys) == ["17601", "17603", "17699"]
+
+    first = journeys[0]
+    assert first["departure_date_time"] == "20260821T070000"
+    assert first["arrival_date_time"] == "20260821T081000"
+    assert first["nb_transfers"] == 0
+    assert first["duration"] == 70 * 60
+    section = first["sections"][0]
+    assert section["base_departure_date_time"] == "20260821T070000"
+    assert section["display_informations"]["direction"] == "Grenoble"
+    assert section["display_informations"]["commercial_mode"] == "TER"
+
+    # Le train de nuit arrive le lendemain
+    assert journeys[2]["arrival_date_time"] == "20260822T004000"
+
+
+def test_next_trains_after_and_count(tmp_path):
+    """Test that trains already gone are skipped and count is honoured."""
+    timetable = GtfsTimetable.load(_write_fixture(tmp_path))
+
+    journeys = timetable.next_trains(
+        LYON, GRENOBLE, datetime(2026, 8, 21, 7, 30), count=1
+    )
+
+    assert _train_nums(journeys) == ["17603"]
+
+
+def test_next_trains_service_calendar(tmp_path):
+    """Test weekday, sunday and removed dates of the services."""
+    timetable = GtfsTimetable.load(_write_fixture(tmp_path))
+
+    sunday = timetable.next_trains(
+        LYON, GRENOBLE, datetime(2026, 8, 23, 6, 0), count=2
+    )
+    assert _train_nums(sunday) == ["17605", "17601"]
+    assert sunday[1]["departure_date_time"] == "20260824T070000"
+
+    # Lundi 17 août : service de semaine supprimé, trains du lendemain
+    holiday = timetable.next_trains(
+        LYON, GRENOBLE, datetime(2026, 8, 17, 6, 0), count=2
+    )
+    assert _train_nums(holiday) == ["17601", "17603"]
+    assert holiday[0]["departure_date_time"] == "20260818T070000"
+
+
+def test_next_trains_direction_and_unknown_stop(tmp_path):
+    """Test that trains in the other direction or unknown stops are ignored."""
+    timetable = GtfsTimetable.load(_write_fixture(tmp_path))
+
+    assert _train_nums(
+        timetable.next_trains(GRENOBLE, LYON, datetime(2026, 8, 21, 5, 0), 10)
+    ) == ["17602"]
+    assert (
+        timetable.next_trains(LYON, "stop_area:SNCF:87000000", datetime.now(), 10)
+        == []
+    )
+
+
+def test_load_uses_memory_mapped_cache(tmp_path):
+    """Test that the cache is written once and memory-mapped afterwards."""
+    path = _write_fixture(tmp_path)
+
+    first = GtfsTimetable.load(path)
+    assert os.path.exists(f"{path}.idx")
+    first.close()
+
+    cached = GtfsTimetable.load(path)
+    assert cached.trip_numbers == ["17601", "17603", "17605", "17602", "17699"]
+    assert _train_nums(
+        cached.next_trains(LYON, GRENOBLE, datetime(2026, 8, 21, 8, 0), 1)
+    ) == ["17603"]
+    cached.close()
+
+
+def test_service_calendars_in_cache(tmp_path):
+    """Test the service calendars, kept as integer arrays in the cache."""
+    path = _write_fixture(tmp_path)
+    GtfsTimetable.load(path).close()
+
+    timetable = GtfsTimetable.load(path)
+    week, _sunday, holiday = 0, 1, 2
+
+    assert timetable.runs_on(week, date(2026, 8, 21))
+    assert not timetable.runs_on(week, date(2026, 8, 22))  # samedi
+    assert not timetable.runs_on(week, date(2026, 8, 17))  # date supprimée
+    assert not timetable.runs_on(week, date(2026, 9, 1))  # hors plage
+    # Service défini uniquement par calendar_dates
+    assert timetable.runs_on(holiday, date(2026, 8, 15))
+    assert not timetable.runs_on(holiday, date(2026, 8, 16))
+
+    with open(f"{path}.idx.json", encoding="utf-8") as file:
+        assert "services" not in json.load(file)["tables"]
+
+    timetable.close()
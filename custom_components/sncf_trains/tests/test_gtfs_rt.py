@@ -0,0 +1,267 @@
+"""Tests for the GTFS-Realtime TripUpdates source."""
+
+import zipfile
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.util import dt as dt_util
+
+from custom_components.sncf_trains.const import (
+    CONF_API_KEY,
+    CONF_FROM,
+    CONF_OUTSIDE_INTERVAL,
+    CONF_TIME_END,
+    CONF_TIME_START,
+    CONF_TO,
+    CONF_UPDATE_INTERVAL,
+)
+from custom_components.sncf_trains.coordinator import SncfUpdateCoordinator
+from custom_components.sncf_trains.gtfs import GtfsTimetable
+from custom_components.sncf_trains.gtfs_rt import (
+    STATUS_NO_SERVICE,
+    STATUS_SIGNIFICANT_DELAYS,
+    GtfsRealtimeClient,
+    decode_trip_updates,
+)
+
+LYON = "stop_area:SNCF:87723197"
+GRENOBLE = "stop_area:SNCF:87747006"
+MOIRANS = "StopPoint:OCETrain TER-87747337"
+
+FIXTURE = {
+    "stops.txt": (
+        "stop_id,stop_name\n"
+        "StopPoint:OCETrain TER-87723197,Lyon Part-Dieu\n"
+        "StopPoint:OCETrain TER-87747337,Moirans\n"
+        "StopPoint:OCETrain TER-87747006,Grenoble\n"
+    ),
+    "calendar_dates.txt": (
+        "service_id,date,exception_type\nS1,20260821,1\n"
+    ),
+    "trips.txt": (
+        "route_id,service_id,trip_id,trip_headsign\n"
+        "R1,S1,T1,17601\n"
+        "R1,S1,T2,17603\n"
+        "R1,S1,T3,17605\n"
+    ),
+    "stop_times.txt": (
+        "trip_id,arrival_time,departure_time,stop_id,stop_sequence\n"
+        "T1,07:00:00,07:00:00,StopPoint:OCETrain TER-87723197,1\n"
+        "T1,07:50:00,07:51:00,StopPoint:OCETrain TER-87747337,2\n"
+        "T1,08:10:00,08:10:00,StopPoint:OCETrain TER-87747006,3\n"
+        "T2,09:00:00,09:00:00,StopPoint:OCETrain TER-87723197,1\n"
+        "T2,10:20:00,10:20:00,StopPoint:OCETrain TER-87747006,2\n"
+        "T3,11:00:00,11:00:00,StopPoint:OCETrain TER-87747006,1\n"
+        "T3,11:20:00,11:20:00,StopPoint:OCETrain TER-87747337,2\n"
+        "T3,11:40:00,11:40:00,StopPoint:OCETrain TER-87747006,3\n"
+        "T3,12:00:00,12:00:00,StopPoint:OCETrain TER-87747337,4\n"
+    ),
+}
+
+
+def _varint(value: int) -> bytes:
+    """Encode a protobuf varint (negative values on 64 bits)."""
+    value &= (1 << 64) - 1
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _field(number: int, value: int | str | bytes) -> bytes:
+    """Encode a protobuf field."""
+    if isinstance(value, int):
+        return _varint(number << 3) + _varint(value)
+    if isinstance(value, str):
+        value = value.encode()
+    return _varint(number << 3 | 2) + _varint(len(value)) + value
+
+
+def _trip_update(trip_id: str, *fields: bytes, relationship: int = 0) -> bytes:
+    """Encode a FeedEntity holding a TripUpdate."""
+    trip = _field(1, trip_id) + _field(3, "20260821")
+    if relationship:
+        trip += _field(4, relationship)
+    trip_update = _field(1, trip) + b"".join(fields)
+    return _field(2, _field(1, trip_id) + _field(3, trip_update))
+
+
+def _feed() -> bytes:
+    """Encode a feed: T1 late from Moirans, T2 cancelled."""
+    stop_time_update = _field(4, MOIRANS) + _field(3, _field(1, 300))
+    return (
+        _field(1, _field(1, "2.0"))
+        + _trip_update("T1", _field(2, stop_time_update))
+        + _trip_update("T2", relationship=3)
+    )
+
+
+def _local(hour: int, minute: int = 0) -> datetime:
+    """Return a time of the fixture day in the local time zone."""
+    return datetime(2026, 8, 21, hour, minute, tzinfo=dt_util.DEFAULT_TIME_ZONE)
+
+
+@pytest.fixture(autouse=True)
+def early_morning():
+    """Run the tests before the first train of the fixture day."""
+    with patch(
+        "custom_components.sncf_trains.gtfs_rt.dt_util.now",
+        return_value=_local(5),
+    ) as mock_now:
+        yield mock_now
+
+
+@pytest.fixture
+def timetable(tmp_path) -> GtfsTimetable:
+    """Return the fixture timetable."""
+    path = tmp_path / "sncf.zip"
+
+    with zipfile.ZipFile(path, "w") as archive:
+        for name, content in FIXTURE.items():
+            archive.writestr(name, content)
+
+    return GtfsTimetable.load(str(path))
+
+
+def test_decode_trip_updates():
+    """Test that the wire decoder reads trips, delays and cancellations."""
+    updates = decode_trip_updates(_feed())
+
+    assert set(updates) == {("T1", "20260821"), ("T2", "20260821")}
+    t1 = updates[("T1", "20260821")]
+    assert t1.cancelled is False
+    assert t1.stop_time_updates[0].stop_id == MOIRANS
+    assert t1.stop_time_updates[0].departure.delay == 300
+    assert updates[("T2", "20260821")].cancelled is True
+
+
+def test_decode_negative_delay():
+    """Test that early trains (negative delays) are decoded."""
+    feed = _trip_update("T1", _field(5, -60))
+
+    assert decode_trip_updates(feed)[("T1", "20260821")].delay == -60
+
+
+@pytest.mark.asyncio
+async def test_client_applies_feed_to_every_route(hass, tmp_path, timetable):
+    """Test that one feed read serves every route of a cycle."""
+    feed_path = tmp_path / "trip_updates.pb"
+    feed_path.write_bytes(_feed())
+
+    client = GtfsRealtimeClient(hass, MagicMock(), timetable, str(feed_path))
+
+    journeys = await client.fetch_journeys(LYON, GRENOBLE, "20260821T060000", 10)
+    from_moirans = await client.fetch_journeys(
+        MOIRANS, GRENOBLE, "20260821T060000", 10
+    )
+
+    assert client.feed_fetches == 1
+
+    # Retard propagé de Moirans à Grenoble, départ de Lyon à l'heure
+    t1, t2 = journeys
+    assert t1["departure_date_time"] == "20260821T070000"
+    assert t1["arrival_date_time"] == "20260821T081500"
+    assert t1["sections"][0]["base_arrival_date_time"] == "20260821T081000"
+    assert t1["status"] == STATUS_SIGNIFICANT_DELAYS
+    assert t2["status"] == STATUS_NO_SERVICE
+
+    assert from_moirans[0]["departure_date_time"] == "20260821T075600"
+
+
+@pytest.mark.asyncio
+async def test_client_unreadable_feed(hass, tmp_path, timetable):
+    """Test that an unreadable feed is reported like an API failure."""
+    client = GtfsRealtimeClient(
+        hass, MagicMock(), timetable, str(tmp_path / "missing.pb")
+    )
+
+    assert await client.fetch_journeys(LYON, GRENOBLE, "20260821T060000") is None
+
+
+@pytest.mark.asyncio
+async def test_client_loop_trip_absolute_time(hass, tmp_path, timetable):
+    """Test a prediction for the second passage of a loop trip, as a time."""
+    predicted = _local(11, 50)
+    # Seconde passe à Grenoble (séquence 3) : heure absolue, delay à 0
+    departure = _field(1, 0) + _field(2, int(predicted.timestamp()))
+    feed_path = tmp_path / "trip_updates.pb"
+    feed_path.write_bytes(
+        _trip_update("T3", _field(2, _field(1, 3) + _field(3, departure)))
+    )
+
+    client = GtfsRealtimeClient(hass, MagicMock(), timetable, str(feed_path))
+
+    first, second = await client.fetch_journeys(
+        "stop_area:SNCF:87747006", MOIRANS, "20260821T100000", 10
+    )
+
+    assert first["departure_date_time"] == "20260821T110000"
+    assert first["arrival_date_time"] == "20260821T112000"
+    assert second["departure_date_time"] == "20260821T115000"
+    assert second["arrival_date_time"] == "20260821T121000"
+
+
+@pytest.mark.asyncio
+async def test_client_search_starts_now_in_window(
+    hass, tmp_path, timetable, early_morning
+):
+    """Test that trains gone before now do not take the requested places."""
+    feed_path = tmp_path / "trip_updates.pb"
+    feed_path.write_bytes(_feed())
+    early_morning.return_value = _local(8, 30)
+
+    client = GtfsRealtimeClient(hass, MagicMock(), timetable, str(feed_path))
+
+    journeys = await client.fetch_journeys(
+        LYON, GRENOBLE, "20260821T060000", 1, timeframe_duration=4 * 3600
+    )
+
+    assert [journey["gtfs_trip_id"] for journey in journeys] == ["T2"]
+
+
+@pytest.mark.asyncio
+async def test_staggered_routes_share_one_feed_fetch(
+    hass, tmp_path, timetable, early_morning
+):
+    """Test that routes refreshed apart over the interval share one download."""
+    feed_path = tmp_path / "trip_updates.pb"
+    feed_path.write_bytes(_feed())
+
+    routes = {}
+    for subentry_id, departure in (("subentry_1", LYON), ("subentry_2", MOIRANS)):
+        routes[subentry_id] = MagicMock(title=subentry_id)
+        routes[subentry_id].data = {
+            CONF_FROM: departure,
+            CONF_TO: GRENOBLE,
+            CONF_TIME_START: "06:00",
+            CONF_TIME_END: "12:00",
+        }
+
+    entry = MagicMock(spec=ConfigEntry)
+    entry.data = {CONF_API_KEY: "test_api_key"}
+    entry.options = {CONF_UPDATE_INTERVAL: 2, CONF_OUTSIDE_INTERVAL: 60}
+    entry.subentries = routes
+
+    coordinator = SncfUpdateCoordinator(hass, entry)
+    client = GtfsRealtimeClient(hass, MagicMock(), timetable, str(feed_path))
+    coordinator.api_client = client
+
+    start = _local(6, 30)
+
+    with patch("custom_components.sncf_trains.gtfs_rt.time") as mock_time:
+        for minutes, fetches in ((0, 1), (1, 1), (2, 2), (3, 2)):
+            early_morning.return_value = start + timedelta(minutes=minutes)
+            mock_time.monotonic.return_value = 1000.0 + minutes * 60
+            coordinator.data = await coordinator._async_update_data()
+
+            assert set(coordinator.data) == {"subentry_1", "subentry_2"}
+            assert client.feed_fetches == fetches
+
+    assert coordinator.update_interval == timedelta(minutes=1)
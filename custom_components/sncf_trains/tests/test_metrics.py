@@ -0,0 +1,144 @@
+"""Tests for the Prometheus metrics of the integration."""
+
+import json
+from unittest.mock import MagicMock
+
+import pytest
+from homeassistant.components.http import KEY_HASS
+from homeassistant.config_entries import ConfigEntryState
+
+from custom_components.sncf_trains.api import SncfApiClient
+from custom_components.sncf_trains.gtfs_rt import GtfsRealtimeClient
+from custom_components.sncf_trains.metrics import (
+    IntegrationMetrics,
+    api_endpoint,
+    render_metrics,
+)
+from custom_components.sncf_trains.views import SncfMetricsView
+
+JOURNEYS_URL = "https://api.sncf.com/v1/coverage/sncf/journeys"
+
+
+BODY = b'{"journeys": [{}]}'
+
+
+class _FakeResponse:
+    """Minimal aiohttp response, announcing a compressed size."""
+
+    status = 200
+    content_length = 12
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    def raise_for_status(self) -> None:
+        """Accept the response."""
+
+    async def read(self) -> bytes:
+        return BODY
+
+    async def json(self) -> dict:
+        return json.loads(BODY)
+
+
+class _FakeSession:
+    """Session answering every request."""
+
+    def get(self, url, headers, params, timeout):
+        return _FakeResponse()
+
+
+def test_api_endpoint():
+    """Test that the object ids are left out of the endpoint."""
+    assert api_endpoint(JOURNEYS_URL) == "journeys"
+    assert (
+        api_endpoint(
+            "https://api.sncf.com/v1/coverage/sncf/stop_areas/"
+            "stop_area:SNCF:87686006/departures"
+        )
+        == "departures"
+    )
+    assert api_endpoint("https://api.sncf.com/v1/coverage/sncf/stop_area:SNCF:1") == (
+        "sncf"
+    )
+
+
+def test_render_metrics():
+    """Test the exposition of counters, histograms and the quota gauge."""
+    metrics = IntegrationMetrics()
+    metrics.api_requests.inc("journeys", "200")
+    metrics.api_requests.inc("journeys", "200")
+    metrics.api_requests.inc("journeys", "error")
+    metrics.refresh_seconds.observe(0.02)
+    metrics.refresh_seconds.observe(3)
+    metrics.entity_writes.inc('route "a"\\b')
+
+    text = render_metrics(metrics, [(0, 4990), (1, 5000)])
+    lines = text.splitlines()
+
+    assert text.endswith("\n")
+    assert "# TYPE sncf_trains_api_requests_total counter" in lines
+    assert 'sncf_trains_api_requests_total{endpoint="journeys",status="200"} 2' in lines
+    assert (
+        'sncf_trains_api_requests_total{endpoint="journeys",status="error"} 1' in lines
+    )
+
+    assert "# TYPE sncf_trains_refresh_seconds histogram" in lines
+    assert 'sncf_trains_refresh_seconds_bucket{le="0.01"} 0' in lines
+    assert 'sncf_trains_refresh_seconds_bucket{le="0.025"} 1' in lines
+    assert 'sncf_trains_refresh_seconds_bucket{le="2.5"} 1' in lines
+    assert 'sncf_trains_refresh_seconds_bucket{le="5"} 2' in lines
+    assert 'sncf_trains_refresh_seconds_bucket{le="+Inf"} 2' in lines
+    assert "sncf_trains_refresh_seconds_sum 3.02" in lines
+    assert "sncf_trains_refresh_seconds_count 2" in lines
+
+    assert 'sncf_trains_entity_writes_total{route="route \\"a\\"\\\\b"} 1' in lines
+
+    assert "# TYPE sncf_trains_api_quota_remaining gauge" in lines
+    assert 'sncf_trains_api_quota_remaining{key="0"} 4990' in lines
+    assert 'sncf_trains_api_quota_remaining{key="1"} 5000' in lines
+
+
+@pytest.mark.asyncio
+async def test_api_client_metrics():
+    """Test that the API client counts its requests and measures the bodies."""
+    metrics = IntegrationMetrics()
+    client = SncfApiClient(_FakeSession(), "key", metrics=metrics)
+
+    assert await client.fetch_journeys("from", "to", "20260821T070000") == [{}]
+
+    assert metrics.api_requests.values == {("journeys", "200"): 1}
+
+    sizes = metrics.api_response_bytes.values[("journeys",)]
+    assert sizes.counts[0] == 1
+    assert sizes.total == len(BODY)
+    assert sum(metrics.api_decode_seconds.values[("journeys",)].counts) == 1
+
+
+@pytest.mark.asyncio
+async def test_metrics_view_gtfs_rt_client():
+    """Test a scrape when the entry reads a GTFS-RT feed, without API keys."""
+    metrics = IntegrationMetrics()
+    metrics.refresh_seconds.observe(0.5)
+
+    entry = MagicMock(state=ConfigEntryState.LOADED)
+    entry.runtime_data.metrics = metrics
+    entry.runtime_data.api_client = GtfsRealtimeClient(
+        MagicMock(), MagicMock(), MagicMock(), "https://example.org/feed"
+    )
+
+    hass = MagicMock()
+    hass.config_entries.async_entries.return_value = [entry]
+    request = MagicMock(app={KEY_HASS: hass})
+
+    response = await SncfMetricsView().get(request)
+    lines = response.text.splitlines()
+
+    assert response.status == 200
+    assert "sncf_trains_refresh_seconds_count 1" in lines
+    assert not any(
+        line.startswith("sncf_trains_api_quota_remaining{") for line in lines
+    )
@@ -0,0 +1,344 @@
+"""Performance regression tests: CPU time and peak memory.
+
+Large synthetic Navitia payloads go through the hot paths of the
+integration. Each scenario is timed (best of several rounds) and its peak
+allocation measured with tracemalloc, then compared with the baselines
+stored in ``performance_baselines.json``. A scenario fails when it goes
+over its baseline times the tolerance (``SNCF_PERF_TOLERANCE``, 3 by
+default). Run with ``SNCF_PERF_UPDATE=1`` to store new baselines.
+
+The baselines depend on the machine that recorded them: the scenarios are
+skipped unless ``SNCF_PERF=1`` (or ``SNCF_PERF_UPDATE=1``) is set, so that
+the default run on shared CI runners does not flake.
+"""
+
+import json
+import os
+import time
+import tracemalloc
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.util import dt as dt_util
+
+from custom_components.sncf_trains.api import JourneyList
+from custom_components.sncf_trains.calendar import SNCFCalendar
+from custom_components.sncf_trains.const import (
+    CONF_API_KEY,
+    CONF_ARRIVAL_NAME,
+    CONF_DEPARTURE_NAME,
+    CONF_FROM,
+    CONF_OUTSIDE_INTERVAL,
+    CONF_TIME_END,
+    CONF_TIME_START,
+    CONF_TO,
+    CONF_TRAIN_COUNT,
+    CONF_UPDATE_INTERVAL,
+)
+from custom_components.sncf_trains.coordinator import SncfUpdateCoordinator
+from custom_components.sncf_trains.diagnostics import (
+    async_get_config_entry_diagnostics,
+)
+from custom_components.sncf_trains.sensor import (
+    SncfAllTrainsLineSensor,
+    SncfTrainSensor,
+)
+
+BASELINES_PATH = Path(__file__).parent / "performance_baselines.json"
+TOLERANCE = float(os.environ.get("SNCF_PERF_TOLERANCE", "3"))
+UPDATE_BASELINES = bool(os.environ.get("SNCF_PERF_UPDATE"))
+ROUNDS = 5
+
+pytestmark = pytest.mark.skipif(
+    not (os.environ.get("SNCF_PERF") or UPDATE_BASELINES),
+    reason="performance scenarios run with SNCF_PERF=1 on a known machine",
+)
+
+ROUTES = 10
+JOURNEYS_PER_ROUTE = 100
+STOPS_PER_JOURNEY = 30
+DISRUPTIONS_PER_ROUTE = 50
+NAVITIA_FORMAT = "%Y%m%dT%H%M%S"
+NOW = dt_util.as_local(datetime(2026, 8, 21, 8, 0))
+
+
+# ---------------------------------------------------------------------
+# Mesures
+# ---------------------------------------------------------------------
+
+
+def _check(name: str, seconds: float, peak: int) -> None:
+    """Compare a measure with its baseline, or store it."""
+    baselines = json.loads(BASELINES_PATH.read_text(encoding="utf-8"))
+    measure = {"seconds": round(seconds, 4), "peak_kib": peak // 1024}
+
+    if UPDATE_BASELINES:
+        baselines[name] = measure
+        BASELINES_PATH.write_text(
+            json.dumps(baselines, indent=2, sort_keys=True) + "\n",
+            encoding="utf-8",
+        )
+        return
+
+    baseline = baselines[name]
+
+    assert measure["seconds"] <= baseline["seconds"] * TOLERANCE, (
+        f"{name}: {measure['seconds']} s (baseline {baseline['seconds']} s)"
+    )
+    assert measure["peak_kib"] <= baseline["peak_kib"] * TOLERANCE, (
+        f"{name}: {measure['peak_kib']} KiB (baseline {baseline['peak_kib']} KiB)"
+    )
+
+
+def _measure(name: str, func: Callable[[], Any]) -> None:
+    """Measure the best time and the peak memory of a function."""
+    best = float("inf")
+
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    _check(name, best, peak)
+
+
+async def _async_measure(name: str, func: Callable[[], Awaitable[Any]]) -> None:
+    """Measure the best time and the peak memory of a coroutine function."""
+    best = float("inf")
+
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        await func()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        await func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    _check(name, best, peak)
+
+
+# ---------------------------------------------------------------------
+# Données Navitia synthétiques
+# ---------------------------------------------------------------------
+
+
+def _journey(route: int, index: int) -> dict[str, Any]:
+    """Create a direct journey with its intermediate stops and links."""
+    departure = NOW + timedelta(minutes=3 * index + route)
+    arrival = departure + timedelta(hours=2)
+    late = timedelta(minutes=5) if index % 4 == 0 else timedelta()
+    train_num = str(10000 + route * 1000 + index)
+    vehicle_journey = f"vehicle_journey:SNCF:2026-08-21:{train_num}"
+
+    return {
+        "departure_date_time": (departure + late).strftime(NAVITIA_FORMAT),
+        "arrival_date_time": (arrival + late).strftime(NAVITIA_FORMAT),
+        "requested_date_time": NOW.strftime(NAVITIA_FORMAT),
+        "duration": 7200,
+        "nb_transfers": 0,
+        "type": "best" if index == 0 else "rapid",
+        "status": "SIGNIFICANT_DELAYS" if late else "",
+        "tags": ["ecologic"],
+        "sections": [
+            {
+                "id": f"section_{train_num}",
+                "type": "public_transport",
+                "mode": "",
+                "from": {"id": f"stop_point:dep{route}", "name": f"Départ {route}"},
+                "to": {"id": f"stop_point:arr{route}", "name": f"Arrivée {route}"},
+                "departure_date_time": (departure + late).strftime(NAVITIA_FORMAT),
+                "arrival_date_time": (arrival + late).strftime(NAVITIA_FORMAT),
+                "base_departure_date_time": departure.strftime(NAVITIA_FORMAT),
+                "base_arrival_date_time": arrival.strftime(NAVITIA_FORMAT),
+                "duration": 7200,
+                "links": [{"type": "vehicle_journey", "id": vehicle_journey}],
+                "display_informations": {
+                    "trip_short_name": train_num,
+                    "headsign": train_num,
+                    "direction": f"Terminus {route}",
+                    "physical_mode": "Train grande vitesse",
+                    "commercial_mode": "TGV INOUI",
+                    "network": "SNCF",
+                    "links": [
+                        {"type": "disruption", "id": f"disruption_{route}_{index}"}
+                    ],
+                },
+                "stop_date_times": [
+                    {
+                        "stop_point": {
+                            "id": f"stop_point:{route}:{stop}",
+                            "name": f"Gare {stop}",
+                            "coord": {"lat": "45.0", "lon": "4.0"},
+                        },
+                        "departure_date_time": (
+                            departure + timedelta(minutes=4 * stop)
+                        ).strftime(NAVITIA_FORMAT),
+                        "arrival_date_time": (
+                            departure + timedelta(minutes=4 * stop)
+                        ).strftime(NAVITIA_FORMAT),
+                    }
+                    for stop in range(STOPS_PER_JOURNEY)
+                ],
+            }
+        ],
+    }
+
+
+def _response(route: int) -> JourneyList:
+    """Create the journeys response of a route, with its disruptions."""
+    return JourneyList(
+        [_journey(route, index) for index in range(JOURNEYS_PER_ROUTE)],
+        [
+            {
+                "id": f"disruption_{route}_{index}",
+                "severity": {"effect": "SIGNIFICANT_DELAYS", "name": "retard"},
+                "messages": [{"text": f"Retard de 5 minutes ({index})"}],
+            }
+            for index in range(0, DISRUPTIONS_PER_ROUTE * 4, 4)
+        ],
+    )
+
+
+def _create_entry() -> ConfigEntry:
+    """Create a config entry with many routes."""
+    entry = MagicMock(spec=ConfigEntry)
+    entry.title = "SNCF"
+    entry.entry_id = "entry_1"
+    entry.version = 1
+    entry.data = {CONF_API_KEY: "test_api_key"}
+    entry.options = {CONF_UPDATE_INTERVAL: 2, CONF_OUTSIDE_INTERVAL: 60}
+    entry.subentries = {}
+
+    for route in range(ROUTES):
+        subentry = MagicMock()
+        subentry.subentry_id = f"route_{route}"
+        subentry.title = f"Départ {route} → Arrivée {route}"
+        subentry.data = {
+            CONF_FROM: f"stop_area:dep{route}",
+            CONF_TO: f"stop_area:arr{route}",
+            CONF_DEPARTURE_NAME: f"Départ {route}",
+            CONF_ARRIVAL_NAME: f"Arrivée {route}",
+            CONF_TIME_START: "07:00",
+            CONF_TIME_END: "12:00",
+            CONF_TRAIN_COUNT: JOURNEYS_PER_ROUTE,
+        }
+        entry.subentries[subentry.subentry_id] = subentry
+
+    return entry
+
+
+def _create_coordinator(hass) -> SncfUpdateCoordinator:
+    """Create a coordinator answering with the synthetic responses."""
+    responses = {f"stop_area:dep{route}": _response(route) for route in range(ROUTES)}
+
+    async def fetch_journeys(departure, *_args, **_kwargs):
+        return JourneyList(
+            [dict(journey) for journey in responses[departure]],
+            responses[departure].disruptions,
+        )
+
+    coordinator = SncfUpdateCoordinator(hass, _create_entry())
+    coordinator.tracking_horizon = timedelta(0)
+    coordinator.api_client = AsyncMock()
+    coordinator.api_client.fetch_base_schedule = AsyncMock(return_value=None)
+    coordinator.api_client.fetch_journeys = AsyncMock(side_effect=fetch_journeys)
+
+    return coordinator
+
+
+async def _refresh(coordinator: SncfUpdateCoordinator) -> None:
+    """Refresh every route of the coordinator."""
+    # Tous les trajets sont dus à chaque tour
+    coordinator._refresh_due.clear()
+    coordinator.data = await coordinator._async_update_data()
+
+
+# ---------------------------------------------------------------------
+# Scénarios
+# ---------------------------------------------------------------------
+
+
+@pytest.mark.asyncio
+async def test_performance_update_data(hass):
+    """Test the refresh of every route with large responses."""
+    coordinator = _create_coordinator(hass)
+
+    with patch(
+        "custom_components.sncf_trains.coordinator.dt_util.now",
+        return_value=NOW,
+    ):
+        await _async_measure("update_data", lambda: _refresh(coordinator))
+
+    assert len(coordinator.timeline) == ROUTES * JOURNEYS_PER_ROUTE
+
+
+@pytest.mark.asyncio
+async def test_performance_sensors_and_calendar(hass):
+    """Test the attributes, line sensor and calendar of a large timeline."""
+    coordinator = _create_coordinator(hass)
+
+    with patch(
+        "custom_components.sncf_trains.coordinator.dt_util.now",
+        return_value=NOW,
+    ):
+        await _refresh(coordinator)
+
+    train_sensor = SncfTrainSensor(coordinator, "route_0", 0)
+    journeys = coordinator.data["route_0"]
+
+    _measure(
+        "train_extra_attributes",
+        lambda: [train_sensor._extra_attributes(journey) for journey in journeys],
+    )
+
+    line_sensors = [
+        SncfAllTrainsLineSensor(coordinator, subentry_id)
+        for subentry_id in coordinator.entry.subentries
+    ]
+
+    def update_line_sensors() -> None:
+        for line_sensor in line_sensors:
+            line_sensor._handle_coordinator_update()
+
+    with patch.object(SncfAllTrainsLineSensor, "async_write_ha_state"):
+        _measure("line_sensor_update", update_line_sensors)
+
+    calendar = SNCFCalendar(coordinator)
+
+    _measure("calendar_fetch_journeys", calendar._fetch_journeys)
+
+
+@pytest.mark.asyncio
+async def test_performance_diagnostics(hass):
+    """Test the diagnostics of many routes."""
+    coordinator = _create_coordinator(hass)
+
+    with patch(
+        "custom_components.sncf_trains.coordinator.dt_util.now",
+        return_value=NOW,
+    ):
+        await _refresh(coordinator)
+
+    entry = coordinator.entry
+    entry.runtime_data = coordinator
+
+    await _async_measure(
+        "diagnostics",
+        lambda: async_get_config_entry_diagnostics(hass, entry),
+    )
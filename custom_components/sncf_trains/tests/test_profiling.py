@@ -0,0 +1,84 @@
+"""Tests for the on-demand profiling of the refreshes."""
+
+import pstats
+from unittest.mock import MagicMock, patch
+
+from custom_components.sncf_trains.profiling import RefreshProfiler
+
+
+def _slow_function() -> int:
+    """Spend some time in a recognisable function."""
+    return sum(index * index for index in range(20000))
+
+
+def test_refresh_profiler(tmp_path):
+    """Test that the profiler stops after its refreshes and reports them."""
+    profiler = RefreshProfiler(2)
+
+    for _ in range(2):
+        assert not profiler.done
+
+        with profiler.capture():
+            _slow_function()
+
+    assert profiler.done
+    assert profiler.refreshes == 2
+
+    hot_spots = profiler.hot_spots()
+
+    assert any("_slow_function" in spot["function"] for spot in hot_spots)
+    assert hot_spots == sorted(
+        hot_spots, key=lambda spot: spot["cumulative_seconds"], reverse=True
+    )
+
+    path = tmp_path / "sncf_trains.prof"
+    profiler.dump(str(path))
+
+    assert pstats.Stats(str(path)).total_calls > 0
+
+
+def test_refresh_profiler_skipped_when_another_runs():
+    """Test that a refresh still runs when another profiler is enabled."""
+    profiler = RefreshProfiler(2)
+    ran = []
+
+    # Python 3.12+ refuse d'activer un second profileur
+    with patch.object(
+        profiler,
+        "_profile",
+        MagicMock(enable=MagicMock(side_effect=ValueError("already active"))),
+    ) as profile:
+        with profiler.capture():
+            ran.append(_slow_function())
+
+    profile.disable.assert_not_called()
+    assert ran
+    assert profiler.skipped == 1
+    assert profiler.refreshes == 0
+    assert profiler.remaining == 1
+
+    with profiler.capture():
+        _slow_function()
+
+    assert profiler.done
+    assert profiler.refreshes == 1
+    assert any("_slow_function" in spot["function"] for spot in profiler.hot_spots())
+
+
+def test_refresh_profiler_every_refresh_skipped():
+    """Test that a profile without any measured refresh reports nothing."""
+    profiler = RefreshProfiler(2)
+
+    with patch.object(
+        profiler,
+        "_profile",
+        MagicMock(enable=MagicMock(side_effect=ValueError("already active"))),
+    ):
+        for _ in range(2):
+            with profiler.capture():
+                _slow_function()
+
+    assert profiler.done
+    assert profiler.skipped == 2
+    assert profiler.refreshes == 0
+    assert profiler.hot_spots() == []
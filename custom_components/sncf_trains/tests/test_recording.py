@@ -0,0 +1,121 @@
+"""Tests for the record and replay of the API traffic."""
+
+import asyncio
+import gzip
+from unittest.mock import MagicMock
+
+import pytest
+
+from custom_components.sncf_trains.api import SncfApiClient
+from custom_components.sncf_trains.recording import (
+    FLUSH_EVERY,
+    ReplaySession,
+    TrafficRecorder,
+    read_recording,
+)
+
+JOURNEYS_URL = "https://api.sncf.com/v1/coverage/sncf/journeys"
+JOURNEYS_PARAMS = {
+    "from": "stop_area:dep",
+    "to": "stop_area:arr",
+    "data_freshness": "realtime",
+    "datetime_represents": "departure",
+    "max_nb_transfers": "0",
+    "disable_geojson": "true",
+    "count": "5",
+}
+
+
+def _record(status: int, body: dict | None = None, **params) -> dict:
+    """Create a recorded journeys response."""
+    return {
+        "time": 0.0,
+        "url": JOURNEYS_URL,
+        "params": {**JOURNEYS_PARAMS, **params},
+        "status": status,
+        "latency": 0.2,
+        "body": body,
+    }
+
+
+async def _fetch(client: SncfApiClient, to_id: str = "stop_area:arr"):
+    """Fetch the journeys of the recorded route, at another time."""
+    return await client.fetch_journeys("stop_area:dep", to_id, "20260822T080000")
+
+
+@pytest.mark.asyncio
+async def test_replay_and_record_round_trip(tmp_path):
+    """Test that replayed traffic is recorded again, without the API key."""
+    path = tmp_path / "traffic.jsonl.gz"
+    session = ReplaySession(
+        [
+            _record(200, {"journeys": [{"id": "j1"}]}, datetime="20260821T070000"),
+            _record(200, {"journeys": [{"id": "j2"}]}, datetime="20260821T070200"),
+        ],
+        time_scale=0,
+    )
+    recorder = TrafficRecorder(path)
+    client = SncfApiClient(session, "secret_key", recorder=recorder)
+
+    # Les requêtes rejouées ignorent l'heure et bouclent sur les réponses
+    for expected in ("j1", "j2", "j1"):
+        assert [journey["id"] for journey in await _fetch(client)] == [expected]
+
+    await recorder.async_flush()
+
+    records = read_recording(path)
+
+    assert [record["status"] for record in records] == [200, 200, 200]
+    assert records[0]["params"]["datetime"] == "20260822T080000"
+    assert records[1]["body"] == {"journeys": [{"id": "j2"}]}
+
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        content = file.read()
+
+    assert "secret_key" not in content
+    assert "Basic" not in content
+
+
+@pytest.mark.asyncio
+async def test_replay_rate_limit_storm():
+    """Test that a recorded 429 storm is replayed on every key."""
+    session = ReplaySession([_record(429)], time_scale=0)
+    client = SncfApiClient(session, ["key_a", "key_b"])
+
+    with pytest.raises(RuntimeError):
+        await _fetch(client)
+
+    assert session.requests == 2
+
+
+@pytest.mark.asyncio
+async def test_replay_unknown_request():
+    """Test that a request never recorded gets an error response."""
+    session = ReplaySession([_record(200, {"journeys": []})], time_scale=0)
+    client = SncfApiClient(session, "key")
+
+    assert await _fetch(client, "stop_area:other") is None
+    assert session.unmatched == 1
+
+
+@pytest.mark.asyncio
+async def test_recorder_flushes_as_background_tasks(tmp_path):
+    """Test that batch flushes are Home Assistant tasks, awaited on close."""
+    hass = MagicMock()
+    hass.async_create_background_task.side_effect = (
+        lambda coro, name: asyncio.get_running_loop().create_task(coro)
+    )
+    path = tmp_path / "traffic.jsonl.gz"
+    recorder = TrafficRecorder(path, hass)
+
+    for index in range(FLUSH_EVERY + 1):
+        recorder.record(JOURNEYS_URL, JOURNEYS_PARAMS, 200, 0.1, {"index": index})
+
+    hass.async_create_background_task.assert_called_once()
+
+    await recorder.async_close()
+
+    assert [record["body"]["index"] for record in read_recording(path)] == list(
+        range(FLUSH_EVERY + 1)
+    )
+    assert recorder.as_dict()["pending"] == 0
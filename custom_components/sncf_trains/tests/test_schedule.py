@@ -0,0 +1,94 @@
+"""Tests for the base-schedule cache."""
+
+from custom_components.sncf_trains.api import JourneyList
+from custom_components.sncf_trains.schedule import merge_realtime
+
+
+def _journey(train_num: str, base_departure: str, departure: str) -> dict:
+    """Create a direct journey."""
+    return {
+        "departure_date_time": departure,
+        "sections": [
+            {
+                "type": "public_transport",
+                "base_departure_date_time": base_departure,
+                "display_informations": {"trip_short_name": train_num},
+            }
+        ],
+    }
+
+
+def test_merge_realtime_replaces_planned_trains():
+    """Test that realtime trains replace their planned version."""
+    base = [
+        _journey("1001", "20260821T070000", "20260821T070000"),
+        _journey("1003", "20260821T080000", "20260821T080000"),
+        _journey("1005", "20260821T090000", "20260821T090000"),
+    ]
+    realtime = JourneyList(
+        [
+            # 1001 en retard, passe après 1003 ; 1005 absent du temps réel
+            _journey("1001", "20260821T070000", "20260821T081000"),
+            _journey("1003", "20260821T080000", "20260821T080000"),
+        ],
+        [{"id": "d1"}],
+    )
+
+    merged = merge_realtime(base, realtime)
+
+    assert [journey["departure_date_time"] for journey in merged] == [
+        "20260821T080000",
+        "20260821T081000",
+        "20260821T090000",
+    ]
+    assert merged[1] is realtime[0]
+    assert merged[2] is base[2]
+    assert merged.disruptions == [{"id": "d1"}]
+
+
+def test_merge_realtime_drops_trains_missing_from_realtime():
+    """Test that a planned train absent from the searched range is dropped."""
+    base = [
+        _journey("1001", "20260821T070000", "20260821T070000"),
+        _journey("1003", "20260821T080000", "20260821T080000"),
+        _journey("1005", "20260821T090000", "20260821T090000"),
+        _journey("1007", "20260821T100000", "20260821T100000"),
+    ]
+    realtime = JourneyList(
+        [
+            # 1003 supprimé : absent de la réponse temps réel
+            _journey("1005", "20260821T090000", "20260821T090000"),
+        ]
+    )
+
+    merged = merge_realtime(base, realtime, since="20260821T075000")
+
+    # 1001 (déjà parti) est retiré, 1007 (après la réponse) est conservé
+    assert [
+        journey["sections"][0]["display_informations"]["trip_short_name"]
+        for journey in merged
+    ] == ["1005", "1007"]
+
+
+def test_merge_realtime_drops_trains_gone_before_search():
+    """Test that planned trains already gone do not precede realtime ones."""
+    base = [
+        _journey("1001", "20260821T070000", "20260821T070000"),
+        _journey("1003", "20260821T073000", "20260821T073000"),
+        _journey("1005", "20260821T090000", "20260821T090000"),
+    ]
+    realtime = JourneyList(
+        [
+            _journey("1005", "20260821T090000", "20260821T090500"),
+            _journey("1007", "20260821T093000", "20260821T093000"),
+        ]
+    )
+
+    merged = merge_realtime(base, realtime, since="20260821T082000")
+
+    assert merged == [realtime[0], realtime[1]]
+
+    # Sans réponse temps réel, seuls les trains encore à venir restent
+    assert merge_realtime(base, JourneyList([]), since="20260821T082000") == [
+        base[2]
+    ]
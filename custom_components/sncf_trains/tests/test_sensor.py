@@ -0,0 +1,257 @@
+"""Tests for the SNCF sensors."""
+
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util import dt as dt_util
+
+from custom_components.sncf_trains.const import (
+    CONF_ARRIVAL_NAME,
+    CONF_DEPARTURE_NAME,
+    CONF_FROM,
+    CONF_TO,
+    CONF_TRAIN_COUNT,
+    DOMAIN,
+)
+from custom_components.sncf_trains.helpers import parse_datetime
+from custom_components.sncf_trains.sensor import (
+    RouteSensorManager,
+    SncfAllTrainsLineSensor,
+    SncfCountdownSensor,
+    SncfTrainSensor,
+)
+from custom_components.sncf_trains.timeline import TimelineEntry
+
+JOURNEY = {
+    "departure_date_time": "20260821T070500",
+    "arrival_date_time": "20260821T090500",
+    "sections": [
+        {
+            "type": "public_transport",
+            "base_departure_date_time": "20260821T070000",
+            "base_arrival_date_time": "20260821T090000",
+            "display_informations": {
+                "trip_short_name": "17601",
+                "direction": "Lyon Part-Dieu",
+                "physical_mode": "Train",
+                "commercial_mode": "TER",
+            },
+        }
+    ],
+}
+
+
+def _create_coordinator(train_count: int = 3) -> MagicMock:
+    """Create a coordinator with one route and no train yet."""
+    subentry = MagicMock()
+    subentry.subentry_id = "subentry_1"
+    subentry.data = {
+        CONF_FROM: "stop_area:dep",
+        CONF_TO: "stop_area:arr",
+        CONF_DEPARTURE_NAME: "Paris",
+        CONF_ARRIVAL_NAME: "Lyon",
+        CONF_TRAIN_COUNT: train_count,
+    }
+
+    coordinator = MagicMock()
+    coordinator.entry.subentries = {"subentry_1": subentry}
+    coordinator.data = {}
+    coordinator.slots = {}
+    coordinator.get_slot_journey.return_value = None
+    coordinator.get_slot_entry.return_value = None
+
+    return coordinator
+
+
+def _train_slots(add_entities: MagicMock) -> list[int]:
+    """Return the slots of the train sensors added so far."""
+    return [
+        entity.slot
+        for call in add_entities.call_args_list
+        for entity in call.args[0]
+        if isinstance(entity, SncfTrainSensor)
+    ]
+
+
+def test_route_sensors_follow_trains(hass):
+    """Test that train sensors appear as slots get trains."""
+    coordinator = _create_coordinator()
+    add_entities = MagicMock()
+
+    manager = RouteSensorManager(hass, coordinator, add_entities)
+    manager.async_add_route("subentry_1")
+
+    assert _train_slots(add_entities) == []
+
+    coordinator.slots["subentry_1"] = [None, "17601", None]
+    manager.async_update_routes()
+
+    assert _train_slots(add_entities) == [0, 1]
+
+    # Un emplacement vidé garde son capteur
+    coordinator.slots["subentry_1"] = [None, None, None]
+    manager.async_update_routes()
+
+    assert len(manager.train_sensors["subentry_1"]) == 2
+
+    coordinator.slots["subentry_1"] = ["17603", "17605", "17607"]
+    manager.async_update_routes()
+
+    assert _train_slots(add_entities) == [0, 1, 2]
+    assert len(manager.countdown_sensors["subentry_1"]) == 3
+
+
+def test_route_sensors_restore_registered_slots(hass):
+    """Test that registered train sensors are created without trains."""
+    registry = er.async_get(hass)
+    registry.async_get_or_create("sensor", DOMAIN, "subentry_1_1")
+
+    coordinator = _create_coordinator()
+    add_entities = MagicMock()
+
+    manager = RouteSensorManager(hass, coordinator, add_entities)
+    manager.async_add_route("subentry_1")
+
+    assert _train_slots(add_entities) == [0, 1]
+
+
+def test_route_sensors_shrink_with_train_count(hass):
+    """Test that lowering the train count removes the surplus sensors."""
+    coordinator = _create_coordinator()
+    coordinator.slots["subentry_1"] = ["17601", "17603", "17605"]
+    add_entities = MagicMock()
+
+    manager = RouteSensorManager(hass, coordinator, add_entities)
+    manager.async_add_route("subentry_1")
+
+    assert len(manager.train_sensors["subentry_1"]) == 3
+
+    coordinator.entry.subentries["subentry_1"].data[CONF_TRAIN_COUNT] = 1
+    coordinator.slots["subentry_1"] = ["17601"]
+    manager.async_routes_updated(set(), {"subentry_1"})
+
+    assert [sensor.slot for sensor in manager.train_sensors["subentry_1"]] == [0]
+
+
+def test_countdown_sensor(hass):
+    """Test the minutes left before the departure of the train of a slot."""
+    now = dt_util.now()
+    entry = MagicMock(
+        departure=now + timedelta(minutes=4, seconds=30),
+        is_cancelled=False,
+    )
+
+    coordinator = _create_coordinator()
+    coordinator.get_slot_entry.return_value = entry
+
+    with patch(
+        "custom_components.sncf_trains.sensor.dt_util.now",
+        return_value=now,
+    ):
+        sensor = SncfCountdownSensor(coordinator, "subentry_1", 0)
+
+    assert sensor.native_value == 5
+    assert sensor._minutes_left(now + timedelta(minutes=4)) == 1
+    assert sensor._minutes_left(entry.departure + timedelta(seconds=1)) == 0
+
+    # Au-delà d'une heure, valeur arrondie aux 5 minutes supérieures
+    assert sensor._minutes_left(entry.departure - timedelta(minutes=60)) == 60
+    early = entry.departure - timedelta(minutes=61, seconds=10)
+    assert sensor._minutes_left(early) == 65
+
+    entry.is_cancelled = True
+    sensor._update_departure()
+
+    assert sensor.native_value is None
+
+
+def test_train_sensor_compact_attributes(hass):
+    """Test the epoch attributes of the compact mode."""
+    coordinator = _create_coordinator()
+    coordinator.get_slot_journey.return_value = JOURNEY
+
+    coordinator.compact_attributes = False
+    full = SncfTrainSensor(coordinator, "subentry_1", 0).extra_state_attributes
+
+    coordinator.compact_attributes = True
+    compact = SncfTrainSensor(coordinator, "subentry_1", 0).extra_state_attributes
+
+    assert full["departure_time"] == "21/08/2026 - 07:05"
+    assert compact["departure_time"] == int(
+        parse_datetime("20260821T070500").timestamp()
+    )
+    assert compact["base_arrival_time"] == int(
+        parse_datetime("20260821T090000").timestamp()
+    )
+    assert compact["delay_minutes"] == full["delay_minutes"] == 5
+
+    # Attributs constants de la ligne omis en mode compact
+    assert "direction" in full
+    assert "direction" not in compact
+    assert "departure_stop_id" not in compact
+
+
+def test_train_sensor_unrecorded_attributes(hass):
+    """Test that only the attributes worth a history reach the recorder."""
+    coordinator = _create_coordinator()
+    coordinator.get_slot_journey.return_value = JOURNEY
+
+    for compact in (False, True):
+        coordinator.compact_attributes = compact
+        sensor = SncfTrainSensor(coordinator, "subentry_1", 0)
+
+        recorded = sensor.extra_state_attributes.keys() - (
+            SncfTrainSensor._unrecorded_attributes
+        )
+
+        assert recorded == {
+            "departure_time",
+            "delay_minutes",
+            "has_delay",
+            "train_num",
+            "status",
+        }
+
+
+def test_line_sensor_compact_attributes(hass):
+    """Test the list attributes of the compact mode and their exclusion."""
+    departure = parse_datetime("20260821T070500")
+    base_departure = parse_datetime("20260821T070000")
+
+    coordinator = _create_coordinator()
+    coordinator.data = {"subentry_1": [JOURNEY]}
+    coordinator.timeline.route.return_value = [
+        TimelineEntry(
+            departure=departure,
+            arrival=parse_datetime("20260821T090500"),
+            base_departure=base_departure,
+            base_arrival=parse_datetime("20260821T090000"),
+            delay=5,
+            subentry_id="subentry_1",
+            index=0,
+            key="17601",
+            train_num="17601",
+            direction="Lyon Part-Dieu",
+            status="delayed",
+            journey=JOURNEY,
+        )
+    ]
+
+    coordinator.compact_attributes = False
+    full = SncfAllTrainsLineSensor(coordinator, "subentry_1").extra_state_attributes
+
+    coordinator.compact_attributes = True
+    compact = SncfAllTrainsLineSensor(coordinator, "subentry_1").extra_state_attributes
+
+    assert full["departure_time"] == "21/08/2026 - 07:05"
+    assert full["delay_minutes"] == "5"
+    assert compact["departure_time"] == [int(departure.timestamp())]
+    assert compact["base_departure_time"] == [int(base_departure.timestamp())]
+    assert compact["delay_minutes"] == [5]
+    assert compact["status"] == ["delayed"]
+
+    for attributes in (full, compact):
+        assert attributes.keys() - SncfAllTrainsLineSensor._unrecorded_attributes == {
+            "has_delay"
+        }
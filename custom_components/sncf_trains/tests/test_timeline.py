@@ -0,0 +1,102 @@
+"""Tests for the SNCF trains timeline."""
+
+from datetime import datetime, timezone
+
+from custom_components.sncf_trains.timeline import Timeline
+
+
+def _journey(train_num: str, departure: str, arrival: str) -> dict:
+    """Create a direct journey."""
+    return {
+        "departure_date_time": departure,
+        "arrival_date_time": arrival,
+        "sections": [
+            {
+                "type": "public_transport",
+                "base_departure_date_time": departure,
+                "base_arrival_date_time": arrival,
+                "display_informations": {"trip_short_name": train_num},
+            }
+        ],
+    }
+
+
+def test_timeline_keeps_routes_sorted_by_arrival():
+    """Test that entries of several routes are merged by arrival time."""
+    timeline = Timeline()
+
+    timeline.update_route(
+        "route_a",
+        [
+            _journey("1001", "20260821T070000Z", "20260821T080000Z"),
+            _journey("1002", "20260821T090000Z", "20260821T100000Z"),
+        ],
+    )
+    timeline.update_route(
+        "route_b",
+        [
+            _journey("2001", "20260821T080000Z", "20260821T090000Z"),
+            {"departure_date_time": "invalid"},
+        ],
+    )
+
+    assert [entry.train_num for entry in timeline] == ["1001", "2001", "1002"]
+    assert [entry.index for entry in timeline.route("route_b")] == [0]
+    assert timeline.routes == {"route_a", "route_b"}
+
+
+def test_timeline_update_route_replaces_only_that_route():
+    """Test that refreshing a route leaves the other routes untouched."""
+    timeline = Timeline()
+
+    timeline.update_route(
+        "route_a",
+        [_journey("1001", "20260821T070000Z", "20260821T080000Z")],
+    )
+    timeline.update_route(
+        "route_b",
+        [_journey("2001", "20260821T080000Z", "20260821T090000Z")],
+    )
+    route_b_entries = timeline.route("route_b")
+
+    timeline.update_route(
+        "route_a",
+        [_journey("1003", "20260821T093000Z", "20260821T103000Z")],
+    )
+
+    assert [entry.train_num for entry in timeline] == ["2001", "1003"]
+    assert timeline.route("route_b") is route_b_entries
+
+    timeline.remove_route("route_b")
+
+    assert [entry.train_num for entry in timeline] == ["1003"]
+
+
+def test_timeline_upcoming_slice():
+    """Test the upcoming slice with route filter and limit."""
+    timeline = Timeline()
+
+    timeline.update_route(
+        "route_a",
+        [
+            _journey("1001", "20260821T070000Z", "20260821T080000Z"),
+            _journey("1002", "20260821T090000Z", "20260821T100000Z"),
+            _journey("1003", "20260821T100000Z", "20260821T110000Z"),
+        ],
+    )
+    timeline.update_route(
+        "route_b",
+        [_journey("2001", "20260821T080000Z", "20260821T090000Z")],
+    )
+
+    min_arrival = datetime(2026, 8, 21, 8, 30, tzinfo=timezone.utc)
+
+    assert [entry.train_num for entry in timeline.upcoming(min_arrival)] == [
+        "2001",
+        "1002",
+        "1003",
+    ]
+    assert [
+        entry.train_num
+        for entry in timeline.upcoming(min_arrival, {"route_a"}, limit=1)
+    ] == ["1002"]
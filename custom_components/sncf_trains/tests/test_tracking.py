@@ -0,0 +1,99 @@
+"""Tests for the tracking of imminent trains by vehicle journey."""
+
+from custom_components.sncf_trains.tracking import (
+    apply_vehicle_journey,
+    get_vehicle_journey_id,
+    merge_disruptions,
+)
+
+VEHICLE_JOURNEY = "vehicle_journey:SNCF:2026-08-21:17601"
+
+
+def _journey(base_departure: str, base_arrival: str) -> dict:
+    """Create a direct journey on a vehicle journey."""
+    return {
+        "departure_date_time": base_departure,
+        "arrival_date_time": base_arrival,
+        "sections": [
+            {"type": "street_network"},
+            {
+                "type": "public_transport",
+                "from": {"id": "stop_point:SNCF:dep"},
+                "to": {"id": "stop_point:SNCF:arr"},
+                "base_departure_date_time": base_departure,
+                "base_arrival_date_time": base_arrival,
+                "links": [{"type": "vehicle_journey", "id": VEHICLE_JOURNEY}],
+            },
+        ],
+    }
+
+
+def _vehicle_journey(departure: str, arrival: str) -> dict:
+    """Create the vehicle journey of the train, with realtime stop times."""
+    return {
+        "id": VEHICLE_JOURNEY,
+        "stop_times": [
+            {
+                "stop_point": {"id": "stop_point:SNCF:dep"},
+                "arrival_time": departure,
+                "departure_time": departure,
+            },
+            {
+                "stop_point": {"id": "stop_point:SNCF:arr"},
+                "arrival_time": arrival,
+                "departure_time": arrival,
+            },
+        ],
+    }
+
+
+def test_get_vehicle_journey_id():
+    """Test that the vehicle journey is found in the transport section."""
+    assert (
+        get_vehicle_journey_id(_journey("20260821T070000", "20260821T081000"))
+        == VEHICLE_JOURNEY
+    )
+    assert get_vehicle_journey_id({"sections": []}) is None
+
+
+def test_apply_vehicle_journey_delay():
+    """Test that the realtime stop times replace the journey times."""
+    journey = _journey("20260821T070000", "20260821T081000")
+
+    updated = apply_vehicle_journey(journey, _vehicle_journey("070500", "081800"))
+
+    assert updated["departure_date_time"] == "20260821T070500"
+    assert updated["arrival_date_time"] == "20260821T081800"
+    assert updated["sections"][1]["arrival_date_time"] == "20260821T081800"
+    assert updated["sections"][1]["base_arrival_date_time"] == "20260821T081000"
+    # Le journey de la recherche n'est pas modifié
+    assert journey["arrival_date_time"] == "20260821T081000"
+
+
+def test_apply_vehicle_journey_after_midnight():
+    """Test a delay pushing the arrival past midnight."""
+    journey = _journey("20260821T233000", "20260821T235000")
+
+    updated = apply_vehicle_journey(journey, _vehicle_journey("233000", "001500"))
+
+    assert updated["arrival_date_time"] == "20260822T001500"
+
+
+def test_apply_vehicle_journey_missing_stop():
+    """Test that a train no longer serving our station needs a full search."""
+    journey = _journey("20260821T070000", "20260821T081000")
+    vehicle_journey = _vehicle_journey("070000", "081000")
+    vehicle_journey["stop_times"].pop()
+
+    assert apply_vehicle_journey(journey, vehicle_journey) is None
+
+
+def test_merge_disruptions_replaces_same_id():
+    """Test that polled disruptions replace their previous version."""
+    search = [{"id": "d1", "status": "active"}, {"id": "d2"}]
+    polled = [{"id": "d1", "status": "past"}, {"id": "d3"}]
+
+    merged = merge_disruptions(search, polled)
+
+    assert merged == [{"id": "d2"}, *polled]
+    assert merge_disruptions(merged, polled) == merged
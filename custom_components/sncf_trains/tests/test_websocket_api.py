@@ -0,0 +1,147 @@
+"""Tests for the SNCF websocket API."""
+
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+
+from custom_components.sncf_trains.const import SIGNAL_ENTRY_LOADED
+from custom_components.sncf_trains.timeline import Timeline
+from custom_components.sncf_trains.websocket_api import (
+    build_upcoming_trains,
+    websocket_subscribe_trains,
+)
+
+
+def _journey(train_num: str, departure: str, arrival: str) -> dict:
+    """Create a direct journey."""
+    return {
+        "nb_transfers": 0,
+        "departure_date_time": departure,
+        "arrival_date_time": arrival,
+        "sections": [
+            {
+                "type": "public_transport",
+                "base_departure_date_time": departure,
+                "base_arrival_date_time": arrival,
+                "display_informations": {
+                    "trip_short_name": train_num,
+                    "direction": "Lyon",
+                },
+            }
+        ],
+    }
+
+
+def test_build_upcoming_trains_merges_and_sorts_routes():
+    """Test that trains of several routes are merged and sorted by arrival."""
+    coordinator = MagicMock()
+    coordinator.timeline = Timeline()
+    coordinator.timeline.update_route(
+        "route_a",
+        [
+            _journey("1001", "20260821T090000Z", "20260821T100000Z"),
+            _journey("1000", "20260821T060000Z", "20260821T070000Z"),
+        ],
+    )
+    coordinator.timeline.update_route(
+        "route_b",
+        [
+            _journey("2001", "20260821T083000Z", "20260821T093000Z"),
+            _journey("2002", "20260821T093000Z", "20260821T103000Z"),
+        ],
+    )
+
+    trains = build_upcoming_trains(
+        [
+            (coordinator, "route_a", "device_a"),
+            (coordinator, "route_b", "device_b"),
+        ],
+        datetime(2026, 8, 21, 8, 0, tzinfo=timezone.utc),
+    )
+
+    # Le train arrivé à 07:00 est masqué (plus de 30 minutes avant 08:00).
+    assert [train["train_num"] for train in trains] == ["2001", "1001", "2002"]
+    assert trains[0]["device_id"] == "device_b"
+    assert trains[0]["direction"] == "Lyon"
+    assert trains[0]["delay_minutes"] == 0
+    assert trains[0]["has_delay"] is False
+    assert trains[0]["arrival_time"] == int(
+        datetime(2026, 8, 21, 9, 30, tzinfo=timezone.utc).timestamp()
+    )
+
+
+def test_build_upcoming_trains_limit_and_device_filter():
+    """Test that only the requested routes are returned, up to the limit."""
+    coordinator = MagicMock()
+    coordinator.timeline = Timeline()
+    coordinator.timeline.update_route(
+        "route_a",
+        [
+            _journey("1001", "20260821T090000Z", "20260821T100000Z"),
+            _journey("1002", "20260821T100000Z", "20260821T110000Z"),
+        ],
+    )
+    coordinator.timeline.update_route(
+        "route_b",
+        [_journey("2001", "20260821T083000Z", "20260821T093000Z")],
+    )
+
+    trains = build_upcoming_trains(
+        [(coordinator, "route_a", "device_a")],
+        datetime(2026, 8, 21, 8, 0, tzinfo=timezone.utc),
+        limit=1,
+    )
+
+    assert [train["train_num"] for train in trains] == ["1001"]
+
+
+async def test_subscription_follows_reloaded_entry(hass):
+    """Test that a subscription moves to the coordinator of a reloaded entry."""
+    old = MagicMock()
+    old.timeline = Timeline()
+    old.timeline.update_route(
+        "route_a", [_journey("1001", "20990821T090000Z", "20990821T100000Z")]
+    )
+    new = MagicMock()
+    new.timeline = Timeline()
+    new.timeline.update_route(
+        "route_a", [_journey("1002", "20990821T100000Z", "20990821T110000Z")]
+    )
+    connection = MagicMock()
+    connection.subscriptions = {}
+    routes = [(old, "route_a", "device_a")]
+
+    with patch(
+        "custom_components.sncf_trains.websocket_api._async_resolve_routes",
+        side_effect=lambda *args: routes,
+    ):
+        websocket_subscribe_trains(
+            hass,
+            connection,
+            {"id": 1, "type": "sncf_trains/subscribe_trains", "device_ids": ["a"]},
+        )
+
+        old.async_add_listener.assert_called_once()
+
+        routes = [(new, "route_a", "device_a")]
+        async_dispatcher_send(hass, SIGNAL_ENTRY_LOADED)
+        await hass.async_block_till_done()
+
+        old.async_add_listener.return_value.assert_called_once()
+        new.async_add_listener.assert_called_once()
+
+        # Les mises à jour du nouveau coordinateur sont transmises
+        new.timeline.update_route(
+            "route_a", [_journey("1003", "20990821T120000Z", "20990821T130000Z")]
+        )
+        new.async_add_listener.call_args.args[0]()
+
+    sent = [
+        [train["train_num"] for train in call.args[0]["event"]["trains"]]
+        for call in connection.send_message.call_args_list
+    ]
+    assert sent == [["1001"], ["1002"], ["1003"]]
+
+    connection.subscriptions[1]()
+    new.async_add_listener.return_value.assert_called_once()
@@ -0,0 +1,166 @@
+"""Merged, time-ordered timeline of the trains of every route."""
+
+from bisect import bisect_left, insort
+from collections.abc import Collection, Iterator
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+
+from .disruptions import STATUS_CANCELLED, get_train_status
+from .helpers import (
+    get_delay_minutes,
+    get_journey_key,
+    get_train_num,
+    get_transport_section,
+    parse_datetime,
+)
+
+
+@dataclass(frozen=True, slots=True)
+class TimelineEntry:
+    """A train of a route, with its datetimes parsed once."""
+
+    departure: datetime
+    arrival: datetime
+    base_departure: datetime | None
+    base_arrival: datetime | None
+    delay: int
+    subentry_id: str
+    index: int
+    key: str
+    train_num: str
+    direction: str
+    status: str
+    journey: dict[str, Any] = field(compare=False, repr=False)
+
+    @property
+    def has_delay(self) -> bool:
+        """Return True when the train is late."""
+        return self.delay > 0
+
+    @property
+    def is_cancelled(self) -> bool:
+        """Return True when the train is cancelled."""
+        return self.status == STATUS_CANCELLED
+
+
+def _sort_key(entry: TimelineEntry) -> tuple[datetime, datetime, str, int]:
+    """Order entries by arrival, then departure."""
+    return (entry.arrival, entry.departure, entry.subentry_id, entry.index)
+
+
+def build_entry(
+    subentry_id: str,
+    index: int,
+    journey: dict[str, Any],
+) -> TimelineEntry | None:
+    """Build the timeline entry of a journey, None if its dates are invalid."""
+    departure = parse_datetime(journey.get("departure_date_time", ""))
+    arrival = parse_datetime(journey.get("arrival_date_time", ""))
+
+    if not departure or not arrival:
+        return None
+
+    section = get_transport_section(journey)
+
+    display_informations = section.get("display_informations", {})
+
+    if not isinstance(display_informations, dict):
+        display_informations = {}
+
+    return TimelineEntry(
+        departure=departure,
+        arrival=arrival,
+        base_departure=parse_datetime(section.get("base_departure_date_time", "")),
+        base_arrival=parse_datetime(section.get("base_arrival_date_time", "")),
+        delay=get_delay_minutes(journey),
+        subentry_id=subentry_id,
+        index=index,
+        key=get_journey_key(journey),
+        train_num=get_train_num(journey),
+        direction=display_informations.get("direction", ""),
+        status=get_train_status(journey),
+        journey=journey,
+    )
+
+
+class Timeline:
+    """Trains of every route, kept sorted by arrival time.
+
+    Each refresh replaces the entries of a single route, so consumers read a
+    ready-made slice instead of merging and sorting every route themselves.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty timeline."""
+        self._entries: list[TimelineEntry] = []
+        self._routes: dict[str, list[TimelineEntry]] = {}
+
+    def __iter__(self) -> Iterator[TimelineEntry]:
+        """Iterate over every entry, by arrival time."""
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        """Return the number of entries."""
+        return len(self._entries)
+
+    @property
+    def routes(self) -> set[str]:
+        """Return the subentry ids present in the timeline."""
+        return set(self._routes)
+
+    def route(self, subentry_id: str) -> list[TimelineEntry]:
+        """Return the entries of a route, in the order returned by the API."""
+        return self._routes.get(subentry_id, [])
+
+    def update_route(
+        self,
+        subentry_id: str,
+        journeys: list[dict[str, Any]],
+    ) -> None:
+        """Replace the entries of a route."""
+        self.remove_route(subentry_id)
+
+        entries = []
+
+        for index, journey in enumerate(journeys):
+            entry = build_entry(subentry_id, index, journey)
+
+            if entry is None:
+                continue
+
+            entries.append(entry)
+            insort(self._entries, entry, key=_sort_key)
+
+        self._routes[subentry_id] = entries
+
+    def remove_route(self, subentry_id: str) -> None:
+        """Remove the entries of a route."""
+        if self._routes.pop(subentry_id, None):
+            self._entries = [
+                entry for entry in self._entries if entry.subentry_id != subentry_id
+            ]
+
+    def upcoming(
+        self,
+        min_arrival: datetime,
+        subentry_ids: Collection[str] | None = None,
+        limit: int | None = None,
+    ) -> list[TimelineEntry]:
+        """Return the entries arriving from ``min_arrival``, by arrival time."""
+        start = bisect_left(self._entries, min_arrival, key=lambda e: e.arrival)
+
+        result: list[TimelineEntry] = []
+
+        for position in range(start, len(self._entries)):
+            entry = self._entries[position]
+
+            if subentry_ids is not None and entry.subentry_id not in subentry_ids:
+                continue
+
+            result.append(entry)
+
+            if limit is not None and len(result) >= limit:
+                break
+
+        return result
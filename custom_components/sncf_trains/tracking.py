@@ -0,0 +1,129 @@
+"""Realtime tracking of imminent trains by vehicle journey.
+
+Once a train is known, its realtime state is available from the small
+``vehicle_journeys/{id}`` resource: the coordinator polls it for the
+trains leaving soon instead of running a full journeys search.
+"""
+
+from datetime import datetime, timedelta
+from typing import Any
+
+from .gtfs import NAVITIA_DATETIME_FORMAT
+from .helpers import get_transport_section, parse_datetime
+
+
+def get_vehicle_journey_id(journey: dict[str, Any]) -> str | None:
+    """Return the vehicle journey id of the train of a journey."""
+    for link in get_transport_section(journey).get("links", []):
+        if isinstance(link, dict) and link.get("type") == "vehicle_journey":
+            return link.get("id")
+
+    return None
+
+
+def merge_disruptions(
+    disruptions: list[dict[str, Any]],
+    updates: list[dict[str, Any]],
+) -> list[dict[str, Any]]:
+    """Return the disruptions with the updates replacing those of the same id.
+
+    The vehicle journey of a tracked train repeats its disruptions on every
+    poll: they must not pile up until the next search.
+    """
+    updated_ids = {
+        disruption.get("id") for disruption in updates if isinstance(disruption, dict)
+    } - {None}
+
+    return [
+        *(
+            disruption
+            for disruption in disruptions
+            if disruption not in updates
+            and not (
+                isinstance(disruption, dict) and disruption.get("id") in updated_ids
+            )
+        ),
+        *updates,
+    ]
+
+
+def _stop_datetime(
+    base: datetime | None,
+    hhmmss: str | None,
+) -> datetime | None:
+    """Combine a HHMMSS stop time with the date of the scheduled time."""
+    if base is None or not hhmmss or len(hhmmss) != 6:
+        return None
+
+    value = base.replace(
+        hour=int(hhmmss[0:2]),
+        minute=int(hhmmss[2:4]),
+        second=int(hhmmss[4:6]),
+        tzinfo=None,
+    )
+
+    # Passage de minuit entre l'horaire prévu et l'horaire réel
+    if value - base.replace(tzinfo=None) < -timedelta(hours=12):
+        value += timedelta(days=1)
+    elif value - base.replace(tzinfo=None) > timedelta(hours=12):
+        value -= timedelta(days=1)
+
+    return value
+
+
+def apply_vehicle_journey(
+    journey: dict[str, Any],
+    vehicle_journey: dict[str, Any],
+) -> dict[str, Any] | None:
+    """Return a copy of a journey with the stop times of its vehicle journey.
+
+    None when the departure or arrival stop is missing from the vehicle
+    journey (train no longer serving them): a full search is needed.
+    """
+    section = get_transport_section(journey)
+    from_id = section.get("from", {}).get("id")
+    to_id = section.get("to", {}).get("id")
+
+    stop_times = {
+        stop_time.get("stop_point", {}).get("id"): stop_time
+        for stop_time in vehicle_journey.get("stop_times", [])
+        if isinstance(stop_time, dict)
+    }
+
+    if from_id not in stop_times or to_id not in stop_times:
+        return None
+
+    departure = _stop_datetime(
+        parse_datetime(section.get("base_departure_date_time", "")),
+        stop_times[from_id].get("departure_time"),
+    )
+    arrival = _stop_datetime(
+        parse_datetime(section.get("base_arrival_date_time", "")),
+        stop_times[to_id].get("arrival_time"),
+    )
+
+    if departure is None or arrival is None:
+        return None
+
+    departure_str = departure.strftime(NAVITIA_DATETIME_FORMAT)
+    arrival_str = arrival.strftime(NAVITIA_DATETIME_FORMAT)
+
+    sections = [
+        (
+            {
+                **candidate,
+                "departure_date_time": departure_str,
+                "arrival_date_time": arrival_str,
+            }
+            if candidate is section
+            else candidate
+        )
+        for candidate in journey.get("sections", [])
+    ]
+
+    return {
+        **journey,
+        "departure_date_time": departure_str,
+        "arrival_date_time": arrival_str,
+        "sections": sections,
+    }
@@ -0,0 +1,46 @@
+"""HTTP views of the SNCF Trains integration."""
+
+from http import HTTPStatus
+
+from aiohttp import web
+from homeassistant.components.http import KEY_HASS, HomeAssistantView
+from homeassistant.config_entries import ConfigEntryState
+
+from .const import DOMAIN
+from .metrics import render_metrics
+
+METRICS_URL = f"/api/{DOMAIN}/metrics"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class SncfMetricsView(HomeAssistantView):
+    """Serve the metrics to Prometheus (long-lived access token)."""
+
+    url = METRICS_URL
+    name = f"api:{DOMAIN}:metrics"
+
+    async def get(self, request: web.Request) -> web.Response:
+        """Return the metrics of the loaded entry."""
+        hass = request.app[KEY_HASS]
+
+        for entry in hass.config_entries.async_entries(DOMAIN):
+            if entry.state is not ConfigEntryState.LOADED:
+                continue
+
+            coordinator = entry.runtime_data
+            key_stats = getattr(coordinator.api_client, "key_stats", None)
+
+            return web.Response(
+                text=render_metrics(
+                    coordinator.metrics,
+                    (
+                        (key["index"], key["remaining"])
+                        for key in (key_stats() if key_stats else [])
+                        # Le flux GTFS-RT n'a pas de clé API ni de quota
+                        if "index" in key and "remaining" in key
+                    ),
+                ),
+                headers={"Content-Type": CONTENT_TYPE},
+            )
+
+        return web.Response(status=HTTPStatus.SERVICE_UNAVAILABLE)
@@ -0,0 +1,183 @@
+"""Websocket API serving train data to the Lovelace card."""
+
+import heapq
+import itertools
+from collections.abc import Iterable
+from datetime import datetime, timedelta
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, SIGNAL_ENTRY_LOADED
+from .coordinator import SncfUpdateCoordinator
+from .timeline import TimelineEntry
+
+# Un train reste affiché 30 minutes après son arrivée (comme la carte).
+ARRIVED_DISPLAY_DELAY = timedelta(minutes=30)
+
+
+@callback
+def async_register_websocket_api(hass: HomeAssistant) -> None:
+    """Register the websocket commands of the integration."""
+    websocket_api.async_register_command(hass, websocket_subscribe_trains)
+
+
+def entry_to_payload(entry: TimelineEntry, device_id: str) -> dict[str, Any]:
+    """Convert a timeline entry to the compact form sent to the card."""
+    return {
+        "key": entry.key,
+        "device_id": device_id,
+        "departure_time": int(entry.departure.timestamp()),
+        "arrival_time": int(entry.arrival.timestamp()),
+        "base_departure_time": (
+            int(entry.base_departure.timestamp()) if entry.base_departure else None
+        ),
+        "base_arrival_time": (
+            int(entry.base_arrival.timestamp()) if entry.base_arrival else None
+        ),
+        "delay_minutes": entry.delay,
+        "has_delay": entry.has_delay,
+        "train_num": entry.train_num,
+        "direction": entry.direction,
+        "status": entry.status,
+    }
+
+
+def build_upcoming_trains(
+    routes: Iterable[tuple[SncfUpdateCoordinator, str, str]],
+    now: datetime,
+    limit: int | None = None,
+) -> list[dict[str, Any]]:
+    """Return the upcoming trains of the routes, sorted by arrival time.
+
+    ``routes`` yields (coordinator, subentry_id, device_id) tuples.
+    """
+    devices_by_coordinator: dict[SncfUpdateCoordinator, dict[str, str]] = {}
+
+    for coordinator, subentry_id, device_id in routes:
+        devices_by_coordinator.setdefault(coordinator, {})[subentry_id] = device_id
+
+    min_arrival = now - ARRIVED_DISPLAY_DELAY
+
+    # Chaque timeline est déjà triée : on fusionne sans retrier.
+    merged = heapq.merge(
+        *(
+            (
+                entry_to_payload(entry, devices[entry.subentry_id])
+                for entry in coordinator.timeline.upcoming(
+                    min_arrival, devices, limit
+                )
+            )
+            for coordinator, devices in devices_by_coordinator.items()
+        ),
+        key=lambda train: train["arrival_time"],
+    )
+
+    return list(itertools.islice(merged, limit))
+
+
+@callback
+def _async_resolve_routes(
+    hass: HomeAssistant,
+    device_ids: list[str],
+) -> list[tuple[SncfUpdateCoordinator, str, str]]:
+    """Return (coordinator, subentry_id, device_id) for each route device."""
+    device_registry = dr.async_get(hass)
+    routes: list[tuple[SncfUpdateCoordinator, str, str]] = []
+
+    for device_id in device_ids:
+        device = device_registry.async_get(device_id)
+
+        if device is None:
+            continue
+
+        for config_entry_id in device.config_entries:
+            entry = hass.config_entries.async_get_entry(config_entry_id)
+
+            if (
+                entry is None
+                or entry.domain != DOMAIN
+                or entry.state is not ConfigEntryState.LOADED
+            ):
+                continue
+
+            for domain, identifier in device.identifiers:
+                if domain == DOMAIN and identifier in entry.subentries:
+                    routes.append((entry.runtime_data, identifier, device_id))
+
+    return routes
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "sncf_trains/subscribe_trains",
+        vol.Required("device_ids"): [str],
+        vol.Optional("limit"): vol.All(int, vol.Range(min=1)),
+    }
+)
+@callback
+def websocket_subscribe_trains(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Push the upcoming trains of the given devices on every data change.
+
+    The routes are resolved again on each change: after an entry reload or
+    a route change, the subscription follows the current coordinators.
+    """
+    limit = msg.get("limit")
+    last_trains: list[dict[str, Any]] | None = None
+    listeners: dict[SncfUpdateCoordinator, CALLBACK_TYPE] = {}
+
+    @callback
+    def _async_follow(coordinators: set[SncfUpdateCoordinator]) -> None:
+        """Listen to the given coordinators only."""
+        for coordinator in listeners.keys() - coordinators:
+            listeners.pop(coordinator)()
+
+        for coordinator in coordinators - listeners.keys():
+            listeners[coordinator] = coordinator.async_add_listener(
+                _async_send_trains
+            )
+
+    @callback
+    def _async_send_trains() -> None:
+        """Send the trains when they differ from the last message."""
+        nonlocal last_trains
+
+        routes = _async_resolve_routes(hass, msg["device_ids"])
+        _async_follow({route[0] for route in routes})
+
+        trains = build_upcoming_trains(routes, dt_util.now(), limit)
+
+        if trains == last_trains:
+            return
+
+        last_trains = trains
+        connection.send_message(
+            websocket_api.event_message(msg["id"], {"trains": trains})
+        )
+
+    # Un coordinateur rechargé ne prévient pas l'ancien : on écoute les
+    # chargements d'entrée pour le suivre.
+    unsub_loaded = async_dispatcher_connect(
+        hass, SIGNAL_ENTRY_LOADED, _async_send_trains
+    )
+
+    @callback
+    def _async_unsubscribe() -> None:
+        """Remove the coordinator listeners."""
+        unsub_loaded()
+        _async_follow(set())
+
+    connection.subscriptions[msg["id"]] = _async_unsubscribe
+    connection.send_result(msg["id"])
+    _async_send_trains()
@@ -15,6 +15,8 @@ class SncfTrainCard extends HTMLElement {
     this.updateInterval = null;
     this.lastTrainSignature = null;
     this._lastRenderTime = 0;
+    this._trains = [];
+    this._unsubscribe = null;
   }
 
   /**
@@ -51,6 +53,9 @@ class SncfTrainCard extends HTMLElement {
     if (deviceIdChanged) {
       this.stopUpdateTimer();
       this.startUpdateTimer();
+      this.unsubscribeTrains();
+      this._trains = [];
+      this.subscribeTrains();
     }
 
     // Toujours forcer un nouveau rendu
@@ -204,35 +209,32 @@ class SncfTrainCard extends HTMLElement {
 
   /**
    * <b><u>Méthode héritée</u></b><br>
-   * Permet de recevoir l'objet Home Assistant et de déclencher une vérification des mises à jour des trains pour éviter les rendus inutiles
-   * @param {Object} hass - L'objet Home Assistant fourni par le système, utilisé pour accéder aux états et aux services, et pour déclencher des mises à jour de la carte lorsque les données des trains changent
+   * Permet de recevoir l'objet Home Assistant et d'ouvrir l'abonnement aux trains lors de la première réception
+   * @param {Object} hass - L'objet Home Assistant fourni par le système, utilisé pour accéder à la connexion WebSocket
    */
   set hass(hass) {
-    const previousHass = this._hass;
     this._hass = hass;
 
-    // Vérifier si les données des trains ont changé
-    if (this.config && previousHass) {
-      this.checkForTrainUpdates(previousHass, hass);
-    } else {
-      this.render();
-    }
+    // Les données des trains sont poussées par l'intégration : seul le premier hass déclenche l'abonnement
+    this.subscribeTrains();
   }
 
   /**
    * <b><u>Méthode héritée</u></b><br>
-   * Démarre un timer pour forcer des mises à jour régulières, ce qui est nécessaire pour capturer les changements de données en temps réel
+   * Démarre un timer pour forcer des mises à jour régulières de l'animation, et rouvre l'abonnement aux trains
    */
   connectedCallback() {
     this.startUpdateTimer();
+    this.subscribeTrains();
   }
 
   /**
    * <b><u>Méthode héritée</u></b><br>
-   * Arrête le timer de mise à jour pour éviter les fuites de mémoire lorsque la carte est retirée du DOM
+   * Arrête le timer de mise à jour et l'abonnement pour éviter les fuites de mémoire lorsque la carte est retirée du DOM
    */
   disconnectedCallback() {
     this.stopUpdateTimer();
+    this.unsubscribeTrains();
   }
 
   /**
@@ -244,49 +246,72 @@ class SncfTrainCard extends HTMLElement {
   }
 
   /**
-   * Vérifie si les données des trains ont changé en comparant une signature des données actuelles avec la dernière signature connue, et ne fait un rendu que si nécessaire pour optimiser les performances
-   * @param {Object} previousHass - L'objet Home Assistant précédent pour comparer les données
-   * @param {Object} currentHass - L'objet Home Assistant actuel pour récupérer les données fraîches
+   * S'abonne à la commande WebSocket `sncf_trains/subscribe_trains`, qui envoie la liste triée des prochains trains des devices configurés uniquement lorsque les données du coordinator changent
    */
-  async checkForTrainUpdates(previousHass, currentHass) {
-    try {
-      // Récupérer les entités actuelles
-      const currentTrains = await this.getTrainEntities();
-
-      // Créer une signature des données actuelles
-      const currentSignature = this.createTrainSignature(currentTrains);
-
-      // Comparer avec la signature précédente
-      if (currentSignature !== this.lastTrainSignature) {
-        this.lastTrainSignature = currentSignature;
-        this.render();
-      }
-    } catch (error) {
-      // En cas d'erreur, faire un rendu quand même
-      console.error(error);
+  subscribeTrains() {
+    if (!this._hass || !this.config || this._unsubscribe) {
+      return;
+    }
+
+    const deviceIds = this.config.device_id.filter(id => id);
+
+    this._unsubscribe = this._hass.connection.subscribeMessage(
+      message => this.handleTrainsMessage(message),
+      {type: 'sncf_trains/subscribe_trains', device_ids: deviceIds}
+    ).catch(error => {
+      console.error('❌ Erreur lors de l\'abonnement aux trains:', error);
+      this._unsubscribe = null;
+    });
+  }
+
+  /**
+   * Ferme l'abonnement WebSocket aux trains, par exemple lorsque la carte est retirée du DOM ou que le device_id change
+   */
+  unsubscribeTrains() {
+    if (!this._unsubscribe) {
+      return;
+    }
+
+    const unsubscribe = this._unsubscribe;
+    this._unsubscribe = null;
+    unsubscribe.then(unsub => unsub?.()).catch(() => {});
+  }
+
+  /**
+   * Reçoit la liste des trains poussée par l'intégration et ne fait un rendu que si les données ont changé
+   * @param {Object} message - Le message de l'abonnement, contenant la liste `trains`
+   */
+  handleTrainsMessage(message) {
+    this._trains = message.trains || [];
+
+    const currentSignature = this.createTrainSignature(this._trains);
+
+    if (currentSignature !== this.lastTrainSignature) {
+      this.lastTrainSignature = currentSignature;
+      this._lastRenderTime = 0;
       this.render();
     }
   }
 
   /**
    * Crée une signature unique pour les données des trains en concaténant les informations clés de chaque train, ce qui permet de détecter facilement les changements sans faire un rendu complet à chaque fois
-   * @param {Array} trains - Un tableau d'entités de train
+   * @param {Array} trains - Un tableau de trains
    * @returns {string} Une chaîne de caractères représentant la signature des données des trains
    */
   createTrainSignature(trains) {
     return trains.map(train =>
-      `${train.entity_id}:${train.attributes.departure_time}:${train.attributes.delay_minutes || 0}:${train.attributes.has_delay || false}`
+      `${train.key}:${train.departure_time}:${train.delay_minutes || 0}:${train.has_delay || false}:${train.status || ''}`
     ).join('|');
   }
 
   /**
-   * Démarre un timer qui force un rendu de la carte à intervalles réguliers, ce qui est nécessaire pour capturer les changements de données en temps réel, surtout pour les données de train qui peuvent changer fréquemment
+   * Démarre un timer qui force un rendu de la carte à intervalles réguliers, ce qui est nécessaire pour faire avancer les trains sur la barre de progression
    */
   startUpdateTimer() {
     this.stopUpdateTimer();
     this.updateInterval = setInterval(async () => {
       if (this._hass) {
-        // Force un nouveau rendu à intervalles réguliers pour capturer les changements
+        // Force un nouveau rendu à intervalles réguliers pour faire avancer l'animation
         this._lastRenderTime = 0; // Reset du throttle
         await this.render();
       }
@@ -304,73 +329,15 @@ class SncfTrainCard extends HTMLElement {
   }
 
   /**
-   * Récupère les entités de train associées aux device_id configurés en utilisant l'API WebSocket de Home Assistant pour obtenir des données fraîches, filtre les trains qui ne sont pas encore passés, et trie les résultats par heure de départ pour n'afficher que les trains à venir, ce qui garantit que les informations affichées sont toujours à jour et pertinentes pour l'utilisateur
-   * @returns {Promise<Array>} Un tableau d'entités de train avec des données fraîches, fusionnées de tous les devices et triées par date d'arrivée
+   * Retourne les trains à afficher à partir de la dernière liste poussée par l'intégration, déjà fusionnée pour tous les devices et triée par date d'arrivée, en retirant les trains arrivés depuis plus de 30 minutes
+   * @returns {Array} Un tableau de trains à venir, limité au nombre de lignes configuré
    */
-  async getTrainEntities() {
-    if (!this._hass || !this.config.device_id) return [];
-
-    try {
-      // Utiliser l'API Home Assistant pour récupérer toutes les entités
-      const allEntityRegistry = await this._hass.callWS({
-        type: 'config/entity_registry/list'
-      });
-
-      // Récupérer les entités pour tous les device_id
-      const allTrainEntities = [];
-
-      for (const deviceId of this.config.device_id) {
-        if (!deviceId) continue;
-
-        // Filtrer les entités par device_id
-        const deviceEntities = allEntityRegistry.filter(entityInfo =>
-          entityInfo.device_id === deviceId
-        );
-
-        if (!deviceEntities || deviceEntities.length === 0) {
-          console.warn(`⚠️ Aucune entité trouvée pour le device_id: ${deviceId}`);
-          continue;
-        }
+  getTrainEntities() {
+    const minArrival = Date.now() / 1000 - 30 * 60;
 
-        // Récupérer les états des entités train trouvées avec données fraîches
-        const trainEntities = deviceEntities
-          .filter(entityInfo => entityInfo.entity_id.includes('train'))
-          .map(entityInfo => {
-            // Forcer la récupération de l'état frais
-            return this._hass.states[entityInfo.entity_id];
-          })
-          .filter(entity => entity?.attributes?.departure_time);
-
-        allTrainEntities.push(...trainEntities);
-      }
-
-      // Source - https://stackoverflow.com/a/1214753
-      // Posted by Kip, modified by community. See post 'Timeline' for change history
-      // Retrieved 2026-05-15, License - CC BY-SA 4.0
-      const addMinutes = (date, minutes) => {
-        return new Date(date.getTime() + minutes*60000);
-      }
-
-      // Filtrer les trains qui ne sont pas encore passés
-      const currentTime = new Date();
-      const upcomingTrains = allTrainEntities.filter(entity => {
-        // TODO : paramétrer le temps d'affichage max d'un train arrivé en gare
-        const arrivalTime = addMinutes(this.parseTime(entity.attributes.arrival_time), 30);
-        return arrivalTime >= currentTime;
-      });
-
-      return upcomingTrains
-        .sort((a, b) => {
-          const aTime = this.parseTime(a.attributes.arrival_time);
-          const bTime = this.parseTime(b.attributes.arrival_time);
-          return aTime - bTime;
-        })
-        .slice(0, this.config.train_lines);
-
-    } catch (error) {
-      console.error('❌ Erreur lors de la récupération via API:', error);
-      return [];
-    }
+    return this._trains
+      .filter(train => train.arrival_time >= minArrival)
+      .slice(0, this.config.train_lines);
   }
 
   /**
@@ -383,6 +350,11 @@ class SncfTrainCard extends HTMLElement {
       return new Date(0);
     }
 
+    // Attributs compacts : secondes epoch
+    if (typeof departureTime === 'number') {
+      return new Date(departureTime * 1000);
+    }
+
     // Format SNCF: "19/11/2025 - 08:20"
     if (departureTime.includes('/') && departureTime.includes(' - ')) {
       const parts = departureTime.split(' - ');
@@ -520,7 +492,7 @@ class SncfTrainCard extends HTMLElement {
     }
     this._lastRenderTime = now;
 
-    const trains = await this.getTrainEntities();
+    const trains = this.getTrainEntities();
 
     if (trains.length === 0) {
       this.shadowRoot.innerHTML = `
@@ -568,7 +540,7 @@ class SncfTrainCard extends HTMLElement {
    */
   renderTrainLines(trains) {
     return trains.map((train, index) => {
-      const TA = train.attributes;
+      const TA = train;
       const position = this.calculateTrainPosition(TA);
       const delayMinutes = TA.delay_minutes || 0;
       const hasDelay = TA.has_delay || false;
@@ -576,7 +548,8 @@ class SncfTrainCard extends HTMLElement {
       const isArrived = new Date() > this.parseTime(TA.arrival_time)
       const trainColor = this.getTrainColor(delayMinutes, hasDelay);
 
-      const theme = isArrived ? 'arrived' : hasDelay ? 'delayed' : isRunning ? 'running' : '';
+      const isCancelled = TA.status === 'cancelled';
+      const theme = isArrived ? 'arrived' : (hasDelay || isCancelled) ? 'delayed' : isRunning ? 'running' : '';
       return `
         <div class="train-line">
           ${this.config.show_departure_station ? this.renderDeparture(TA) : ''}
@@ -604,6 +577,7 @@ class SncfTrainCard extends HTMLElement {
   renderDeparture(trainAttributes) {
     const hasDelay = trainAttributes.has_delay || false;
     const isGone = new Date() > this.parseTime(trainAttributes.departure_time)
+    const isCancelled = trainAttributes.status === 'cancelled';
     const delayMinutes = trainAttributes.delay_minutes || 0;
     const departureTime = this.formatTime(trainAttributes.base_departure_time);
     const realDepartureTime = this.formatTime(trainAttributes.departure_time);
@@ -619,8 +593,8 @@ class SncfTrainCard extends HTMLElement {
               <div class="arrival-time">${departureTime}</div>
             `}
           </div>
-          <div class="delay-info ${hasDelay ? 'delay' : 'on-time'}">
-            ${hasDelay ? `+${delayMinutes}min` : isGone ? 'Parti' : 'À l\'heure'}
+          <div class="delay-info ${hasDelay || isCancelled ? 'delay' : 'on-time'}">
+            ${isCancelled ? 'Supprimé' : hasDelay ? `+${delayMinutes}min` : isGone ? 'Parti' : 'À l\'heure'}
           </div>
         </div>
         <div class="station-emoji">${this.renderIcone(this.config.departure_station_emoji)}</div>
@@ -636,6 +610,7 @@ class SncfTrainCard extends HTMLElement {
   renderArrival(trainAttributes) {
     const hasDelay = trainAttributes.has_delay || false;
     const isArrived = new Date() > this.parseTime(trainAttributes.arrival_time)
+    const isCancelled = trainAttributes.status === 'cancelled';
     const delayMinutes = trainAttributes.delay_minutes || 0;
     const arrivalTime = this.formatTime(trainAttributes.base_arrival_time);
     const realArrivalTime = this.formatTime(trainAttributes.arrival_time);
@@ -652,8 +627,8 @@ class SncfTrainCard extends HTMLElement {
               <div class="arrival-time">${arrivalTime}</div>
             `}
           </div>
-          <div class="delay-info ${hasDelay ? 'delay' : 'on-time'}">
-            ${hasDelay ? `+${delayMinutes}min` : isArrived ? 'Arrivé' : 'À l\'heure'}
+          <div class="delay-info ${hasDelay || isCancelled ? 'delay' : 'on-time'}">
+            ${isCancelled ? 'Supprimé' : hasDelay ? `+${delayMinutes}min` : isArrived ? 'Arrivé' : 'À l\'heure'}
           </div>
         </div>
       </div>